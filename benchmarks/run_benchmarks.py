@@ -0,0 +1,387 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.synthetic import SyntheticEpisode, generate_episode, pairs_for_similarity
+from src.core.script_parser import clear_script_cache, load_script, read_script
+from src.core.utils import (seconds_to_timecode, similar, timecode_to_seconds,
+                            SIMILARITY_BACKEND_DIFFLIB, SIMILARITY_BACKEND_NUMBA)
+
+
+DEFAULT_SIZES = [100, 1000, 5000, 20000]
+DEFAULT_MATCHERS = ["greedy", "alignment", "matrix", "windowed", "anchored"]
+DEFAULT_BACKENDS = [SIMILARITY_BACKEND_DIFFLIB, SIMILARITY_BACKEND_NUMBA]
+SIMILARITY_PAIRS = 2000
+FIND_MATCH_SAMPLE = 200
+PARITY_THRESHOLD = 0.5
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Ejecuta los micro-benchmarks y escribe los resultados en JSON
+
+    No se carga ningún modelo Whisper: el guion y la transcripción se generan
+    sintéticamente. Las pruebas cuyo backend o dependencia no está disponible
+    aparecen con "skipped" y el motivo.
+
+    Args:
+        argv (Optional[List[str]]): Argumentos de línea de comandos
+
+    Returns:
+        int: Código de salida
+    """
+    args = _parse_arguments(argv)
+    report = {
+        "environment": _environment(),
+        "parameters": {
+            "sizes": args.sizes,
+            "repeat": args.repeat,
+            "noise": args.noise,
+            "omission": args.omission,
+            "reorder": args.reorder,
+            "seed": args.seed,
+            "matchers": args.matchers,
+            "backends": args.backends,
+            "matcher_max_lines": args.matcher_max_lines
+        },
+        "results": []
+    }
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in args.sizes:
+            episode = generate_episode(size, args.noise, args.omission, args.reorder, args.seed)
+            script_path = os.path.join(work_dir, f"guion_{size}.txt")
+            episode.write_script(script_path)
+            _log(f"{size} diálogos, {len(episode.segments)} segmentos")
+
+            suite = [
+                lambda: bench_read_script(script_path, size, args.repeat),
+                lambda: bench_similar(episode, size, args.backends, args.repeat),
+                lambda: bench_find_best_match(episode, script_path, size, args.repeat,
+                                              args.matcher_max_lines),
+                lambda: bench_matchers(episode, script_path, size, args.matchers, args.backends,
+                                       args.matcher_max_lines),
+                lambda: bench_timecodes(episode, size, args.repeat),
+                lambda: bench_exports(episode, work_dir, size, args.repeat),
+            ]
+            for benchmark in suite:
+                for result in benchmark():
+                    _log(_describe(result))
+                    report["results"].append(result)
+
+    text = json.dumps(report, indent=4, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+        _log(f"Resultados guardados en: {args.output}")
+    else:
+        print(text)
+    return 0
+
+
+def bench_read_script(script_path: str, size: int, repeat: int) -> List[Dict[str, Any]]:
+    """Parse the script from disk (cold) and fetch it again from the parse cache"""
+    def read_cold() -> None:
+        clear_script_cache()
+        read_script(script_path)
+
+    load_script(script_path)
+    return [
+        _result("read_script", size, _measure(read_cold, repeat), items=size),
+        _result("load_script_cached", size, _measure(lambda: load_script(script_path), repeat),
+                items=size)
+    ]
+
+
+def bench_similar(episode: SyntheticEpisode, size: int, backends: List[str],
+                  repeat: int) -> List[Dict[str, Any]]:
+    """Time similar() per backend on the same pairs and compare their decisions"""
+    pairs = pairs_for_similarity(episode, SIMILARITY_PAIRS, seed=size)
+    results = []
+    scores_by_backend = {}
+
+    for backend in backends:
+        try:
+            # The first call also compiles the kernel
+            similar(pairs[0][0], pairs[0][1], backend)
+        except ImportError as e:
+            results.append(_skipped("similar", size, str(e), backend=backend))
+            continue
+
+        def score_pairs(backend: str = backend) -> None:
+            scores_by_backend[backend] = [similar(a, b, backend) for a, b in pairs]
+
+        results.append(_result("similar", size, _measure(score_pairs, repeat),
+                               items=len(pairs), backend=backend))
+
+    reference = scores_by_backend.get(SIMILARITY_BACKEND_DIFFLIB)
+    for backend, scores in scores_by_backend.items():
+        if backend == SIMILARITY_BACKEND_DIFFLIB or reference is None:
+            continue
+        agreements = sum((a > PARITY_THRESHOLD) == (b > PARITY_THRESHOLD)
+                         for a, b in zip(reference, scores))
+        results.append({
+            "name": "similar_parity",
+            "size": size,
+            "backend": backend,
+            "items": len(scores),
+            "decision_agreement": agreements / len(scores),
+            "max_abs_difference": max(abs(a - b) for a, b in zip(reference, scores))
+        })
+    return results
+
+
+def bench_find_best_match(episode: SyntheticEpisode, script_path: str, size: int,
+                          repeat: int, max_lines: int) -> List[Dict[str, Any]]:
+    """Time _find_best_dialogue_match on a sample of segments, with and without the index"""
+    try:
+        from src.core.dialogue_index import DialogueIndex
+        from src.core.pipeline import SyncPipeline
+    except ImportError as e:
+        return [_skipped("find_best_dialogue_match", size, str(e))]
+
+    pipeline = SyncPipeline("", script_path)
+    dialogues = load_script(script_path)
+    texts = [segment["text"].strip() for segment in episode.segments[:FIND_MATCH_SAMPLE]]
+    results = []
+
+    for pruning in (True, False):
+        if not pruning and size > max_lines:
+            results.append(_skipped("find_best_dialogue_match", size,
+                                    f"más de {max_lines} diálogos", candidate_pruning=pruning))
+            continue
+
+        def find_all(pruning: bool = pruning) -> None:
+            index = DialogueIndex(dialogues) if pruning else None
+            for text in texts:
+                pipeline._find_best_dialogue_match(text, dialogues, set(), index)
+
+        results.append(_result("find_best_dialogue_match", size, _measure(find_all, repeat),
+                               items=len(texts), candidate_pruning=pruning))
+    return results
+
+
+def bench_matchers(episode: SyntheticEpisode, script_path: str, size: int,
+                   matchers: List[str], backends: List[str],
+                   max_lines: int) -> List[Dict[str, Any]]:
+    """Run _process_segments once per matcher and backend, and score the matches"""
+    try:
+        from src.core.pipeline import SyncPipeline
+    except ImportError as e:
+        return [_skipped("process_segments", size, str(e))]
+
+    dialogues = load_script(script_path)
+    transcription = episode.transcription()
+    results = []
+
+    for matcher in matchers:
+        for backend in backends:
+            labels = {"matcher": matcher, "backend": backend}
+            if size > max_lines:
+                results.append(_skipped("process_segments", size,
+                                        f"más de {max_lines} diálogos", **labels))
+                continue
+
+            pipeline = SyncPipeline("", script_path,
+                                    {"matcher": matcher, "similarity_backend": backend})
+            json_data = pipeline._create_json_structure()
+            try:
+                started = time.perf_counter()
+                matched = pipeline._process_segments(transcription, dialogues, json_data)
+                elapsed = time.perf_counter() - started
+            except ImportError as e:
+                results.append(_skipped("process_segments", size, str(e), **labels))
+                continue
+
+            timing = {"min": elapsed, "median": elapsed, "mean": elapsed, "repeat": 1}
+            results.append(_result("process_segments", size, timing,
+                                   items=len(episode.segments),
+                                   matched=len(matched),
+                                   correct=_count_correct(episode, json_data["data"]),
+                                   **labels))
+    return results
+
+
+def bench_timecodes(episode: SyntheticEpisode, size: int, repeat: int) -> List[Dict[str, Any]]:
+    """Format the IN and OUT of every segment, one by one and vectorized"""
+    try:
+        from src.core.timecode import format_frames, seconds_to_frames
+    except ImportError as e:
+        return [_skipped("seconds_to_timecode", size, str(e)),
+                _skipped("format_frames", size, str(e))]
+
+    times = [segment[key] for segment in episode.segments for key in ("start", "end")]
+
+    def format_all() -> None:
+        for seconds in times:
+            seconds_to_timecode(seconds)
+
+    return [
+        _result("seconds_to_timecode", size, _measure(format_all, repeat), items=len(times)),
+        _result("format_frames", size,
+                _measure(lambda: format_frames(seconds_to_frames(times)), repeat),
+                items=len(times))
+    ]
+
+
+def bench_exports(episode: SyntheticEpisode, work_dir: str, size: int,
+                  repeat: int) -> List[Dict[str, Any]]:
+    """Write the reference results as JSON and as Excel"""
+    try:
+        from src.core.export import export_excel, save_json
+        json_data = _reference_results(episode)
+    except ImportError as e:
+        return [_skipped("save_json", size, str(e)), _skipped("export_excel", size, str(e))]
+
+    rows = len(json_data["data"])
+    json_path = os.path.join(work_dir, f"resultado_{size}.json")
+    excel_path = os.path.join(work_dir, f"resultado_{size}.xlsx")
+
+    results = [_result("save_json", size, _measure(lambda: save_json(json_data, json_path), repeat),
+                       items=rows)]
+    try:
+        timing = _measure(lambda: export_excel(json_data, excel_path), repeat)
+        results.append(_result("export_excel", size, timing, items=rows))
+    except ImportError as e:
+        results.append(_skipped("export_excel", size, str(e)))
+    return results
+
+
+def _reference_results(episode: SyntheticEpisode) -> Dict[str, Any]:
+    """Results a perfect matcher would produce, in the pipeline's layout"""
+    from src.core.timecode import Timecode
+
+    timings = {index: segment for index, segment in zip(episode.truth, episode.segments)}
+    unset = Timecode(0)
+    data = []
+    for index, dialogue in enumerate(episode.dialogues):
+        segment = timings.get(index)
+        data.append({
+            "ID": index,
+            "IN": Timecode.from_seconds(segment["start"]) if segment else unset,
+            "OUT": Timecode.from_seconds(segment["end"]) if segment else unset,
+            "PERSONAJE": dialogue["character"],
+            "DIÁLOGO": dialogue["dialogue"],
+            "SCENE": 1
+        })
+    return {"header": {}, "data": data}
+
+
+def _count_correct(episode: SyntheticEpisode, entries: List[Dict[str, Any]]) -> int:
+    """
+    Matched entries whose IN falls inside the segment that really produced
+    the dialogue (an alignment span may split one segment between dialogues)
+    """
+    spans = {index: segment for index, segment in zip(episode.truth, episode.segments)}
+    frame = 1 / 25
+    correct = 0
+    for entry in entries:
+        segment = spans.get(entry["ID"])
+        if segment is None:
+            continue
+        in_seconds = timecode_to_seconds(entry["IN"])
+        if segment["start"] - frame <= in_seconds <= segment["end"] + frame:
+            correct += 1
+    return correct
+
+
+def _measure(function: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Wall time of repeated calls"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "repeat": repeat
+    }
+
+
+def _result(name: str, size: int, timing: Dict[str, float], items: int,
+            **extra: Any) -> Dict[str, Any]:
+    """One benchmark record, with the per-item time taken from the best run"""
+    return {
+        "name": name,
+        "size": size,
+        **extra,
+        "items": items,
+        "seconds": timing,
+        "microseconds_per_item": timing["min"] / max(1, items) * 1e6
+    }
+
+
+def _skipped(name: str, size: int, reason: str, **extra: Any) -> Dict[str, Any]:
+    """Record for a benchmark that could not run here"""
+    return {"name": name, "size": size, **extra, "skipped": reason}
+
+
+def _describe(result: Dict[str, Any]) -> str:
+    """One progress line for stderr"""
+    labels = " ".join(f"{key}={result[key]}" for key in ("backend", "matcher", "candidate_pruning")
+                      if key in result)
+    if "skipped" in result:
+        return f"  {result['name']} {labels}: omitido ({result['skipped']})"
+    if "seconds" not in result:
+        return f"  {result['name']} {labels}: acuerdo {result['decision_agreement']:.3f}"
+    return f"  {result['name']} {labels}: {result['seconds']['min'] * 1000:.1f} ms"
+
+
+def _environment() -> Dict[str, Any]:
+    """Interpreter, machine and versions of the optional dependencies"""
+    versions = {}
+    for module_name in ("numpy", "numba", "openpyxl"):
+        try:
+            module = __import__(module_name)
+            versions[module_name] = getattr(module, "__version__", "unknown")
+        except ImportError:
+            versions[module_name] = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "packages": versions
+    }
+
+
+def _log(message: str) -> None:
+    """Progress goes to stderr so stdout stays valid JSON"""
+    print(message, file=sys.stderr)
+
+
+def _parse_arguments(argv: Optional[List[str]]) -> argparse.Namespace:
+    """Define and parse the command line"""
+    parser = argparse.ArgumentParser(
+        description="Micro-benchmarks de lectura, similitud, emparejamiento y exportación"
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Número de diálogos de cada guion sintético")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones de cada medida")
+    parser.add_argument("--noise", type=float, default=0.1,
+                        help="Probabilidad de alterar cada palabra transcrita")
+    parser.add_argument("--omission", type=float, default=0.05,
+                        help="Probabilidad de que un diálogo falte en el audio")
+    parser.add_argument("--reorder", type=float, default=0.02,
+                        help="Probabilidad de intercambiar segmentos vecinos")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla del generador")
+    parser.add_argument("--matchers", nargs="+", default=DEFAULT_MATCHERS,
+                        help="Métodos de emparejamiento a medir")
+    parser.add_argument("--backends", nargs="+", default=DEFAULT_BACKENDS,
+                        help="Backends de similitud a medir")
+    parser.add_argument("--matcher-max-lines", type=int, default=5000,
+                        help="Tamaño máximo de guion para medir los métodos de emparejamiento")
+    parser.add_argument("--output", help="Archivo JSON de resultados (por defecto, la salida estándar)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+import argparse
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.run_benchmarks import _environment, _log
+from src.core.inference_profile import INFERENCE_PROFILES
+
+
+# Pipeline options that make every profile transcribe the whole file from scratch
+BENCHMARK_OPTIONS = {
+    "use_cache": False,
+    "incremental": False,
+    "checkpoint": False,
+    "profile": True
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Compara los perfiles de inferencia sobre un audio y un guion reales
+
+    Cada perfil transcribe el audio completo sin cachés y empareja el guion;
+    el informe recoge por perfil la carga del modelo, el factor de tiempo
+    real (segundos de transcripción por segundo de audio) y la proporción
+    de diálogos emparejados. Los perfiles que no pueden ejecutarse aparecen
+    con "skipped" y el motivo.
+
+    Args:
+        argv (Optional[List[str]]): Argumentos de línea de comandos
+
+    Returns:
+        int: Código de salida
+    """
+    args = _parse_arguments(argv)
+    options = {**(json.loads(args.options) if args.options else {}), **BENCHMARK_OPTIONS}
+    report = {
+        "environment": _environment(),
+        "parameters": {
+            "audio": args.audio,
+            "script": args.script,
+            "profiles": args.profiles,
+            "options": options
+        },
+        "results": []
+    }
+
+    for name in args.profiles:
+        result = bench_profile(args.audio, args.script, name, options)
+        _log(_describe(result))
+        report["results"].append(result)
+
+    text = json.dumps(report, indent=4, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+        _log(f"Resultados guardados en: {args.output}")
+    else:
+        print(text)
+    return 0
+
+
+def bench_profile(audio_path: str, script_path: str, name: str,
+                  options: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the full pipeline with one profile and read its stage timings"""
+    try:
+        import torch  # noqa: F401
+        import whisper  # noqa: F401
+        from src.core.model_registry import get_model_registry
+        from src.core.pipeline import SyncPipeline
+        from src.core.vad import SAMPLE_RATE
+    except ImportError as e:
+        return {"profile": name, "skipped": str(e)}
+
+    pipeline = SyncPipeline(audio_path, script_path, {**options, "inference_profile": name})
+    started = time.perf_counter()
+    pipeline.run()
+    total_seconds = time.perf_counter() - started
+    # Unload so the next profile is measured with a cold load and its own memory
+    get_model_registry().clear()
+
+    stages = _stage_seconds(pipeline)
+    audio_seconds = stages["decode_audio_items"] / SAMPLE_RATE
+    transcribe_seconds = stages["transcribe"]
+    dialogues = pipeline.stats["dialogues"]
+    return {
+        "profile": name,
+        "description": pipeline.inference_profile.describe(),
+        "audio_seconds": audio_seconds,
+        "load_model_seconds": stages["load_model"],
+        "transcribe_seconds": transcribe_seconds,
+        "total_seconds": total_seconds,
+        "real_time_factor": transcribe_seconds / audio_seconds if audio_seconds else None,
+        "dialogues": dialogues,
+        "matched": pipeline.stats["matched"],
+        "match_rate": pipeline.stats["matched"] / dialogues if dialogues else None
+    }
+
+
+def _stage_seconds(pipeline: Any) -> Dict[str, float]:
+    """Wall time of the stages the benchmark reports, from the pipeline's tracer"""
+    stages = {"load_model": 0.0, "transcribe": 0.0, "decode_audio_items": 0}
+    for span in pipeline.tracer.spans:
+        if span.name == "load_model":
+            stages["load_model"] += span.wall
+        elif span.name in ("transcribe", "transcribe_chunked"):
+            stages["transcribe"] += span.wall
+        elif span.name == "decode_audio" and span.items is not None:
+            stages["decode_audio_items"] = span.items
+    return stages
+
+
+def _describe(result: Dict[str, Any]) -> str:
+    """One progress line for stderr"""
+    if "skipped" in result:
+        return f"  {result['profile']}: omitido ({result['skipped']})"
+    return (f"  {result['description']}: RTF {result['real_time_factor']:.3f}, "
+            f"emparejados {result['matched']}/{result['dialogues']} "
+            f"({result['match_rate']:.1%}), carga {result['load_model_seconds']:.1f} s")
+
+
+def _parse_arguments(argv: Optional[List[str]]) -> argparse.Namespace:
+    """Define and parse the command line"""
+    parser = argparse.ArgumentParser(
+        description="Factor de tiempo real y tasa de emparejamiento de cada perfil de inferencia"
+    )
+    parser.add_argument("audio", help="Archivo de audio")
+    parser.add_argument("script", help="Guion del audio")
+    parser.add_argument("--profiles", nargs="+", default=list(INFERENCE_PROFILES),
+                        choices=list(INFERENCE_PROFILES), help="Perfiles a medir")
+    parser.add_argument("--options", help="Opciones adicionales del pipeline en JSON")
+    parser.add_argument("--output", help="Archivo JSON de resultados (por defecto, la salida estándar)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
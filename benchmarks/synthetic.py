@@ -0,0 +1,200 @@
+import random
+from typing import Any, Dict, List, Tuple
+
+
+# Generator defaults
+DEFAULT_VOCABULARY_SIZE = 3000
+DEFAULT_CHARACTERS = 24
+MIN_WORDS = 2
+MAX_WORDS = 18
+SECONDS_PER_WORD = 0.35
+MAX_GAP_SECONDS = 1.5
+
+_SYLLABLES = [
+    "ba", "be", "bo", "ca", "ch", "da", "de", "do", "fa", "fi", "ga", "go", "ha", "he",
+    "ja", "ka", "ke", "la", "le", "li", "lo", "ma", "me", "mi", "mo", "na", "ne", "no",
+    "pa", "pe", "pi", "po", "ra", "re", "ri", "ro", "sa", "se", "si", "so", "ta", "te",
+    "ti", "to", "tu", "va", "ve", "wa", "we", "ya", "yo", "za", "zo", "st", "th", "sh"
+]
+_COMMON_WORDS = [
+    "the", "a", "to", "you", "i", "we", "it", "is", "and", "on", "in", "that", "this",
+    "of", "what", "let's", "go", "pup", "pups", "ryder", "chase", "paw", "patrol",
+    "okay", "yeah", "no", "come", "right", "help", "look", "here", "there", "now"
+]
+_TAGS = ["<BARK BARK>", "<EFFORT>", "<LAUGHS>", "(THEN)", "<GASP>"]
+_CHARACTER_SUFFIXES = ["", "", "", " (CONT'D)", " (O.S.)", " (V.O.)"]
+_PUNCTUATION = [".", ".", "!", "?", ",", "..."]
+
+
+class SyntheticEpisode:
+    """
+    Guion sintético en formato guion.txt y segmentos falsos de Whisper
+
+    truth asocia cada segmento con el índice del diálogo que lo originó, en el
+    mismo orden en que read_script devuelve los diálogos.
+    """
+
+    def __init__(self, script_text: str, dialogues: List[Dict[str, str]],
+                 segments: List[Dict[str, Any]], truth: List[int]):
+        self.script_text = script_text
+        self.dialogues = dialogues
+        self.segments = segments
+        self.truth = truth
+
+    def transcription(self) -> Dict[str, Any]:
+        """Resultado con la forma del que devuelve model.transcribe()"""
+        return {
+            "text": "".join(segment["text"] for segment in self.segments),
+            "segments": self.segments,
+            "language": "en"
+        }
+
+    def write_script(self, path: str) -> None:
+        """Guarda el guion en un archivo de texto UTF-8"""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.script_text)
+
+
+def generate_episode(n_dialogues: int,
+                     noise: float = 0.1,
+                     omission: float = 0.05,
+                     reorder: float = 0.02,
+                     seed: int = 0) -> SyntheticEpisode:
+    """
+    Genera un guion y su transcripción simulada
+
+    Args:
+        n_dialogues (int): Número de diálogos del guion
+        noise (float): Probabilidad de alterar cada palabra transcrita
+            (eliminarla, sustituirla o introducir una errata)
+        omission (float): Probabilidad de que un diálogo no aparezca en el audio
+        reorder (float): Probabilidad de intercambiar un segmento con el siguiente
+        seed (int): Semilla para obtener siempre el mismo episodio
+
+    Returns:
+        SyntheticEpisode: Guion, diálogos, segmentos y correspondencia real
+    """
+    rng = random.Random(seed)
+    vocabulary = _make_vocabulary(rng, DEFAULT_VOCABULARY_SIZE)
+    weights = [1.0 / rank for rank in range(1, len(vocabulary) + 1)]
+    characters = _make_characters(rng, DEFAULT_CHARACTERS)
+
+    lines = []
+    dialogues = []
+    for _ in range(n_dialogues):
+        character = rng.choice(characters) + rng.choice(_CHARACTER_SUFFIXES)
+        words = rng.choices(vocabulary, weights, k=rng.randint(MIN_WORDS, MAX_WORDS))
+        dialogue = _punctuate(rng, words)
+        if rng.random() < 0.1:
+            dialogue = f"{rng.choice(_TAGS)} {dialogue}"
+
+        lines.append(character)
+        lines.append(dialogue)
+        if rng.random() < 0.05:
+            lines.append("| acotación de dirección")
+        dialogues.append({"character": character, "dialogue": dialogue})
+
+    spoken = [i for i in range(n_dialogues) if rng.random() >= omission]
+    for position in range(len(spoken) - 1):
+        if rng.random() < reorder:
+            spoken[position], spoken[position + 1] = spoken[position + 1], spoken[position]
+
+    segments = []
+    clock = 0.0
+    for segment_id, dialogue_index in enumerate(spoken):
+        text = _transcribe_noisily(rng, dialogues[dialogue_index]["dialogue"], vocabulary, noise)
+        start = clock + rng.uniform(0.1, MAX_GAP_SECONDS)
+        end = start + max(0.5, len(text.split()) * SECONDS_PER_WORD)
+        segments.append({
+            "id": segment_id,
+            "seek": int(start * 100),
+            "start": round(start, 2),
+            "end": round(end, 2),
+            "text": f" {text}"
+        })
+        clock = end
+
+    return SyntheticEpisode("\n".join(lines) + "\n", dialogues, segments, spoken)
+
+
+def _make_vocabulary(rng: random.Random, size: int) -> List[str]:
+    """Common words first, then invented words of two to four syllables"""
+    vocabulary = list(_COMMON_WORDS)
+    seen = set(vocabulary)
+    while len(vocabulary) < size:
+        word = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            vocabulary.append(word)
+    return vocabulary
+
+
+def _make_characters(rng: random.Random, count: int) -> List[str]:
+    """Upper-case character names"""
+    return [
+        "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 3))).upper()
+        for _ in range(count)
+    ]
+
+
+def _punctuate(rng: random.Random, words: List[str]) -> str:
+    """Capitalise the first word and end the sentence with punctuation"""
+    text = " ".join(words)
+    return text[0].upper() + text[1:] + rng.choice(_PUNCTUATION)
+
+
+def _transcribe_noisily(rng: random.Random, dialogue: str,
+                        vocabulary: List[str], noise: float) -> str:
+    """What Whisper might hear: no stage tags, with dropped, swapped or misspelt words"""
+    words = [word for word in dialogue.split() if not word.startswith(('<', '(')) and
+             not word.endswith(('>', ')'))]
+    heard = []
+    for word in words:
+        if rng.random() >= noise:
+            heard.append(word)
+            continue
+        change = rng.random()
+        if change < 0.3:
+            continue
+        if change < 0.6:
+            heard.append(rng.choice(vocabulary))
+        else:
+            heard.append(_misspell(rng, word))
+    return " ".join(heard) or rng.choice(vocabulary)
+
+
+def _misspell(rng: random.Random, word: str) -> str:
+    """Swap two neighbouring letters or double one"""
+    if len(word) < 2:
+        return word + word
+    position = rng.randrange(len(word) - 1)
+    if rng.random() < 0.5:
+        return word[:position] + word[position + 1] + word[position] + word[position + 2:]
+    return word[:position] + word[position] + word[position:]
+
+
+def pairs_for_similarity(episode: SyntheticEpisode, count: int,
+                         seed: int = 0) -> List[Tuple[str, str]]:
+    """
+    Pares (segmento, diálogo) para medir similar(): la mitad correctos y la
+    mitad con un diálogo al azar
+
+    Args:
+        episode (SyntheticEpisode): Episodio generado
+        count (int): Número de pares
+        seed (int): Semilla
+
+    Returns:
+        List[Tuple[str, str]]: Pares de textos
+    """
+    rng = random.Random(seed)
+    pairs = []
+    for position in range(count):
+        segment_position = rng.randrange(len(episode.segments))
+        text = episode.segments[segment_position]["text"].strip()
+        if position % 2 == 0:
+            dialogue_index = episode.truth[segment_position]
+        else:
+            dialogue_index = rng.randrange(len(episode.dialogues))
+        pairs.append((text, episode.dialogues[dialogue_index]["dialogue"]))
+    return pairs
@@ -0,0 +1 @@
+# Este archivo está vacío para marcar el directorio como un paquete Python
\ No newline at end of file
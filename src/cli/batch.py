@@ -0,0 +1,281 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+from src.core.export import export_excel, save_json
+from src.core.inference_profile import INFERENCE_PROFILES
+from src.core.job_queue import max_concurrent_transcriptions
+from src.core.pipeline import SyncPipeline
+from src.core.timecode import FRAME_RATES
+
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".ogg")
+SCRIPT_EXTENSION = ".txt"
+SUMMARY_FILE_NAME = "summary.json"
+TRACE_SUFFIX = ".trace.json"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Punto de entrada de la sincronización por lotes sin interfaz gráfica
+
+    Args:
+        argv (Optional[List[str]]): Argumentos de línea de comandos
+
+    Returns:
+        int: Código de salida (0 si todos los trabajos terminaron bien)
+    """
+    args = _parse_arguments(argv)
+    options = json.loads(args.options) if args.options else {}
+    if args.matcher:
+        options["matcher"] = args.matcher
+    if args.no_cache:
+        options["use_cache"] = False
+        options["audio_cache"] = False
+    if args.profile:
+        options["profile"] = True
+    if args.frame_rate:
+        options["frame_rate"] = args.frame_rate
+    if args.vad:
+        options["vad"] = True
+    if args.checkpoint:
+        options["checkpoint"] = True
+    if args.full:
+        options["incremental"] = False
+    if args.inference_profile:
+        options["inference_profile"] = args.inference_profile
+
+    if args.manifest:
+        jobs = load_manifest(args.manifest)
+    else:
+        jobs = discover_jobs(args.directory)
+    if not jobs:
+        print("No se encontraron pares de audio y guion", file=sys.stderr)
+        return 1
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for job in jobs:
+        job["options"] = {**options, **job.get("options", {})}
+        job.setdefault("output", os.path.join(args.output_dir, f"{job['name']}.json"))
+        job["excel"] = not args.no_excel
+
+    # Each process loads its own Whisper model: size the pool by cores and memory
+    workers = args.workers or min(len(jobs), max_concurrent_transcriptions())
+    results = run_jobs(jobs, workers)
+
+    summary_path = os.path.join(args.output_dir, SUMMARY_FILE_NAME)
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=4, ensure_ascii=False)
+    _print_summary(results, summary_path)
+
+    return 0 if all(result["status"] == "ok" for result in results) else 1
+
+
+def load_manifest(manifest_path: str) -> List[Dict[str, Any]]:
+    """
+    Lee un manifiesto JSON con una lista de trabajos
+
+    Cada trabajo necesita "audio" y "script"; "name", "output" y "options"
+    son opcionales. Las rutas relativas se resuelven desde el manifiesto.
+
+    Args:
+        manifest_path (str): Ruta al manifiesto
+
+    Returns:
+        List[Dict[str, Any]]: Trabajos normalizados
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    jobs = []
+    for entry in entries:
+        job = dict(entry)
+        for key in ("audio", "script", "output"):
+            if key in job:
+                job[key] = os.path.join(base_dir, job[key])
+        job.setdefault("name", _script_basename(job["script"]))
+        jobs.append(job)
+    return jobs
+
+
+def discover_jobs(directory: str) -> List[Dict[str, Any]]:
+    """
+    Empareja archivos de audio y guiones con el mismo nombre base en un directorio
+
+    Args:
+        directory (str): Directorio a explorar
+
+    Returns:
+        List[Dict[str, Any]]: Trabajos ordenados por nombre
+    """
+    audio_files = {}
+    script_files = {}
+    for file_name in os.listdir(directory):
+        base_name, extension = os.path.splitext(file_name)
+        path = os.path.join(directory, file_name)
+        if extension.lower() in AUDIO_EXTENSIONS:
+            audio_files[base_name] = path
+        elif extension.lower() == SCRIPT_EXTENSION:
+            script_files[base_name] = path
+
+    return [
+        {"name": name, "audio": audio_files[name], "script": script_files[name]}
+        for name in sorted(audio_files.keys() & script_files.keys())
+    ]
+
+
+def run_jobs(jobs: List[Dict[str, Any]], workers: int) -> List[Dict[str, Any]]:
+    """
+    Ejecuta los trabajos en un pool de procesos
+
+    Args:
+        jobs (List[Dict[str, Any]]): Trabajos a ejecutar
+        workers (int): Número de procesos
+
+    Returns:
+        List[Dict[str, Any]]: Resumen de cada trabajo en el orden de entrada
+    """
+    results: Dict[int, Dict[str, Any]] = {}
+    threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_initialize_worker,
+                             initargs=(threads_per_worker,)) as executor:
+        futures = {executor.submit(run_job, job): position for position, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            job = jobs[futures[future]]
+            try:
+                result = future.result()
+            except Exception as e:
+                # A worker killed (out of memory, crash) breaks the pool; keep
+                # the finished jobs and record the rest as failed
+                result = _failed_summary(job, e)
+            results[futures[future]] = result
+            print(f"[{result['status']}] {result['name']} ({result['seconds']:.1f} s)")
+
+    return [results[position] for position in range(len(jobs))]
+
+
+def run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Sincroniza un par audio/guion y escribe JSON, Excel y log
+
+    Args:
+        job (Dict[str, Any]): Trabajo con name, audio, script, output, options y excel
+
+    Returns:
+        Dict[str, Any]: Resumen del trabajo
+    """
+    output_path = job["output"]
+    log_path = f"{os.path.splitext(output_path)[0]}.log"
+    started = time.monotonic()
+    summary = {"name": job["name"], "output": output_path, "log": log_path}
+
+    with open(log_path, 'w', encoding='utf-8') as log_file:
+        def log(message: str) -> None:
+            log_file.write(f"{message}\n")
+            log_file.flush()
+
+        try:
+            pipeline = SyncPipeline(job["audio"], job["script"], job.get("options"), on_log=log)
+            json_data = pipeline.run()
+            with pipeline.tracer.span("save_json"):
+                save_json(json_data, output_path)
+            log(f"Archivo JSON guardado en: {output_path}")
+            if job.get("excel", True):
+                excel_path = f"{os.path.splitext(output_path)[0]}.xlsx"
+                with pipeline.tracer.span("export_excel"):
+                    export_excel(json_data, excel_path)
+                log(f"Archivo Excel guardado en: {excel_path}")
+            pipeline.report_profile(f"{os.path.splitext(output_path)[0]}{TRACE_SUFFIX}")
+            summary.update(status="ok", **pipeline.stats)
+        except Exception as e:
+            log(f"ERROR: {str(e)}")
+            summary.update(status="error", error=str(e))
+
+    summary["seconds"] = time.monotonic() - started
+    return summary
+
+
+def _failed_summary(job: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+    """Summary of a job whose worker process failed before returning one"""
+    output_path = job["output"]
+    return {
+        "name": job["name"],
+        "output": output_path,
+        "log": f"{os.path.splitext(output_path)[0]}.log",
+        "status": "error",
+        "error": str(error) or type(error).__name__,
+        "seconds": 0.0
+    }
+
+
+def _initialize_worker(threads: int) -> None:
+    """Share the CPU cores between the pool processes"""
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+def _script_basename(script_path: str) -> str:
+    """Job name derived from the script file, as the GUI does for its outputs"""
+    return os.path.splitext(os.path.basename(script_path))[0]
+
+
+def _print_summary(results: List[Dict[str, Any]], summary_path: str) -> None:
+    """Print the totals of a batch run"""
+    failed = [result for result in results if result["status"] != "ok"]
+    matched = sum(result.get("matched", 0) for result in results)
+    dialogues = sum(result.get("dialogues", 0) for result in results)
+    elapsed = sum(result["seconds"] for result in results)
+
+    print(f"\nTrabajos: {len(results)} (errores: {len(failed)})")
+    print(f"Diálogos coincidentes: {matched} de {dialogues}")
+    print(f"Tiempo acumulado: {elapsed:.1f} s")
+    for result in failed:
+        print(f"  {result['name']}: {result['error']}")
+    print(f"Resumen guardado en: {summary_path}")
+
+
+def _parse_arguments(argv: Optional[List[str]]) -> argparse.Namespace:
+    """Define and parse the command line"""
+    parser = argparse.ArgumentParser(
+        description="Sincroniza por lotes pares de audio y guion sin interfaz gráfica"
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--manifest", help="Manifiesto JSON con la lista de trabajos")
+    source.add_argument("--directory", help="Directorio con pares audio/guion del mismo nombre")
+    parser.add_argument("--output-dir", default="output", help="Directorio de salida")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Número de procesos (por defecto, los que caben por núcleos y memoria libre)")
+    parser.add_argument("--matcher", choices=[
+        SyncPipeline.MATCHER_ALIGNMENT, SyncPipeline.MATCHER_GREEDY, SyncPipeline.MATCHER_MATRIX,
+        SyncPipeline.MATCHER_WINDOWED, SyncPipeline.MATCHER_ANCHORED
+    ], help="Método de emparejamiento")
+    parser.add_argument("--frame-rate", choices=list(FRAME_RATES),
+                        help="Frecuencia de fotogramas de los códigos de tiempo (por defecto, 25)")
+    parser.add_argument("--options", help="Opciones adicionales del pipeline en JSON")
+    parser.add_argument("--no-cache", action="store_true", help="No usar las cachés de transcripciones y de audio decodificado")
+    parser.add_argument("--full", action="store_true",
+                        help="Sincronizar todo de nuevo aunque exista una ejecución anterior del mismo guion")
+    parser.add_argument("--no-excel", action="store_true", help="No exportar a Excel")
+    parser.add_argument("--vad", action="store_true",
+                        help="Transcribir solo las regiones con voz (omite silencios y música)")
+    parser.add_argument("--checkpoint", action="store_true",
+                        help="Guardar la transcripción por ventanas para continuarla si se interrumpe")
+    parser.add_argument("--inference-profile", choices=list(INFERENCE_PROFILES),
+                        help="Modelo, cuantización y búsqueda de Whisper (por defecto, default)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Registrar tiempos por etapa y guardar una traza de Chrome por trabajo")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
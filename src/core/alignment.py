@@ -0,0 +1,413 @@
+import math
+import re
+from difflib import SequenceMatcher
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.similarity import tfidf_vectors
+from src.core.utils import SIMILARITY_BACKEND_DIFFLIB, SIMILARITY_BACKEND_NUMBA
+
+
+# Default alignment parameters
+DEFAULT_BAND = 30
+DEFAULT_MAX_SPAN = 3
+
+# Minimum similarity of every member of a group before the group is scored
+SPAN_MEMBER_FLOOR = 0.3
+
+# Pairs whose character-trigram cosine falls below this are scored 0
+# without running difflib; far below the cosine of any pair above the floor
+PREFILTER_FLOOR = 0.2
+PREFILTER_FEATURES = 2 ** 10
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+_NEG_INF = float("-inf")
+
+# Move codes stored in the table; matches follow as FIRST_MATCH + shape index
+_NO_MOVE = 0
+_SKIP_SEGMENT = 1
+_SKIP_DIALOGUE = 2
+_FIRST_MATCH = 3
+
+
+def align_segments(segments: List[Dict[str, Any]],
+                   dialogues: List[Dict[str, str]],
+                   threshold: float = 0.5,
+                   band: int = DEFAULT_BAND,
+                   max_span: int = DEFAULT_MAX_SPAN,
+                   backend: str = SIMILARITY_BACKEND_DIFFLIB,
+                   progress_callback: Optional[Callable[[int, int], None]] = None
+                   ) -> List[Dict[str, Any]]:
+    """
+    Alinea en orden los segmentos transcritos con los diálogos del guion
+
+    Programación dinámica monótona (estilo Needleman–Wunsch) limitada a una
+    banda de anchura fija alrededor de la diagonal, de modo que el coste
+    crece linealmente con la longitud del episodio. Cada fila de la tabla se
+    calcula con NumPy; difflib solo puntúa los pares que superan un filtro
+    de n-gramas. Un diálogo puede abarcar varios segmentos consecutivos y un
+    segmento puede abarcar varios diálogos consecutivos. Para episodios con
+    grandes desplazamientos respecto a la diagonal, el método "anchored"
+    parte antes el problema por anclas.
+
+    Args:
+        segments (List[Dict[str, Any]]): Segmentos de Whisper (text, start, end)
+        dialogues (List[Dict[str, str]]): Diálogos devueltos por read_script
+        threshold (float): Similitud mínima para aceptar una coincidencia
+        band (int): Semiancho de la banda en diálogos
+        max_span (int): Número máximo de elementos que se pueden agrupar
+        backend (str): Backend de similitud, como en utils.similar
+        progress_callback (Optional[Callable]): Recibe (fila actual, total de filas)
+
+    Returns:
+        List[Dict[str, Any]]: Coincidencias en orden con index, start y end
+    """
+    if not segments or not dialogues:
+        return []
+
+    segment_texts = [segment["text"].strip().lower() for segment in segments]
+    dialogue_texts = [dialogue["dialogue"].lower() for dialogue in dialogues]
+
+    scorer = _SpanScorer(segment_texts, dialogue_texts, threshold, backend)
+    n_segments = len(segments)
+    n_dialogues = len(dialogues)
+    # Consecutive rows must overlap for the table to stay connected
+    band = max(band, math.ceil(n_dialogues / n_segments) + max_span)
+    offsets = _band_offsets(n_segments, n_dialogues, band)
+    width = 2 * band + 1
+
+    pair_rows = _pair_rows(scorer, offsets, width, max_span, n_dialogues)
+    moves = _fill_table(scorer, pair_rows, offsets, width, n_dialogues, max_span,
+                        threshold, progress_callback)
+    groups = _backtrack(moves, offsets, _move_shapes(max_span), n_segments, n_dialogues)
+
+    return _groups_to_matches(groups, segments, dialogue_texts)
+
+
+def _band_offsets(n_segments: int, n_dialogues: int, band: int) -> np.ndarray:
+    """
+    First dialogue column of each table row
+
+    Row i covers columns offsets[i] to offsets[i] + 2 * band, centred on the
+    diagonal; columns outside the script are masked while filling.
+
+    Args:
+        n_segments (int): Number of transcribed segments
+        n_dialogues (int): Number of script dialogues
+        band (int): Band half-width in dialogues
+
+    Returns:
+        np.ndarray: int64 column offset per row
+    """
+    rows = np.arange(n_segments + 1)
+    centers = np.rint(rows * (n_dialogues / n_segments)).astype(np.int64)
+    return centers - band
+
+
+def _pair_rows(scorer: "_SpanScorer",
+               offsets: np.ndarray,
+               width: int,
+               max_span: int,
+               n_dialogues: int) -> List[Tuple[int, np.ndarray]]:
+    """
+    Similarity of each segment with every dialogue a group through it can reach
+
+    Returns:
+        List[Tuple[int, np.ndarray]]: (first dialogue, scores) per segment
+    """
+    n_segments = len(offsets) - 1
+    rows = []
+    for segment in range(n_segments):
+        last_row = min(segment + max_span, n_segments)
+        first = max(0, int(offsets[segment + 1]) - max_span)
+        last = min(n_dialogues - 1, int(offsets[last_row]) + width - 2)
+        rows.append((first, scorer.pair_row(segment, np.arange(first, last + 1))))
+    return rows
+
+
+def _take(values: np.ndarray, first: int, columns: np.ndarray, fill: float) -> np.ndarray:
+    """values[columns - first], with fill where a column falls outside values"""
+    positions = columns - first
+    inside = (positions >= 0) & (positions < len(values))
+    taken = np.full(len(columns), fill)
+    taken[inside] = values[positions[inside]]
+    return taken
+
+
+def _fill_table(scorer: "_SpanScorer",
+                pair_rows: List[Tuple[int, np.ndarray]],
+                offsets: np.ndarray,
+                width: int,
+                n_dialogues: int,
+                max_span: int,
+                threshold: float,
+                progress_callback: Optional[Callable[[int, int], None]]) -> np.ndarray:
+    """
+    Fill the banded dynamic-programming table one NumPy row at a time
+
+    Args:
+        scorer: Span similarity scorer
+        pair_rows: Segment/dialogue similarities from _pair_rows
+        offsets: First column per row
+        width: Columns per row
+        n_dialogues: Number of script dialogues
+        max_span: Maximum number of grouped items
+        threshold: Minimum similarity for a match
+        progress_callback: Optional progress reporter
+
+    Returns:
+        np.ndarray: int8 move code per cell, rows offset by offsets
+    """
+    n_rows = len(offsets)
+    shapes = _span_shapes(max_span)
+    scores = np.full((n_rows, width), _NEG_INF)
+    moves = np.zeros((n_rows, width), dtype=np.int8)
+
+    def pairs(segment: int, columns: np.ndarray) -> np.ndarray:
+        first, values = pair_rows[segment]
+        return _take(values, first, columns, 0.0)
+
+    for i in range(n_rows):
+        columns = offsets[i] + np.arange(width)
+        best = np.full(width, _NEG_INF)
+        move = np.zeros(width, dtype=np.int8)
+
+        if i == 0:
+            best[columns == 0] = 0.0
+        else:
+            # Skip a segment (unmatched transcription)
+            candidate = _take(scores[i - 1], offsets[i - 1], columns, _NEG_INF)
+            better = candidate > best
+            best[better] = candidate[better]
+            move[better] = _SKIP_SEGMENT
+
+            # Match groups: k segments -> 1 dialogue, 1 segment -> k dialogues
+            for code, (span_segments, span_dialogues) in enumerate(shapes, _FIRST_MATCH):
+                if span_segments > i:
+                    continue
+                previous = _take(scores[i - span_segments], offsets[i - span_segments],
+                                 columns - span_dialogues, _NEG_INF)
+                size = span_segments + span_dialogues - 1
+                similarity = _group_similarity(scorer, pairs, previous, best, i, columns,
+                                               span_segments, span_dialogues, threshold)
+                gain = (similarity - threshold) * size
+                candidate = previous + gain
+                better = (similarity > threshold) & (candidate > best)
+                best[better] = candidate[better]
+                move[better] = code
+
+        best[(columns < 0) | (columns > n_dialogues)] = _NEG_INF
+
+        # Skip a dialogue (unmatched script line): running maximum along the row
+        row = np.maximum.accumulate(best)
+        from_left = np.zeros(width, dtype=bool)
+        from_left[1:] = row[:-1] > best[1:]
+        move[from_left] = _SKIP_DIALOGUE
+        row[(columns < 0) | (columns > n_dialogues)] = _NEG_INF
+
+        scores[i] = row
+        moves[i] = move
+
+        if progress_callback is not None:
+            progress_callback(i, n_rows)
+
+    return moves
+
+
+def _group_similarity(scorer: "_SpanScorer",
+                      pairs: Callable[[int, np.ndarray], np.ndarray],
+                      previous: np.ndarray,
+                      best: np.ndarray,
+                      row: int,
+                      columns: np.ndarray,
+                      span_segments: int,
+                      span_dialogues: int,
+                      threshold: float) -> np.ndarray:
+    """
+    Similarity of the group of a given shape ending at each cell of a row
+
+    Single pairs come straight from the pair rows. A larger group is only
+    scored with difflib where it could still improve the cell and every
+    member pair clears SPAN_MEMBER_FLOOR.
+    """
+    if span_segments == 1 and span_dialogues == 1:
+        return pairs(row - 1, columns - 1)
+
+    size = span_segments + span_dialogues - 1
+    worth_scoring = previous + (1.0 - threshold) * size > best
+    for m in range(1, span_segments + 1):
+        for q in range(1, span_dialogues + 1):
+            worth_scoring &= pairs(row - m, columns - q) > SPAN_MEMBER_FLOOR
+
+    similarity = np.zeros(len(columns))
+    for k in np.flatnonzero(worth_scoring):
+        j = int(columns[k])
+        similarity[k] = scorer.ratio(row - span_segments, row, j - span_dialogues, j, threshold)
+    return similarity
+
+
+def _span_shapes(max_span: int) -> List[Tuple[int, int]]:
+    """
+    List the allowed (segments, dialogues) group shapes for a match
+
+    Args:
+        max_span (int): Maximum number of grouped items
+
+    Returns:
+        List[Tuple[int, int]]: Allowed group shapes
+    """
+    shapes = [(1, 1)]
+    for k in range(2, max_span + 1):
+        shapes.append((k, 1))
+        shapes.append((1, k))
+    return shapes
+
+
+def _move_shapes(max_span: int) -> List[Optional[Tuple[int, int]]]:
+    """(segments, dialogues) consumed by each move code"""
+    return [None, (1, 0), (0, 1)] + _span_shapes(max_span)
+
+
+def _backtrack(moves: np.ndarray,
+               offsets: np.ndarray,
+               move_shapes: List[Optional[Tuple[int, int]]],
+               n_segments: int,
+               n_dialogues: int) -> List[Tuple[int, int, int, int]]:
+    """
+    Walk the move table back from the last cell and collect matched groups
+
+    Returns:
+        List[Tuple[int, int, int, int]]: (segment start, segment end,
+        dialogue start, dialogue end) half-open ranges in order
+    """
+    groups = []
+    i, j = n_segments, n_dialogues
+    while i > 0 or j > 0:
+        code = moves[i, j - offsets[i]]
+        if code == _NO_MOVE:
+            break
+        span_segments, span_dialogues = move_shapes[code]
+        if span_segments and span_dialogues:
+            groups.append((i - span_segments, i, j - span_dialogues, j))
+        i -= span_segments
+        j -= span_dialogues
+    groups.reverse()
+    return groups
+
+
+def _groups_to_matches(groups: List[Tuple[int, int, int, int]],
+                       segments: List[Dict[str, Any]],
+                       dialogue_texts: List[str]) -> List[Dict[str, Any]]:
+    """
+    Convert matched groups into one timed match per dialogue
+
+    When one segment covers several dialogues, its time range is split in
+    proportion to the length of each dialogue.
+
+    Returns:
+        List[Dict[str, Any]]: Matches with index, start and end
+    """
+    matches = []
+    for seg_start, seg_end, dlg_start, dlg_end in groups:
+        start_time = segments[seg_start]["start"]
+        end_time = segments[seg_end - 1]["end"]
+
+        if dlg_end - dlg_start == 1:
+            matches.append({"index": dlg_start, "start": start_time, "end": end_time})
+            continue
+
+        lengths = [max(1, len(dialogue_texts[j])) for j in range(dlg_start, dlg_end)]
+        total_length = sum(lengths)
+        duration = end_time - start_time
+        cursor = start_time
+        for offset, length in enumerate(lengths):
+            next_cursor = cursor + duration * length / total_length
+            matches.append({"index": dlg_start + offset, "start": cursor, "end": next_cursor})
+            cursor = next_cursor
+
+    return matches
+
+
+class _SpanScorer:
+    """
+    Memoised similarity between groups of segments and groups of dialogues
+
+    With the difflib backend one SequenceMatcher is reused per dialogue
+    group so the expensive preprocessing of the second sequence happens
+    once, and the full ratio() is skipped whenever its cheap upper bounds
+    already fall below the cutoff. With the numba backend the compiled
+    InDel kernel scores each segment's candidates in one parallel call.
+    Either way, pairs that share no word or whose trigram vectors are far
+    apart are scored 0 without running the backend.
+    """
+
+    def __init__(self, segment_texts: List[str], dialogue_texts: List[str], threshold: float,
+                 backend: str = SIMILARITY_BACKEND_DIFFLIB):
+        if backend not in (SIMILARITY_BACKEND_DIFFLIB, SIMILARITY_BACKEND_NUMBA):
+            raise ValueError(f"Backend de similitud desconocido: {backend}")
+        self.backend = backend
+        self.segment_texts = segment_texts
+        self.dialogue_texts = dialogue_texts
+        self.threshold = threshold
+        self.segment_words = [frozenset(_WORD_PATTERN.findall(text)) for text in segment_texts]
+        self.dialogue_words = [frozenset(_WORD_PATTERN.findall(text)) for text in dialogue_texts]
+        self.segment_vectors, self.dialogue_vectors = tfidf_vectors(
+            segment_texts, dialogue_texts, n_features=PREFILTER_FEATURES
+        )
+        self._matchers: Dict[Tuple[int, int], SequenceMatcher] = {}
+        self._encoded_dialogues: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        if backend == SIMILARITY_BACKEND_NUMBA:
+            from src.core.edit_distance import encode_texts
+            self._encoded_dialogues = encode_texts(dialogue_texts)
+
+    def pair_row(self, segment: int, dialogues: np.ndarray) -> np.ndarray:
+        """Similarity between one segment and each of the given dialogues"""
+        scores = np.zeros(len(dialogues))
+        if not len(dialogues):
+            return scores
+        cosines = self.dialogue_vectors[dialogues] @ self.segment_vectors[segment]
+        # Exact ratio whenever it can still beat the lowest floor in use
+        cutoff = min(SPAN_MEMBER_FLOOR, self.threshold)
+        words = self.segment_words[segment]
+        selected = np.array([k for k in np.flatnonzero(cosines >= PREFILTER_FLOOR)
+                             if not words.isdisjoint(self.dialogue_words[dialogues[k]])],
+                            dtype=np.int64)
+        if not len(selected):
+            return scores
+
+        if self._encoded_dialogues is not None:
+            from src.core.edit_distance import similarity_to_many
+            buffer, offsets = self._encoded_dialogues
+            ratios = similarity_to_many(self.segment_texts[segment], buffer, offsets,
+                                        dialogues[selected].astype(np.int64))
+            scores[selected] = np.where(ratios > cutoff, ratios, 0.0)
+            return scores
+
+        for k in selected:
+            j = int(dialogues[k])
+            scores[k] = self.ratio(segment, segment + 1, j, j + 1, cutoff)
+        return scores
+
+    def ratio(self, seg_start: int, seg_end: int, dlg_start: int, dlg_end: int,
+              cutoff: float) -> float:
+        """Backend ratio of the joined texts, or 0 when it cannot exceed cutoff"""
+        if self._encoded_dialogues is not None:
+            from src.core.edit_distance import indel_similarity
+            ratio = indel_similarity(" ".join(self.segment_texts[seg_start:seg_end]),
+                                     " ".join(self.dialogue_texts[dlg_start:dlg_end]))
+            return ratio if ratio > cutoff else 0.0
+
+        matcher = self._matchers.get((dlg_start, dlg_end))
+        if matcher is None:
+            matcher = SequenceMatcher(None)
+            matcher.set_seq2(" ".join(self.dialogue_texts[dlg_start:dlg_end]))
+            self._matchers[(dlg_start, dlg_end)] = matcher
+
+        matcher.set_seq1(" ".join(self.segment_texts[seg_start:seg_end]))
+        if matcher.real_quick_ratio() <= cutoff:
+            return 0.0
+        if matcher.quick_ratio() <= cutoff:
+            return 0.0
+        return matcher.ratio()
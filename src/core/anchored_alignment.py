@@ -0,0 +1,209 @@
+import multiprocessing
+import os
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.core.alignment import align_segments
+from src.core.script_parser import text_hash
+from src.core.utils import normalize_text, SIMILARITY_BACKEND_DIFFLIB
+
+
+# Minimum length (letters and digits) of a line that can become an anchor;
+# short interjections are too likely to match the wrong occurrence
+MIN_ANCHOR_CHARS = 12
+
+# Gaps with fewer table cells than this are aligned in this process
+MIN_POOLED_CELLS = 2500
+
+
+def align_segments_anchored(segments: List[Dict[str, Any]],
+                            dialogues: List[Dict[str, str]],
+                            threshold: float = 0.5,
+                            workers: int = 0,
+                            backend: str = SIMILARITY_BACKEND_DIFFLIB,
+                            progress_callback: Optional[Callable[[int, int], None]] = None
+                            ) -> List[Dict[str, Any]]:
+    """
+    Alinea segmentos y diálogos partiendo el problema por anclas seguras
+
+    Primero se buscan anclas: segmentos cuyo texto normalizado coincide (por
+    hash, ignorando espacios) con una línea que aparece una sola vez en el
+    guion y una sola vez en la transcripción. Las anclas que rompen el orden
+    se descartan. Los tramos entre anclas consecutivas se alinean por
+    separado con align_segments, en un pool de procesos, y se unen. El coste
+    depende del tramo más largo y no del episodio completo.
+
+    Args:
+        segments (List[Dict[str, Any]]): Segmentos de Whisper (text, start, end)
+        dialogues (List[Dict[str, str]]): Diálogos devueltos por read_script
+        threshold (float): Similitud mínima para aceptar una coincidencia
+        workers (int): Procesos en paralelo (0 = uno por núcleo, 1 = en este proceso)
+        backend (str): Backend de similitud, como en utils.similar
+        progress_callback (Optional[Callable]): Recibe (tramos terminados, total)
+
+    Returns:
+        List[Dict[str, Any]]: Coincidencias en orden con index, start y end
+    """
+    if not segments or not dialogues:
+        return []
+
+    anchors = find_anchors(segments, dialogues)
+    matches = [
+        {"index": j, "start": segments[i]["start"], "end": segments[i]["end"]}
+        for i, j in anchors
+    ]
+
+    gaps = _gaps(anchors, len(segments), len(dialogues))
+    total = len(gaps)
+    for done, (gap, gap_matches) in enumerate(_align_gaps(gaps, segments, dialogues,
+                                                          threshold, workers, backend), 1):
+        matches.extend(gap_matches)
+        if progress_callback is not None:
+            progress_callback(done, total)
+
+    matches.sort(key=lambda match: match["index"])
+    return matches
+
+
+def find_anchors(segments: List[Dict[str, Any]],
+                 dialogues: List[Dict[str, str]]) -> List[Tuple[int, int]]:
+    """
+    Pares (segmento, diálogo) de texto prácticamente idéntico y únicos en
+    ambos lados, en orden creciente en los dos
+
+    Args:
+        segments (List[Dict[str, Any]]): Segmentos de Whisper
+        dialogues (List[Dict[str, str]]): Diálogos del guion
+
+    Returns:
+        List[Tuple[int, int]]: Anclas ordenadas
+    """
+    dialogue_keys = _unique_keys(
+        # Parsed scripts already carry the normalized text
+        getattr(dialogue, "normalized", None) or normalize_text(dialogue["dialogue"])
+        for dialogue in dialogues
+    )
+    segment_keys = _unique_keys(normalize_text(segment["text"]) for segment in segments)
+
+    candidates = sorted(
+        (i, dialogue_keys[key]) for key, i in segment_keys.items() if key in dialogue_keys
+    )
+    return _longest_increasing(candidates)
+
+
+def _unique_keys(texts: Any) -> Dict[int, int]:
+    """Map the anchor key of every text that occurs exactly once to its position"""
+    positions: Dict[int, int] = {}
+    repeated = set()
+    for position, normalized in enumerate(texts):
+        # Ignoring spaces also pairs "every one" with "everyone"
+        compact = normalized.replace(" ", "")
+        if len(compact) < MIN_ANCHOR_CHARS:
+            continue
+        key = text_hash(compact)
+        if key in positions:
+            repeated.add(key)
+        positions[key] = position
+    for key in repeated:
+        del positions[key]
+    return positions
+
+
+def _longest_increasing(pairs: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    Longest subsequence of (segment, dialogue) pairs, sorted by segment,
+    whose dialogue indices also increase (patience sorting)
+    """
+    tails: List[int] = []
+    tail_positions: List[int] = []
+    previous = [-1] * len(pairs)
+    for position, (_, dialogue_index) in enumerate(pairs):
+        length = bisect_left(tails, dialogue_index)
+        if length == len(tails):
+            tails.append(dialogue_index)
+            tail_positions.append(position)
+        else:
+            tails[length] = dialogue_index
+            tail_positions[length] = position
+        previous[position] = tail_positions[length - 1] if length else -1
+
+    chain = []
+    position = tail_positions[-1] if tail_positions else -1
+    while position >= 0:
+        chain.append(pairs[position])
+        position = previous[position]
+    chain.reverse()
+    return chain
+
+
+def _gaps(anchors: List[Tuple[int, int]], n_segments: int,
+          n_dialogues: int) -> List[Tuple[int, int, int, int]]:
+    """(segment start, segment end, dialogue start, dialogue end) between anchors"""
+    bounds = [(-1, -1)] + anchors + [(n_segments, n_dialogues)]
+    gaps = []
+    for (seg_before, dlg_before), (seg_after, dlg_after) in zip(bounds, bounds[1:]):
+        if seg_after - seg_before > 1 and dlg_after - dlg_before > 1:
+            gaps.append((seg_before + 1, seg_after, dlg_before + 1, dlg_after))
+    return gaps
+
+
+def _align_gaps(gaps: List[Tuple[int, int, int, int]],
+                segments: List[Dict[str, Any]],
+                dialogues: List[Dict[str, str]],
+                threshold: float,
+                workers: int,
+                backend: str) -> Iterator[Tuple[Tuple[int, int, int, int], List[Dict[str, Any]]]]:
+    """
+    Yield (gap, matches) for every gap, largest gaps first in the pool
+
+    Small gaps are cheaper to align here than to send to another process.
+    """
+    # Send only what the alignment reads to the pool processes
+    segment_dicts = [{"text": segment["text"], "start": segment["start"], "end": segment["end"]}
+                     for segment in segments]
+    dialogue_dicts = [{"dialogue": dialogue["dialogue"]} for dialogue in dialogues]
+
+    def task(gap: Tuple[int, int, int, int]) -> tuple:
+        seg_start, seg_end, dlg_start, dlg_end = gap
+        return (segment_dicts[seg_start:seg_end], dialogue_dicts[dlg_start:dlg_end],
+                dlg_start, threshold, backend)
+
+    pooled = [gap for gap in gaps if _cells(gap) >= MIN_POOLED_CELLS]
+    local = [gap for gap in gaps if _cells(gap) < MIN_POOLED_CELLS]
+    workers = min(workers or os.cpu_count() or 1, len(pooled))
+    if workers <= 1:
+        local, pooled = gaps, []
+
+    if pooled:
+        # spawn: forking after Numba or torch started their thread pools can
+        # leave the children deadlocked
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context("spawn")) as executor:
+            # Longest gaps first so the slowest one starts immediately
+            futures = {
+                executor.submit(_align_gap, *task(gap)): gap
+                for gap in sorted(pooled, key=_cells, reverse=True)
+            }
+            for gap in local:
+                yield gap, _align_gap(*task(gap))
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+    else:
+        for gap in local:
+            yield gap, _align_gap(*task(gap))
+
+
+def _cells(gap: Tuple[int, int, int, int]) -> int:
+    """Size of a gap's alignment table"""
+    seg_start, seg_end, dlg_start, dlg_end = gap
+    return (seg_end - seg_start) * (dlg_end - dlg_start)
+
+
+def _align_gap(segments: List[Dict[str, Any]], dialogues: List[Dict[str, str]],
+               dialogue_offset: int, threshold: float, backend: str) -> List[Dict[str, Any]]:
+    """Align one gap and shift its dialogue indices back to the whole script"""
+    matches = align_segments(segments, dialogues, threshold=threshold, backend=backend)
+    for match in matches:
+        match["index"] += dialogue_offset
+    return matches
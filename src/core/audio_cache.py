@@ -0,0 +1,125 @@
+import os
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+from src.core.utils import hash_file, remove_quietly
+
+
+# Whisper input format
+SAMPLE_RATE = 16000
+
+
+class AudioCache:
+    """
+    Caché en disco del audio decodificado a 16 kHz mono float32
+
+    Cada archivo de audio se decodifica con ffmpeg una sola vez y se guarda
+    como .npy con el hash de su contenido como nombre. Las lecturas devuelven
+    un np.memmap, de modo que recortar fragmentos no copia el audio completo
+    y varios procesos comparten las mismas páginas. Expulsión LRU por tamaño,
+    como TranscriptionCache.
+    """
+    # Constants
+    DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sync_script", "audio")
+    DEFAULT_MAX_BYTES = 4 * 1024 * 1024 * 1024
+    ENTRY_SUFFIX = ".npy"
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 decoder: Optional[Callable[[str], np.ndarray]] = None):
+        """
+        Args:
+            cache_dir (Optional[str]): Directorio de la caché
+            max_bytes (int): Tamaño máximo de la caché en bytes
+            decoder (Optional[Callable]): Decodifica una ruta a float32 a 16 kHz;
+                por defecto whisper.load_audio
+        """
+        self.cache_dir = cache_dir or self.DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self.decoder = decoder or _decode_with_whisper
+        Path(self.cache_dir).mkdir(parents=True, exist_ok=True)
+
+    def load(self, audio_path: str) -> np.ndarray:
+        """
+        Devuelve el audio decodificado, decodificándolo solo si no está en caché
+
+        Args:
+            audio_path (str): Ruta al archivo de audio (MP3, M4A, WAV...)
+
+        Returns:
+            np.ndarray: np.memmap float32 a 16 kHz (copia en escritura)
+        """
+        entry_path = self.entry_path(audio_path)
+        audio = self._open(entry_path)
+        if audio is not None:
+            return audio
+
+        samples = np.ascontiguousarray(self.decoder(audio_path), dtype=np.float32)
+        temp_path = f"{entry_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            np.save(f, samples)
+        os.replace(temp_path, entry_path)
+        self._evict(keep=entry_path)
+
+        audio = self._open(entry_path)
+        return audio if audio is not None else samples
+
+    def entry_path(self, audio_path: str) -> str:
+        """
+        Ruta del archivo .npy que corresponde a un audio
+
+        Args:
+            audio_path (str): Ruta al archivo de audio
+
+        Returns:
+            str: Ruta dentro del directorio de la caché
+        """
+        return os.path.join(self.cache_dir, f"{hash_file(audio_path)}_{SAMPLE_RATE}{self.ENTRY_SUFFIX}")
+
+    def clear(self) -> None:
+        """Elimina todas las entradas de la caché"""
+        for entry in self._entries():
+            remove_quietly(entry.path)
+
+    def _open(self, entry_path: str) -> Optional[np.ndarray]:
+        """Memory-map a cache entry and mark it as recently used"""
+        try:
+            # Copy-on-write keeps the array writable (torch.from_numpy warns
+            # about read-only arrays) without ever touching the file
+            audio = np.load(entry_path, mmap_mode='c')
+            os.utime(entry_path)
+            return audio
+        except (OSError, ValueError):
+            return None
+
+    def _entries(self) -> list:
+        """List the cache entry files"""
+        with os.scandir(self.cache_dir) as it:
+            return [entry for entry in it
+                    if entry.is_file() and entry.name.endswith(self.ENTRY_SUFFIX)]
+
+    def _evict(self, keep: str) -> None:
+        """Remove least recently used entries, except keep, until the cache fits max_bytes"""
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            remove_quietly(path)
+            total_size -= size
+
+
+def _decode_with_whisper(audio_path: str) -> np.ndarray:
+    """Decode with ffmpeg through Whisper's loader"""
+    import whisper
+    return whisper.load_audio(audio_path, sr=SAMPLE_RATE)
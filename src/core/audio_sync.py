@@ -1,210 +1,173 @@
-import json
-import whisper
-import torch
-from typing import Dict, List, Set, Any
-from PyQt5.QtCore import QThread, pyqtSignal
+import threading
+from typing import Dict, Any, Optional
+from PyQt5.QtCore import QThread, QTimer, pyqtSignal
 
-from src.core.script_parser import read_script
-from src.core.utils import seconds_to_timecode, similar
+from src.core.event_channel import EventChannel
+from src.core.export import export_excel, save_json
+from src.core.pipeline import SyncCancelled, SyncPipeline
+from src.core.sync_engine import SyncEngine, acquire_engine, release_engine
+from src.core.tracing import Tracer
 
 
 class SyncWorker(QThread):
     """
     Worker thread para procesar la sincronización de audio y guion
+    
+    Adaptador del proceso motor (SyncEngine): el pipeline se ejecuta en otro
+    proceso y este hilo solo espera sus mensajes, de modo que la ventana no
+    compite por el GIL con la transcripción ni con el emparejamiento. Los
+    mensajes del motor se escriben en un EventChannel que un
+    QTimer del hilo de la interfaz vacía cada FLUSH_INTERVAL_MS, así que las
+    señales llegan agrupadas (varios mensajes por progress_update, solo los
+    porcentajes que cambian) en lugar de una por evento. El resultado se
+    emite después del último vaciado, en orden con los mensajes.
+    cancel() detiene la transcripción al terminar el fragmento en curso.
+    Cada worker usa el perfil de inferencia de sus opciones
+    ("inference_profile"), de modo que el modelo, la cuantización y la
+    búsqueda se eligen por trabajo.
     """
-    progress_update = pyqtSignal(str)
+    progress_update = pyqtSignal(str)  # Uno o varios mensajes separados por saltos de línea
     progress_percent = pyqtSignal(int)  # Nueva señal para porcentaje de progreso
+    partial_results = pyqtSignal(list)  # Filas sincronizadas en modo streaming
     finished_signal = pyqtSignal(dict)
     error_signal = pyqtSignal(str)
+    cancelled_signal = pyqtSignal()
     
-    # Constants
-    SIMILARITY_THRESHOLD = 0.5
-    WHISPER_MODEL = "large-v3-turbo"
-    DEFAULT_LANGUAGE = "en"
+    FLUSH_INTERVAL_MS = 100
     
-    def __init__(self, audio_path: str, script_path: str):
+    def __init__(self, audio_path: str, script_path: str, 
+                 options: Optional[Dict[str, Any]] = None):
         super().__init__()
         self.audio_path = audio_path
         self.script_path = script_path
+        self.options = options
+        self.channel = EventChannel()
+        # Not run here: it validates the options and receives the engine's
+        # stats and stage timings, for report_profile() and the exporters
+        self.pipeline = SyncPipeline(
+            audio_path, 
+            script_path, 
+            options, 
+            on_log=self.progress_update.emit
+        )
+        self._outcome: Optional[tuple] = None
+        self._engine: Optional[SyncEngine] = None
+        self._cancel_requested = False
+        self._cancel_lock = threading.Lock()
+        
+        # The worker object lives in the GUI thread, and so does its timer
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self._flush)
+        self.started.connect(self._flush_timer.start)
+        self.finished.connect(self._report_outcome)
         
     def run(self) -> None:
         try:
-            self._initialize_progress()
-            device = self._get_device()
-            model = self._load_whisper_model(device)
-            transcription = self._transcribe_audio(model, device)
-            dialogues = self._load_script()
-            json_data = self._create_json_structure()
-            
-            matched_dialogues = self._process_segments(transcription, dialogues, json_data)
-            self._add_unmatched_dialogues(dialogues, matched_dialogues, json_data)
-            self._finalize_results(dialogues, matched_dialogues, json_data)
-            
+            engine = acquire_engine()
         except Exception as e:
-            self.error_signal.emit(f"Ha ocurrido un error: {str(e)}")
-    
-    def _initialize_progress(self) -> None:
-        """Initialize progress indicators"""
-        self.progress_percent.emit(0)
-        self.progress_update.emit("Iniciando procesamiento...")
-    
-    def _get_device(self) -> str:
-        """Determine the processing device (CPU or CUDA)"""
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.progress_update.emit(f"Usando dispositivo: {device}")
-        return device
+            self._outcome = (self.error_signal, f"No se pudo iniciar el motor de sincronización: {str(e)}")
+            return
+        with self._cancel_lock:
+            self._engine = engine
+            if self._cancel_requested:
+                engine.cancel()
+        try:
+            result = engine.run(
+                self.audio_path, 
+                self.script_path, 
+                self.options, 
+                on_log=self.channel.log, 
+                on_progress=self.channel.progress,
+                on_partial=self.channel.partial
+            )
+            self.pipeline.stats = result["stats"]
+            self.pipeline.tracer.add_records(result["spans"])
+            self._outcome = (self.finished_signal, result["json_data"])
+        except SyncCancelled:
+            self._outcome = (self.cancelled_signal,)
+        except Exception as e:
+            self._outcome = (self.error_signal, f"Ha ocurrido un error: {str(e)}")
+        finally:
+            with self._cancel_lock:
+                self._engine = None
+            release_engine(engine)
     
-    def _load_whisper_model(self, device: str) -> Any:
-        """Load the Whisper model"""
-        self.progress_percent.emit(5)
-        self.progress_update.emit("Cargando modelo Whisper...")
-        
-        # Check if model exists in user's cache directory
-        import os
-        from pathlib import Path
-        
-        # Get the whisper cache directory
-        cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "whisper")
-        Path(cache_dir).mkdir(parents=True, exist_ok=True)
-        
-        self.progress_update.emit(f"Buscando o descargando modelo en: {cache_dir}")
-        model = whisper.load_model(self.WHISPER_MODEL).to(device)
-        self.progress_percent.emit(10)
-        return model
+    def cancel(self) -> None:
+        """Pide la cancelación cooperativa de la sincronización (desde cualquier hilo)"""
+        with self._cancel_lock:
+            self._cancel_requested = True
+            if self._engine is not None:
+                self._engine.cancel()
     
-    def _transcribe_audio(self, model: Any, device: str) -> Dict[str, Any]:
-        """Transcribe the audio file using Whisper"""
-        self.progress_update.emit("Transcribiendo audio...")
-        result = model.transcribe(
-            self.audio_path,
-            fp16=(device == "cuda"),
-            language=self.DEFAULT_LANGUAGE,
-            verbose=False
-        )
-        self.progress_percent.emit(50)
-        return result
+    def _flush(self) -> None:
+        """Emit everything the pipeline reported since the last flush"""
+        events = self.channel.drain()
+        if events["partials"]:
+            self.partial_results.emit(events["partials"])
+        if events["lines"]:
+            self.progress_update.emit("\n".join(events["lines"]))
+        if events["percent"] is not None:
+            self.progress_percent.emit(events["percent"])
     
-    def _load_script(self) -> List[Dict[str, str]]:
-        """Load and parse the script file"""
-        self.progress_update.emit("Leyendo guion...")
-        dialogues = read_script(self.script_path)
-        self.progress_percent.emit(55)
-        return dialogues
+    def _report_outcome(self) -> None:
+        """After the thread stops: final flush, then the result signal"""
+        self._flush_timer.stop()
+        self._flush()
+        if self._outcome is not None:
+            signal, *arguments = self._outcome
+            signal.emit(*arguments)
+
+
+class ExportWorker(QThread):
+    """
+    Worker thread que guarda los resultados en JSON y/o Excel
     
-    def _create_json_structure(self) -> Dict[str, Any]:
-        """Create the base JSON structure for results"""
-        return {
-            "header": {
-                "reference_number": "000000",
-                "product_name": "PAW PATROL",
-                "chapter_number": "01",
-                "type": "Animacion"
-            },
-            "data": []
-        }
+    Escribe directamente desde los datos de la sincronización, sin leer la
+    tabla de resultados, para que la ventana no se bloquee en episodios largos.
+    Cada formato se intenta por separado: un error en uno no impide el otro.
+    """
+    progress_update = pyqtSignal(str)
+    error_signal = pyqtSignal(str, str)  # (formato, mensaje)
+    finished_signal = pyqtSignal(dict)  # Rutas escritas por formato
     
-    def _process_segments(self, transcription: Dict[str, Any], 
-                          dialogues: List[Dict[str, str]], 
-                          json_data: Dict[str, Any]) -> Set[int]:
-        """Process each transcribed segment and match with dialogues"""
-        matched_dialogues = set()
-        
-        self.progress_update.emit("Sincronizando segmentos...")
-        total_segments = len(transcription["segments"])
-        
-        for segment_idx, segment in enumerate(transcription["segments"]):
-            # Update progress (55% to 90%)
-            progress = 55 + int((segment_idx / total_segments) * 35)
-            self.progress_percent.emit(progress)
-            
-            if segment_idx % 5 == 0:
-                self.progress_update.emit(f"Procesando segmento {segment_idx+1} de {total_segments}...")
-            
-            text = segment["text"].strip()
-            start_time = segment["start"]
-            end_time = segment["end"]
-            
-            best_match = self._find_best_dialogue_match(text, dialogues, matched_dialogues)
-            
-            if best_match["score"] > self.SIMILARITY_THRESHOLD and best_match["index"] >= 0:
-                self._add_matched_dialogue(
-                    json_data, 
-                    best_match["index"], 
-                    start_time, 
-                    end_time, 
-                    dialogues
-                )
-                matched_dialogues.add(best_match["index"])
-        
-        return matched_dialogues
+    FORMAT_JSON = "json"
+    FORMAT_EXCEL = "excel"
     
-    def _find_best_dialogue_match(self, text: str, 
-                                 dialogues: List[Dict[str, str]], 
-                                 matched_dialogues: Set[int]) -> Dict[str, Any]:
-        """Find the best matching dialogue for a transcribed segment"""
-        best_match_score = 0
-        best_match_index = -1
-        
-        for i in range(len(dialogues)):
-            if i not in matched_dialogues:
-                script_line = dialogues[i]["dialogue"]
-                similarity = similar(text, script_line)
-                
-                if similarity > best_match_score:
-                    best_match_score = similarity
-                    best_match_index = i
+    def __init__(self, json_data: Dict[str, Any], 
+                 json_path: Optional[str] = None, 
+                 excel_path: Optional[str] = None,
+                 tracer: Optional[Tracer] = None):
+        super().__init__()
+        self.json_data = json_data
+        self.json_path = json_path
+        self.excel_path = excel_path
+        self.tracer = tracer or Tracer(enabled=False)
         
-        return {
-            "score": best_match_score,
-            "index": best_match_index
-        }
-    
-    def _add_matched_dialogue(self, json_data: Dict[str, Any], 
-                             dialogue_index: int, 
-                             start_time: float, 
-                             end_time: float,
-                             dialogues: List[Dict[str, str]]) -> None:
-        """Add a matched dialogue to the JSON data"""
-        entry = {
-            "ID": dialogue_index,
-            "IN": seconds_to_timecode(start_time),
-            "OUT": seconds_to_timecode(end_time),
-            "PERSONAJE": dialogues[dialogue_index]["character"],
-            "DIÁLOGO": dialogues[dialogue_index]["dialogue"],
-            "SCENE": 1
-        }
-        json_data["data"].append(entry)
-    
-    def _add_unmatched_dialogues(self, dialogues: List[Dict[str, str]], 
-                                matched_dialogues: Set[int], 
-                                json_data: Dict[str, Any]) -> None:
-        """Add unmatched dialogues with default timestamps"""
-        self.progress_percent.emit(90)
-        self.progress_update.emit("Añadiendo diálogos no coincidentes...")
+    def run(self) -> None:
+        written = {}
         
-        for i in range(len(dialogues)):
-            if i not in matched_dialogues:
-                entry = {
-                    "ID": i,
-                    "IN": "00:00:00:00",
-                    "OUT": "00:00:00:00",
-                    "PERSONAJE": dialogues[i]["character"],
-                    "DIÁLOGO": dialogues[i]["dialogue"],
-                    "SCENE": 1
-                }
-                json_data["data"].append(entry)
+        if self.json_path:
+            try:
+                with self.tracer.span("save_json"):
+                    save_json(self.json_data, self.json_path)
+                written[self.FORMAT_JSON] = self.json_path
+                self.progress_update.emit(f"Archivo JSON guardado en: {self.json_path}")
+            except Exception as e:
+                self.error_signal.emit(self.FORMAT_JSON, 
+                                       f"No se pudo guardar el archivo JSON: {str(e)}")
         
-        # Sort the data by ID to maintain script order
-        json_data["data"].sort(key=lambda x: x["ID"])
-    
-    def _finalize_results(self, dialogues: List[Dict[str, str]], 
-                         matched_dialogues: Set[int], 
-                         json_data: Dict[str, Any]) -> None:
-        """Finalize and emit the results"""
-        self.progress_percent.emit(95)
-        self.progress_update.emit(f"\nProcesados {len(dialogues)} diálogos")
-        self.progress_update.emit(f"Coincidentes: {len(matched_dialogues)}")
-        self.progress_update.emit(f"No coincidentes: {len(dialogues) - len(matched_dialogues)}")
+        if self.excel_path:
+            try:
+                with self.tracer.span("export_excel"):
+                    export_excel(self.json_data, self.excel_path)
+                written[self.FORMAT_EXCEL] = self.excel_path
+                self.progress_update.emit(f"Archivo Excel guardado en: {self.excel_path}")
+            except ImportError:
+                self.error_signal.emit(self.FORMAT_EXCEL, 
+                                       "Para exportar a Excel, necesita instalar openpyxl:\n"
+                                       "pip install openpyxl")
+            except Exception as e:
+                self.error_signal.emit(self.FORMAT_EXCEL, f"No se pudo exportar a Excel: {str(e)}")
         
-        self.progress_percent.emit(100)
-        self.finished_signal.emit(json_data)
+        self.finished_signal.emit(written)
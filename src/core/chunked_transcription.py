@@ -0,0 +1,319 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from src.core.job_queue import max_concurrent_transcriptions
+from src.core.vad import DEFAULT_PACK_GAP_SECONDS, concatenate_pack, map_segments
+
+
+# Whisper audio constants
+SAMPLE_RATE = 16000
+HOP_LENGTH = 160
+
+# Default chunking parameters
+DEFAULT_CHUNK_SECONDS = 60.0
+DEFAULT_OVERLAP_SECONDS = 1.0
+DEFAULT_SEARCH_SECONDS = 5.0
+ENERGY_FRAME_SECONDS = 0.02
+
+
+def find_chunk_regions(audio: np.ndarray,
+                       chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+                       search_seconds: float = DEFAULT_SEARCH_SECONDS,
+                       sample_rate: int = SAMPLE_RATE) -> List[Tuple[int, int]]:
+    """
+    Divide el audio en fragmentos de duración aproximada cortando en silencios
+
+    Cada corte se sitúa en la trama de menor energía dentro de una ventana de
+    ±search_seconds alrededor de la duración objetivo; solo se analiza la
+    energía de esas ventanas.
+
+    Args:
+        audio (np.ndarray): Audio mono float32
+        chunk_seconds (float): Duración objetivo de cada fragmento
+        search_seconds (float): Margen de búsqueda del punto de corte
+        sample_rate (int): Frecuencia de muestreo
+
+    Returns:
+        List[Tuple[int, int]]: Regiones (muestra inicial, muestra final) contiguas
+    """
+    total = len(audio)
+    chunk = int(chunk_seconds * sample_rate)
+    search = int(search_seconds * sample_rate)
+    frame = max(1, int(ENERGY_FRAME_SECONDS * sample_rate))
+
+    cuts = [0]
+    target = chunk
+    # Do not leave a final fragment shorter than a quarter of a chunk
+    while target + chunk // 4 < total:
+        lo = max(cuts[-1] + frame, target - search)
+        hi = min(total, target + search)
+        cuts.append(_quietest_point(audio, lo, hi, frame))
+        target = cuts[-1] + chunk
+    cuts.append(total)
+
+    return list(zip(cuts[:-1], cuts[1:]))
+
+
+def iter_chunk_segments(audio: np.ndarray,
+                        regions: List[Tuple[int, int]],
+                        model_name: str,
+                        device: str,
+                        language: str,
+                        decode_options: Dict[str, Any],
+                        overlap_seconds: float = DEFAULT_OVERLAP_SECONDS,
+                        workers: int = 0,
+                        model: Any = None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Genera, en orden, los segmentos con tiempos absolutos de cada región
+
+    Args:
+        audio (np.ndarray): Audio mono float32 a 16 kHz
+        regions (List[Tuple[int, int]]): Regiones contiguas del audio
+        model_name (str): Nombre del modelo Whisper
+        device (str): Dispositivo ("cpu" o "cuda")
+        language (str): Idioma de la transcripción
+        decode_options (Dict[str, Any]): Opciones adicionales de transcribe()
+        overlap_seconds (float): Contexto extra a cada lado de un fragmento
+        workers (int): Procesos en paralelo (0 = automático, 1 = en este proceso)
+        model (Any): Modelo ya cargado, usado cuando se trabaja en este proceso
+
+    Yields:
+        List[Dict[str, Any]]: Segmentos de una región
+    """
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    padded = [(max(0, start - overlap), min(len(audio), end + overlap)) for start, end in regions]
+    sources = [_chunk_source(audio, pad_start, pad_end) for pad_start, pad_end in padded]
+    transcriptions = iter_transcribed_sources(
+        sources, model_name, device, language, decode_options, workers, model
+    )
+    for raw, (start, end), (pad_start, _) in zip(transcriptions, regions, padded):
+        yield stitch_segments(raw, start, end, pad_start)
+
+
+def iter_pack_segments(audio: np.ndarray,
+                       packs: List[List[Tuple[int, int]]],
+                       model_name: str,
+                       device: str,
+                       language: str,
+                       decode_options: Dict[str, Any],
+                       gap_seconds: float = DEFAULT_PACK_GAP_SECONDS,
+                       workers: int = 0,
+                       model: Any = None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Genera, en orden, los segmentos con tiempos absolutos de cada paquete de voz
+
+    Las regiones de cada paquete (ver vad.pack_regions) se transcriben como un
+    solo audio separadas por gap_seconds de silencio, y los tiempos se llevan
+    de vuelta a la línea de tiempo original.
+
+    Args:
+        audio (np.ndarray): Audio mono float32 a 16 kHz
+        packs (List[List[Tuple[int, int]]]): Paquetes de regiones de voz
+        model_name (str): Nombre del modelo Whisper
+        device (str): Dispositivo ("cpu" o "cuda")
+        language (str): Idioma de la transcripción
+        decode_options (Dict[str, Any]): Opciones adicionales de transcribe()
+        gap_seconds (float): Silencio entre regiones de un paquete
+        workers (int): Procesos en paralelo (0 = automático, 1 = en este proceso)
+        model (Any): Modelo ya cargado, usado cuando se trabaja en este proceso
+
+    Yields:
+        List[Dict[str, Any]]: Segmentos de un paquete
+    """
+    concatenated = [concatenate_pack(audio, pack, gap_seconds) for pack in packs]
+    transcriptions = iter_transcribed_sources(
+        [samples for samples, _ in concatenated],
+        model_name, device, language, decode_options, workers, model
+    )
+    for raw, (_, timeline) in zip(transcriptions, concatenated):
+        yield map_segments(raw, timeline)
+
+
+def iter_transcribed_sources(sources: List[Any],
+                             model_name: str,
+                             device: str,
+                             language: str,
+                             decode_options: Dict[str, Any],
+                             workers: int = 0,
+                             model: Any = None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Transcribe fragmentos de audio, en este proceso o en un pool, y genera
+    en orden sus segmentos relativos
+
+    Args:
+        sources (List[Any]): Muestras de cada fragmento, o (ruta .npy, inicio, fin)
+        model_name (str): Nombre del modelo Whisper
+        device (str): Dispositivo ("cpu" o "cuda")
+        language (str): Idioma de la transcripción
+        decode_options (Dict[str, Any]): Opciones adicionales de transcribe()
+        workers (int): Procesos en paralelo (0 = automático, 1 = en este proceso)
+        model (Any): Modelo ya cargado, usado cuando se trabaja en este proceso
+
+    Yields:
+        List[Dict[str, Any]]: Segmentos de un fragmento, con tiempos relativos a él
+    """
+    workers = workers or default_workers(len(sources), device)
+
+    if workers <= 1:
+        if model is None:
+            raise ValueError("Se necesita un modelo cargado para transcribir en este proceso")
+        for source in sources:
+            yield _transcribe_samples(model, _load_chunk(source), language, decode_options)
+        return
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    # spawn: the caller has usually started torch's (and Numba's) threads,
+    # and a forked child can inherit their locks held
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_initialize_chunk_worker,
+                             initargs=(model_name, device, threads)) as executor:
+        futures = [
+            executor.submit(_transcribe_in_worker, source, language, decode_options)
+            for source in sources
+        ]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            # Stopped early (cancelled or failed): drop the chunks not yet started
+            for future in futures:
+                future.cancel()
+
+
+def stitch_segments(segments: List[Dict[str, Any]], start: int, end: int,
+                    pad_start: int, sample_rate: int = SAMPLE_RATE) -> List[Dict[str, Any]]:
+    """
+    Lleva los segmentos de un fragmento a la línea de tiempo absoluta y descarta
+    los que pertenecen al solapamiento con los fragmentos vecinos
+
+    Un segmento se conserva si su punto medio cae dentro de la región propia
+    [start, end), de modo que cada frase solapada queda en un único fragmento.
+
+    Args:
+        segments (List[Dict[str, Any]]): Segmentos relativos al fragmento con margen
+        start (int): Primera muestra de la región propia
+        end (int): Última muestra (exclusiva) de la región propia
+        pad_start (int): Primera muestra del fragmento con margen
+        sample_rate (int): Frecuencia de muestreo
+
+    Returns:
+        List[Dict[str, Any]]: Segmentos con start, end y seek absolutos
+    """
+    offset = pad_start / sample_rate
+    region_start = start / sample_rate
+    region_end = end / sample_rate
+
+    stitched = []
+    for segment in segments:
+        absolute_start = segment["start"] + offset
+        absolute_end = segment["end"] + offset
+        midpoint = (absolute_start + absolute_end) / 2
+        if not region_start <= midpoint < region_end:
+            continue
+        segment = dict(segment)
+        segment["start"] = absolute_start
+        segment["end"] = absolute_end
+        if "seek" in segment:
+            segment["seek"] += pad_start // HOP_LENGTH
+        stitched.append(segment)
+    return stitched
+
+
+def build_result(segments: List[Dict[str, Any]], language: str) -> Dict[str, Any]:
+    """
+    Compone un resultado con la forma del de Whisper a partir de segmentos absolutos
+
+    Args:
+        segments (List[Dict[str, Any]]): Segmentos en orden temporal
+        language (str): Idioma de la transcripción
+
+    Returns:
+        Dict[str, Any]: Resultado con text, segments (ids renumerados) y language
+    """
+    for segment_id, segment in enumerate(segments):
+        segment["id"] = segment_id
+    return {
+        "text": "".join(segment["text"] for segment in segments),
+        "segments": segments,
+        "language": language
+    }
+
+
+def default_workers(chunk_count: int, device: str = "cpu") -> int:
+    """
+    Number of worker processes used when none is configured
+
+    Every worker holds its own copy of the model, so the count is capped
+    like concurrent jobs (cores and free memory). On CUDA the copies would
+    share, and could exhaust, one GPU, so chunks run in this process.
+    """
+    if device == "cuda":
+        return 1
+    return max(1, min(chunk_count, max_concurrent_transcriptions()))
+
+
+def _quietest_point(audio: np.ndarray, lo: int, hi: int, frame: int) -> int:
+    """Centre sample of the lowest-energy frame within audio[lo:hi]"""
+    n_frames = max(1, (hi - lo) // frame)
+    window = audio[lo:lo + n_frames * frame]
+    if len(window) < n_frames * frame:
+        return (lo + hi) // 2
+    energy = np.square(window.reshape(n_frames, frame), dtype=np.float32).mean(axis=1)
+    return lo + int(np.argmin(energy)) * frame + frame // 2
+
+
+def _chunk_source(audio: np.ndarray, start: int, end: int) -> Any:
+    """
+    What a pool task needs to read audio[start:end]
+
+    A memory-mapped cache file is sent as (path, start, end) so the worker
+    maps the same pages instead of receiving a pickled copy of the samples.
+    """
+    filename = getattr(audio, "filename", None)
+    if isinstance(audio, np.memmap) and filename and audio.ndim == 1:
+        return filename, start, end
+    return np.ascontiguousarray(audio[start:end])
+
+
+def _load_chunk(source: Any) -> np.ndarray:
+    """Samples of a chunk sent by _chunk_source"""
+    if isinstance(source, tuple):
+        path, start, end = source
+        return np.load(path, mmap_mode='c')[start:end]
+    return source
+
+
+def _transcribe_samples(model: Any, samples: np.ndarray, language: str,
+                        decode_options: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Transcribe one chunk and return its relative segments"""
+    result = model.transcribe(samples, language=language, verbose=None, **decode_options)
+    return result["segments"]
+
+
+_worker_model: Any = None
+
+
+def _initialize_chunk_worker(model_name: str, device: str, threads: int) -> None:
+    """Pool initializer: size torch's thread pools and load the model once per process"""
+    global _worker_model
+    import torch
+    from src.core.model_registry import get_model_registry
+
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Interop threads can only be set before the first parallel operation
+        pass
+    _worker_model = get_model_registry().acquire(model_name, device)
+
+
+def _transcribe_in_worker(source: Any, language: str,
+                          decode_options: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Pool task: transcribe one chunk with the process's model"""
+    return _transcribe_samples(_worker_model, _load_chunk(source), language, decode_options)
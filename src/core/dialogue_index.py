@@ -0,0 +1,90 @@
+import heapq
+from collections import Counter
+from typing import Dict, List, Optional, Set
+
+from src.core.utils import normalize_text
+
+
+class DialogueIndex:
+    """
+    Índice invertido de n-gramas de caracteres y palabras sobre los diálogos
+    del guion, usado para preseleccionar candidatos antes de similar()
+    """
+    # Constants
+    NGRAM_SIZE = 3
+    DEFAULT_CANDIDATES = 10
+    # Grams present in more than this fraction of dialogues carry no signal
+    MAX_POSTING_FRACTION = 0.5
+
+    def __init__(self, dialogues: List[Dict[str, str]], ngram_size: int = NGRAM_SIZE):
+        self.ngram_size = ngram_size
+        self.size = len(dialogues)
+        self._postings: Dict[str, List[int]] = {}
+
+        for dialogue_id, dialogue in enumerate(dialogues):
+            # Parsed scripts already carry the normalized text
+            normalized = getattr(dialogue, "normalized", None)
+            if normalized is None:
+                normalized = normalize_text(dialogue["dialogue"])
+            for gram in self._normalized_grams(normalized):
+                self._postings.setdefault(gram, []).append(dialogue_id)
+
+        self._drop_common_grams()
+
+    def candidates(self, text: str, k: int = DEFAULT_CANDIDATES,
+                   exclude: Optional[Set[int]] = None) -> List[int]:
+        """
+        Devuelve los k diálogos que comparten más n-gramas con el texto
+
+        Args:
+            text (str): Texto del segmento transcrito
+            k (int): Número máximo de candidatos
+            exclude (Optional[Set[int]]): Diálogos que no deben devolverse
+
+        Returns:
+            List[int]: Índices de diálogo ordenados por solapamiento descendente
+        """
+        overlap: Counter = Counter()
+        for gram in self._extract_grams(text):
+            posting = self._postings.get(gram)
+            if posting:
+                overlap.update(posting)
+
+        if exclude:
+            ranked = ((count, -dialogue_id) for dialogue_id, count in overlap.items()
+                      if dialogue_id not in exclude)
+        else:
+            ranked = ((count, -dialogue_id) for dialogue_id, count in overlap.items())
+
+        # Ties favour the earliest dialogue in the script
+        return [-negated_id for _, negated_id in heapq.nlargest(k, ranked)]
+
+    def _extract_grams(self, text: str) -> Set[str]:
+        """
+        Extract the distinct word tokens and padded character n-grams of a text
+
+        Args:
+            text (str): Raw text
+
+        Returns:
+            Set[str]: Distinct grams; word tokens are prefixed to keep them apart
+        """
+        return self._normalized_grams(normalize_text(text))
+
+    def _normalized_grams(self, normalized: str) -> Set[str]:
+        """Grams of a text that is already normalized"""
+        grams = {f"w:{word}" for word in normalized.split()}
+
+        padded = f" {normalized} "
+        size = self.ngram_size
+        grams.update(padded[i:i + size] for i in range(len(padded) - size + 1))
+        return grams
+
+    def _drop_common_grams(self) -> None:
+        """Remove grams whose posting lists cover too much of the script"""
+        if self.size < 2:
+            return
+        limit = self.size * self.MAX_POSTING_FRACTION
+        common = [gram for gram, posting in self._postings.items() if len(posting) > limit]
+        for gram in common:
+            del self._postings[gram]
@@ -0,0 +1,146 @@
+from typing import List, Tuple
+
+import numpy as np
+from numba import njit, prange
+
+
+def encode_text(text: str) -> np.ndarray:
+    """
+    Codifica un texto en minúsculas como array de puntos de código int32
+
+    Args:
+        text (str): Texto original
+
+    Returns:
+        np.ndarray: Array int32 con un elemento por carácter
+    """
+    return np.frombuffer(text.lower().encode("utf-32-le"), dtype=np.int32).copy()
+
+
+def encode_texts(texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Codifica varios textos en un único buffer contiguo
+
+    Args:
+        texts (List[str]): Textos originales
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (buffer int32, offsets int64 de longitud n + 1);
+        el texto i ocupa buffer[offsets[i]:offsets[i + 1]]
+    """
+    encoded = [encode_text(text) for text in texts]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        offsets[1:] = np.cumsum([len(item) for item in encoded])
+        buffer = np.concatenate(encoded)
+    else:
+        buffer = np.zeros(0, dtype=np.int32)
+    return buffer, offsets
+
+
+def indel_similarity(a: str, b: str) -> float:
+    """
+    Similitud normalizada de edición (solo inserciones y borrados) entre dos textos
+
+    Equivale a 2 * LCS / (len(a) + len(b)), la misma escala que
+    SequenceMatcher.ratio() pero con la subsecuencia común óptima. No es el
+    mismo valor: difflib encadena bloques comunes de forma voraz (y descarta
+    caracteres frecuentes en textos de 200 o más caracteres), así que su
+    ratio nunca supera a este y puede quedar hasta unas décimas por debajo.
+    Cerca del umbral este backend acepta algunos pares que difflib rechaza,
+    nunca al revés.
+
+    Args:
+        a (str): Primera cadena
+        b (str): Segunda cadena
+
+    Returns:
+        float: Valor de similitud entre 0 y 1
+    """
+    return _indel_ratio(encode_text(a), encode_text(b))
+
+
+def similarity_to_many(text: str, buffer: np.ndarray, offsets: np.ndarray,
+                       indices: np.ndarray) -> np.ndarray:
+    """
+    Puntúa un texto contra un subconjunto de textos codificados en paralelo
+
+    Args:
+        text (str): Texto de consulta
+        buffer (np.ndarray): Buffer devuelto por encode_texts
+        offsets (np.ndarray): Offsets devueltos por encode_texts
+        indices (np.ndarray): Índices (int64) de los textos a puntuar
+
+    Returns:
+        np.ndarray: Similitud float64 para cada índice, en el mismo orden
+    """
+    return _ratio_one_to_many(encode_text(text), buffer, offsets, indices)
+
+
+def similarity_all_pairs(a_texts: List[str], b_texts: List[str]) -> np.ndarray:
+    """
+    Puntúa todos los pares entre dos listas de textos en paralelo
+
+    Args:
+        a_texts (List[str]): Primera lista (filas)
+        b_texts (List[str]): Segunda lista (columnas)
+
+    Returns:
+        np.ndarray: Matriz float64 (len(a_texts) x len(b_texts))
+    """
+    a_buffer, a_offsets = encode_texts(a_texts)
+    b_buffer, b_offsets = encode_texts(b_texts)
+    return _ratio_all_pairs(a_buffer, a_offsets, b_buffer, b_offsets)
+
+
+@njit(cache=True, nogil=True)
+def _lcs_length(a: np.ndarray, b: np.ndarray) -> int:
+    """Length of the longest common subsequence using a single DP row"""
+    if len(a) < len(b):
+        a, b = b, a
+    row = np.zeros(len(b) + 1, dtype=np.int32)
+    for i in range(len(a)):
+        char = a[i]
+        diagonal = 0
+        for j in range(len(b)):
+            above = row[j + 1]
+            if char == b[j]:
+                row[j + 1] = diagonal + 1
+            elif row[j] > above:
+                row[j + 1] = row[j]
+            diagonal = above
+    return row[len(b)]
+
+
+@njit(cache=True, nogil=True)
+def _indel_ratio(a: np.ndarray, b: np.ndarray) -> float:
+    """Normalised InDel similarity, 1.0 for two empty texts like difflib"""
+    total = len(a) + len(b)
+    if total == 0:
+        return 1.0
+    return 2.0 * _lcs_length(a, b) / total
+
+
+@njit(cache=True, parallel=True)
+def _ratio_one_to_many(query: np.ndarray, buffer: np.ndarray, offsets: np.ndarray,
+                       indices: np.ndarray) -> np.ndarray:
+    """Score one encoded text against buffer texts selected by indices"""
+    scores = np.empty(len(indices), dtype=np.float64)
+    for k in prange(len(indices)):
+        i = indices[k]
+        scores[k] = _indel_ratio(query, buffer[offsets[i]:offsets[i + 1]])
+    return scores
+
+
+@njit(cache=True, parallel=True)
+def _ratio_all_pairs(a_buffer: np.ndarray, a_offsets: np.ndarray,
+                     b_buffer: np.ndarray, b_offsets: np.ndarray) -> np.ndarray:
+    """Score every text of the first buffer against every text of the second"""
+    n_rows = len(a_offsets) - 1
+    n_columns = len(b_offsets) - 1
+    scores = np.empty((n_rows, n_columns), dtype=np.float64)
+    for i in prange(n_rows):
+        a = a_buffer[a_offsets[i]:a_offsets[i + 1]]
+        for j in range(n_columns):
+            scores[i, j] = _indel_ratio(a, b_buffer[b_offsets[j]:b_offsets[j + 1]])
+    return scores
@@ -0,0 +1,72 @@
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+
+# Log lines kept between two drains; older ones are dropped and counted
+DEFAULT_MAX_PENDING_LINES = 1000
+
+
+class EventChannel:
+    """
+    Canal de eventos entre el hilo de la sincronización y la interfaz
+
+    Los callbacks de SyncPipeline escriben aquí sin emitir señales: los
+    mensajes van a un búfer circular acotado, del progreso solo se guarda el
+    último porcentaje y las filas parciales se acumulan. La interfaz vacía el
+    canal periódicamente con drain(), de modo que miles de eventos se
+    convierten en unas pocas actualizaciones por segundo.
+    """
+
+    def __init__(self, max_pending_lines: int = DEFAULT_MAX_PENDING_LINES):
+        """
+        Args:
+            max_pending_lines (int): Mensajes que se conservan entre dos vaciados
+        """
+        self._lock = threading.Lock()
+        self._lines: Deque[str] = deque(maxlen=max_pending_lines)
+        self._dropped = 0
+        self._percent: Optional[int] = None
+        self._sent_percent: Optional[int] = None
+        self._partials: List[Dict[str, Any]] = []
+
+    def log(self, message: str) -> None:
+        """Añade un mensaje (callback on_log)"""
+        with self._lock:
+            if len(self._lines) == self._lines.maxlen:
+                self._dropped += 1
+            self._lines.append(message)
+
+    def progress(self, percent: int) -> None:
+        """Registra el porcentaje actual (callback on_progress)"""
+        # A plain assignment is atomic; drain() reads it under the lock
+        self._percent = percent
+
+    def partial(self, entries: List[Dict[str, Any]]) -> None:
+        """Añade filas sincronizadas (callback on_partial)"""
+        with self._lock:
+            self._partials.extend(entries)
+
+    def drain(self) -> Dict[str, Any]:
+        """
+        Vacía el canal
+
+        Returns:
+            Dict[str, Any]: "lines" (mensajes pendientes, precedidos de un aviso
+            si se descartó alguno), "percent" (None si no ha cambiado desde el
+            último vaciado) y "partials" (filas nuevas)
+        """
+        with self._lock:
+            lines = list(self._lines)
+            self._lines.clear()
+            if self._dropped:
+                lines.insert(0, f"... ({self._dropped} mensajes omitidos)")
+                self._dropped = 0
+            partials = self._partials
+            self._partials = []
+            percent = self._percent
+            if percent == self._sent_percent:
+                percent = None
+            else:
+                self._sent_percent = percent
+        return {"lines": lines, "percent": percent, "partials": partials}
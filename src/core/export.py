@@ -0,0 +1,156 @@
+import json
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from src.core.timecode import Timecode, as_timecode, timecode_frames, timecode_strings
+
+
+# Export format
+DEFAULT_TIMECODE = "00:00:00:00"
+EXCEL_COLUMN_HEADERS = ["ID", "IN", "OUT", "PERSONAJE", "DIÁLOGO"]
+EXCEL_SHEET_NAME = "Sincronización"
+EXCEL_HIGHLIGHT_COLOR = "FFFF00"
+
+
+def save_json(json_data: Dict[str, Any], output_path: str) -> None:
+    """
+    Guarda los resultados de sincronización en un archivo JSON
+
+    Args:
+        json_data (Dict[str, Any]): Resultados de la sincronización
+        output_path (str): Ruta del archivo JSON
+    """
+    output = {**json_data, "data": with_timecode_strings(json_data.get("data", []))}
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=4, ensure_ascii=False)
+
+
+def export_excel(json_data: Dict[str, Any], file_path: str) -> None:
+    """
+    Exporta los resultados a un archivo Excel con las filas dudosas resaltadas
+
+    Usa el modo de solo escritura de openpyxl: las filas se generan
+    directamente a partir de los datos y no se guarda ninguna celda en memoria.
+
+    Args:
+        json_data (Dict[str, Any]): Resultados de la sincronización
+        file_path (str): Ruta del archivo XLSX
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import PatternFill
+    from openpyxl.utils import get_column_letter
+
+    data = json_data.get("data", [])
+    highlights = highlighted_rows(data)
+
+    # Valores y anchos en una sola pasada
+    rows = []
+    widths = [len(header) for header in EXCEL_COLUMN_HEADERS]
+    for item in with_timecode_strings(data):
+        row = _excel_row(item)
+        rows.append(row)
+        for col, value in enumerate(row):
+            if len(value) > widths[col]:
+                widths[col] = len(value)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(EXCEL_SHEET_NAME)
+
+    # Los anchos deben fijarse antes de escribir la primera fila
+    for col, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(col)].width = width + 2
+
+    yellow_fill = PatternFill(
+        start_color=EXCEL_HIGHLIGHT_COLOR,
+        end_color=EXCEL_HIGHLIGHT_COLOR,
+        fill_type="solid"
+    )
+
+    ws.append(EXCEL_COLUMN_HEADERS)
+    for row, highlighted in zip(rows, highlights):
+        if highlighted:
+            cells = []
+            for value in row:
+                cell = WriteOnlyCell(ws, value=value)
+                cell.fill = yellow_fill
+                cells.append(cell)
+            ws.append(cells)
+        else:
+            ws.append(row)
+
+    wb.save(file_path)
+
+
+def with_timecode_strings(data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Copia de las entradas con IN y OUT convertidos en cadenas HH:MM:SS:FF
+
+    Los Timecode de todas las filas se formatean de una vez.
+
+    Args:
+        data (List[Dict[str, Any]]): Entradas de la sincronización
+
+    Returns:
+        List[Dict[str, Any]]: Entradas listas para JSON o Excel
+    """
+    in_times = timecode_strings([item.get("IN", DEFAULT_TIMECODE) for item in data])
+    out_times = timecode_strings([item.get("OUT", DEFAULT_TIMECODE) for item in data])
+    return [
+        {**item, "IN": in_time, "OUT": out_time}
+        for item, in_time, out_time in zip(data, in_times, out_times)
+    ]
+
+
+def highlighted_rows(data: List[Dict[str, Any]]) -> List[bool]:
+    """
+    Indica qué filas deben resaltarse: las que no tienen tiempos asignados y
+    las que empiezan antes que la fila anterior
+
+    Las comparaciones se hacen en bloque sobre los fotogramas.
+
+    Args:
+        data (List[Dict[str, Any]]): Entradas de la sincronización en orden de guion
+
+    Returns:
+        List[bool]: Un valor por fila
+    """
+    if not data:
+        return []
+    in_frames = timecode_frames([item.get("IN", DEFAULT_TIMECODE) for item in data])
+    out_frames = timecode_frames([item.get("OUT", DEFAULT_TIMECODE) for item in data])
+    previous = np.concatenate((in_frames[:1], in_frames[:-1]))
+    flags = (in_frames == 0) | (out_frames == 0) | (in_frames < previous)
+    return flags.tolist()
+
+
+def row_needs_highlight(in_time: Union[Timecode, str], out_time: Union[Timecode, str],
+                        prev_in_time: Optional[Union[Timecode, str]]) -> bool:
+    """
+    Indica si una fila debe resaltarse: sin tiempos asignados o con un IN
+    anterior al de la fila previa del guion
+
+    Args:
+        in_time: IN de la fila (Timecode o cadena)
+        out_time: OUT de la fila
+        prev_in_time: IN de la fila anterior, si la hay
+
+    Returns:
+        bool: True si la fila debe resaltarse
+    """
+    in_time = as_timecode(in_time)
+    return (in_time.frames == 0 or
+            as_timecode(out_time).frames == 0 or
+            (prev_in_time is not None and in_time < as_timecode(prev_in_time)))
+
+
+def _excel_row(item: Dict[str, Any]) -> List[str]:
+    """Cell values of one result row, as shown in the results table"""
+    return [
+        str(item.get("ID", "")),
+        item.get("IN", DEFAULT_TIMECODE),
+        item.get("OUT", DEFAULT_TIMECODE),
+        item.get("PERSONAJE", ""),
+        item.get("DIÁLOGO", "")
+    ]
@@ -0,0 +1,180 @@
+from typing import Any, Dict, Optional, Tuple, Union
+
+
+# Suffix of the registry name of an int8-quantized model
+QUANTIZED_SUFFIX = "+int8"
+
+
+class InferenceProfile:
+    """
+    Configuración de la inferencia de Whisper: velocidad frente a precisión
+
+    Agrupa el tamaño del modelo, la cuantización int8 dinámica de las capas
+    Linear (solo en CPU), los hilos de torch y las opciones de búsqueda del
+    decodificador (beam_size, best_of). Los valores None dejan el
+    comportamiento por defecto de Whisper y torch.
+    """
+    FIELDS = ("model", "quantize", "threads", "interop_threads", "beam_size", "best_of")
+
+    def __init__(self, name: str, model: str, quantize: bool = False,
+                 threads: int = 0, interop_threads: int = 0,
+                 beam_size: Optional[int] = None, best_of: Optional[int] = None):
+        """
+        Args:
+            name (str): Nombre del perfil
+            model (str): Modelo Whisper ("small", "medium", "large-v3-turbo"...)
+            quantize (bool): Cuantizar a int8 las capas Linear al cargar en CPU
+            threads (int): Hilos de torch por operación (0 = los de torch)
+            interop_threads (int): Hilos de torch entre operaciones (0 = los de torch)
+            beam_size (Optional[int]): Anchura de la búsqueda en haz (None = voraz)
+            best_of (Optional[int]): Muestras por temperatura en los reintentos
+        """
+        self.name = name
+        self.model = model
+        self.quantize = quantize
+        self.threads = threads
+        self.interop_threads = interop_threads
+        self.beam_size = beam_size
+        self.best_of = best_of
+
+    def model_key(self, device: str) -> str:
+        """
+        Nombre del modelo en el registro de modelos
+
+        La variante cuantizada es otra entrada del registro; en CUDA no se
+        cuantiza y se usa el modelo original.
+
+        Args:
+            device (str): Dispositivo ("cpu" o "cuda")
+
+        Returns:
+            str: Nombre del modelo, con QUANTIZED_SUFFIX si se cuantiza
+        """
+        if self.quantize and device == "cpu":
+            return f"{self.model}{QUANTIZED_SUFFIX}"
+        return self.model
+
+    def decode_options(self) -> Dict[str, Any]:
+        """Opciones de búsqueda del decodificador que el perfil fija"""
+        options: Dict[str, Any] = {}
+        if self.beam_size is not None:
+            options["beam_size"] = self.beam_size
+        if self.best_of is not None:
+            options["best_of"] = self.best_of
+        return options
+
+    def apply_threads(self) -> None:
+        """Ajusta los hilos de torch de este proceso según el perfil"""
+        if not (self.threads or self.interop_threads):
+            return
+        import torch
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        if self.interop_threads:
+            try:
+                torch.set_num_interop_threads(self.interop_threads)
+            except RuntimeError:
+                # Interop threads can only be set before the first parallel operation
+                pass
+
+    def describe(self) -> str:
+        """Resumen legible del perfil para el registro de mensajes"""
+        details = [self.model]
+        if self.quantize:
+            details.append("int8 en CPU")
+        if self.beam_size is not None:
+            details.append(f"beam {self.beam_size}")
+        if self.best_of is not None:
+            details.append(f"best_of {self.best_of}")
+        if self.threads:
+            details.append(f"{self.threads} hilos")
+        return f"{self.name} ({', '.join(details)})"
+
+
+DEFAULT_PROFILE = "default"
+
+INFERENCE_PROFILES = {
+    # Whisper's own settings: fp32 on CPU, fp16 on CUDA
+    DEFAULT_PROFILE: InferenceProfile(DEFAULT_PROFILE, "large-v3-turbo"),
+    "cpu-accurate": InferenceProfile("cpu-accurate", "large-v3-turbo", quantize=True,
+                                     beam_size=5, best_of=5),
+    "cpu-balanced": InferenceProfile("cpu-balanced", "large-v3-turbo", quantize=True,
+                                     best_of=1),
+    "cpu-fast": InferenceProfile("cpu-fast", "small", quantize=True, best_of=1),
+}
+
+
+def get_inference_profile(spec: Union[None, str, Dict[str, Any], InferenceProfile] = None) -> InferenceProfile:
+    """
+    Devuelve el perfil de inferencia indicado en las opciones de un trabajo
+
+    Args:
+        spec: Nombre de un perfil de INFERENCE_PROFILES, diccionario con los
+            campos que cambian respecto a "base" (otro perfil, por defecto
+            DEFAULT_PROFILE), un InferenceProfile, o None para el perfil por defecto
+
+    Returns:
+        InferenceProfile: Perfil resuelto
+
+    Raises:
+        ValueError: Si el perfil no existe o el diccionario tiene campos desconocidos
+    """
+    if isinstance(spec, InferenceProfile):
+        return spec
+    if spec is None or isinstance(spec, str):
+        name = spec or DEFAULT_PROFILE
+        if name not in INFERENCE_PROFILES:
+            raise ValueError(f"Perfil de inferencia desconocido: {name} "
+                             f"(disponibles: {', '.join(INFERENCE_PROFILES)})")
+        return INFERENCE_PROFILES[name]
+
+    overrides = dict(spec)
+    base = get_inference_profile(overrides.pop("base", None))
+    unknown = set(overrides) - set(InferenceProfile.FIELDS) - {"name"}
+    if unknown:
+        raise ValueError(f"Campos desconocidos en el perfil de inferencia: {', '.join(sorted(unknown))}")
+    fields = {field: getattr(base, field) for field in InferenceProfile.FIELDS}
+    fields.update(overrides)
+    fields.setdefault("name", f"{base.name}*")
+    return InferenceProfile(**fields)
+
+
+def split_model_key(model_key: str) -> Tuple[str, bool]:
+    """
+    Separa el nombre de registro de un modelo en (modelo Whisper, cuantizado)
+
+    Args:
+        model_key (str): Nombre devuelto por InferenceProfile.model_key
+
+    Returns:
+        Tuple[str, bool]: (nombre del modelo, True si es la variante int8)
+    """
+    if model_key.endswith(QUANTIZED_SUFFIX):
+        return model_key[:-len(QUANTIZED_SUFFIX)], True
+    return model_key, False
+
+
+def quantize_model(model: Any) -> Any:
+    """
+    Cuantiza a int8 las capas Linear de un modelo Whisper en CPU
+
+    Los pesos pasan a int8 y las activaciones se cuantizan al vuelo, lo que
+    reduce a la cuarta parte la memoria de esas capas y acelera la
+    multiplicación de matrices en CPU.
+
+    Args:
+        model (Any): Modelo Whisper cargado en CPU
+
+    Returns:
+        Any: Modelo cuantizado
+    """
+    import torch
+
+    # Whisper's Linear subclasses nn.Linear only to cast weights to the input
+    # dtype; quantize_dynamic matches exact types, so expose them as nn.Linear
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear) and type(module) is not torch.nn.Linear:
+            module.__class__ = torch.nn.Linear
+    # In place: a copy would briefly hold a second fp32 model in memory
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8,
+                                               inplace=True)
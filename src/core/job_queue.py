@@ -0,0 +1,375 @@
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+# Job states
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+FINISHED_STATES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+# An owner that has not refreshed its running jobs for this long is gone
+HEARTBEAT_INTERVAL_SECONDS = 30.0
+HEARTBEAT_TIMEOUT_SECONDS = 120.0
+
+# Resident memory of one transcription with large-v3-turbo (model, audio, decoding)
+TRANSCRIPTION_MEMORY_BYTES = 6 * 1024 * 1024 * 1024
+CORES_PER_TRANSCRIPTION = 4
+
+
+class JobQueue:
+    """
+    Cola persistente de trabajos de sincronización en SQLite
+
+    Cada trabajo guarda audio, guion, salida, opciones, estado y artefactos
+    (archivos escritos y estadísticas). Cada operación abre su propia
+    conexión, así que la cola se puede usar desde varios hilos y procesos;
+    reclamar un trabajo es atómico. Un trabajo en ejecución guarda el PID
+    del proceso que lo reclamó y la hora de su último latido (heartbeat());
+    requeue_interrupted() solo devuelve a la cola los trabajos cuyo
+    propietario ha muerto o ha dejado de latir, no los de otra instancia
+    de la aplicación que sigue trabajando.
+    """
+    # Constants
+    DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".cache", "sync_script", "jobs.sqlite3")
+    BUSY_TIMEOUT_SECONDS = 10.0
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            audio TEXT NOT NULL,
+            script TEXT NOT NULL,
+            output TEXT NOT NULL,
+            options TEXT NOT NULL DEFAULT '{}',
+            state TEXT NOT NULL DEFAULT 'pending',
+            created REAL NOT NULL,
+            started REAL,
+            finished REAL,
+            error TEXT,
+            artifacts TEXT NOT NULL DEFAULT '{}',
+            owner_pid INTEGER,
+            heartbeat REAL
+        );
+        CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id);
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or self.DEFAULT_DB_PATH
+        Path(os.path.dirname(os.path.abspath(self.db_path))).mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection:
+            connection.executescript(self._SCHEMA)
+            self._add_missing_columns(connection)
+
+    def add(self, audio_path: str, script_path: str, output_path: str,
+            options: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Añade un trabajo pendiente al final de la cola
+
+        Args:
+            audio_path (str): Ruta al archivo de audio
+            script_path (str): Ruta al guion
+            output_path (str): Ruta del JSON de resultados
+            options (Optional[Dict[str, Any]]): Opciones de SyncPipeline
+
+        Returns:
+            int: Identificador del trabajo
+        """
+        with closing(self._connect()) as connection, connection:
+            cursor = connection.execute(
+                "INSERT INTO jobs (audio, script, output, options, state, created) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (os.path.abspath(audio_path), os.path.abspath(script_path),
+                 os.path.abspath(output_path), json.dumps(options or {}), JOB_PENDING, time.time())
+            )
+            return cursor.lastrowid
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Devuelve un trabajo
+
+        Args:
+            job_id (int): Identificador del trabajo
+
+        Returns:
+            Optional[Dict[str, Any]]: Trabajo o None si no existe
+        """
+        with closing(self._connect()) as connection:
+            row = connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row is not None else None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """Todos los trabajos en orden de llegada"""
+        with closing(self._connect()) as connection:
+            rows = connection.execute("SELECT * FROM jobs ORDER BY id").fetchall()
+        return [_row_to_job(row) for row in rows]
+
+    def claim_next(self) -> Optional[Dict[str, Any]]:
+        """
+        Marca como en ejecución el trabajo pendiente más antiguo y lo devuelve
+
+        Returns:
+            Optional[Dict[str, Any]]: Trabajo reclamado o None si no hay pendientes
+        """
+        with closing(self._connect()) as connection:
+            # Take the write lock before reading so two schedulers never claim the same job
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                "SELECT * FROM jobs WHERE state = ? ORDER BY id LIMIT 1", (JOB_PENDING,)
+            ).fetchone()
+            if row is None:
+                connection.rollback()
+                return None
+            now = time.time()
+            connection.execute(
+                "UPDATE jobs SET state = ?, started = ?, error = NULL, owner_pid = ?, "
+                "heartbeat = ? WHERE id = ?",
+                (JOB_RUNNING, now, os.getpid(), now, row["id"])
+            )
+            connection.commit()
+        job = _row_to_job(row)
+        job.update(state=JOB_RUNNING, owner_pid=os.getpid(), heartbeat=now)
+        return job
+
+    def heartbeat(self) -> int:
+        """
+        Renueva el latido de los trabajos en ejecución de este proceso
+
+        Hay que llamarlo cada HEARTBEAT_INTERVAL_SECONDS mientras haya
+        trabajos en curso.
+
+        Returns:
+            int: Número de trabajos renovados
+        """
+        with closing(self._connect()) as connection, connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET heartbeat = ? WHERE state = ? AND owner_pid = ?",
+                (time.time(), JOB_RUNNING, os.getpid())
+            )
+            return cursor.rowcount
+
+    def mark_done(self, job_id: int, artifacts: Dict[str, Any]) -> None:
+        """
+        Marca un trabajo como terminado
+
+        Args:
+            job_id (int): Identificador del trabajo
+            artifacts (Dict[str, Any]): Archivos escritos y estadísticas
+        """
+        self._finish(job_id, JOB_DONE, None, artifacts)
+
+    def mark_failed(self, job_id: int, error: str) -> None:
+        """
+        Marca un trabajo como fallido
+
+        Args:
+            job_id (int): Identificador del trabajo
+            error (str): Mensaje de error
+        """
+        self._finish(job_id, JOB_FAILED, error, None)
+
+    def mark_cancelled(self, job_id: int) -> None:
+        """
+        Marca como cancelado un trabajo que se detuvo en ejecución
+
+        Args:
+            job_id (int): Identificador del trabajo
+        """
+        self._finish(job_id, JOB_CANCELLED, None, None)
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Cancela un trabajo que aún no ha empezado
+
+        Args:
+            job_id (int): Identificador del trabajo
+
+        Returns:
+            bool: True si el trabajo estaba pendiente
+        """
+        with closing(self._connect()) as connection, connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET state = ?, finished = ? WHERE id = ? AND state = ?",
+                (JOB_CANCELLED, time.time(), job_id, JOB_PENDING)
+            )
+            return cursor.rowcount > 0
+
+    def retry(self, job_id: int) -> bool:
+        """
+        Vuelve a poner en cola un trabajo fallido o cancelado
+
+        Args:
+            job_id (int): Identificador del trabajo
+
+        Returns:
+            bool: True si el trabajo se ha vuelto a poner en cola
+        """
+        with closing(self._connect()) as connection, connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET state = ?, started = NULL, finished = NULL, error = NULL "
+                "WHERE id = ? AND state IN (?, ?)",
+                (JOB_PENDING, job_id, JOB_FAILED, JOB_CANCELLED)
+            )
+            return cursor.rowcount > 0
+
+    def requeue_interrupted(self, timeout: float = HEARTBEAT_TIMEOUT_SECONDS) -> int:
+        """
+        Devuelve a la cola los trabajos en ejecución cuyo propietario ha desaparecido
+
+        Un trabajo se recupera si el proceso que lo reclamó ya no existe o si
+        su último latido tiene más de timeout segundos (proceso colgado, o
+        PID reutilizado). Los trabajos de otra instancia que sigue viva no
+        se tocan.
+
+        Args:
+            timeout (float): Antigüedad máxima del latido en segundos
+
+        Returns:
+            int: Número de trabajos recuperados
+        """
+        now = time.time()
+        with closing(self._connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            rows = connection.execute(
+                "SELECT id, owner_pid, heartbeat FROM jobs WHERE state = ?", (JOB_RUNNING,)
+            ).fetchall()
+            orphaned = [
+                row["id"] for row in rows
+                if row["heartbeat"] is None or now - row["heartbeat"] > timeout
+                or process_alive(row["owner_pid"]) is False
+            ]
+            connection.executemany(
+                "UPDATE jobs SET state = ?, started = NULL, owner_pid = NULL, heartbeat = NULL "
+                "WHERE id = ? AND state = ?",
+                [(JOB_PENDING, job_id, JOB_RUNNING) for job_id in orphaned]
+            )
+            connection.commit()
+        return len(orphaned)
+
+    def remove_finished(self) -> int:
+        """
+        Elimina los trabajos terminados, fallidos o cancelados
+
+        Returns:
+            int: Número de trabajos eliminados
+        """
+        with closing(self._connect()) as connection, connection:
+            cursor = connection.execute(
+                f"DELETE FROM jobs WHERE state IN ({', '.join('?' * len(FINISHED_STATES))})",
+                FINISHED_STATES
+            )
+            return cursor.rowcount
+
+    def _finish(self, job_id: int, state: str, error: Optional[str],
+                artifacts: Optional[Dict[str, Any]]) -> None:
+        """Record the final state of a job"""
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "UPDATE jobs SET state = ?, finished = ?, error = ?, "
+                "artifacts = COALESCE(?, artifacts) WHERE id = ?",
+                (state, time.time(), error,
+                 json.dumps(artifacts) if artifacts is not None else None, job_id)
+            )
+
+    def _add_missing_columns(self, connection: sqlite3.Connection) -> None:
+        """Upgrade a queue created before jobs recorded their owner"""
+        columns = {row["name"] for row in connection.execute("PRAGMA table_info(jobs)")}
+        for name, declaration in (("owner_pid", "INTEGER"), ("heartbeat", "REAL")):
+            if name not in columns:
+                connection.execute(f"ALTER TABLE jobs ADD COLUMN {name} {declaration}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection in autocommit mode; claim_next runs its own transaction"""
+        connection = sqlite3.connect(self.db_path, timeout=self.BUSY_TIMEOUT_SECONDS,
+                                     isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+
+def max_concurrent_transcriptions(running: int = 0,
+                                  memory_per_job: int = TRANSCRIPTION_MEMORY_BYTES,
+                                  cores_per_job: int = CORES_PER_TRANSCRIPTION) -> int:
+    """
+    Número de sincronizaciones que caben a la vez en esta máquina ahora mismo
+
+    Cada transcripción necesita varios GB de memoria y unos cuantos núcleos;
+    el límite es el menor de los dos, y al menos uno. La memoria se mide en
+    el momento de la llamada, así que las sincronizaciones ya en curso
+    (running) cuentan aparte de la memoria que queda libre.
+
+    Args:
+        running (int): Sincronizaciones que ya se están ejecutando
+        memory_per_job (int): Memoria de una transcripción en bytes
+        cores_per_job (int): Núcleos de una transcripción
+
+    Returns:
+        int: Trabajos simultáneos en total, incluidos los que están en curso
+    """
+    by_cores = (os.cpu_count() or 1) // cores_per_job
+    available = available_memory()
+    by_memory = running + available // memory_per_job if available is not None else 1
+    return max(1, min(by_cores, by_memory))
+
+
+def available_memory() -> Optional[int]:
+    """
+    Memoria física disponible en bytes, o None si no se puede saber
+
+    Usa psutil si está instalado y, si no, sysconf (Linux).
+    """
+    try:
+        import psutil
+        return int(psutil.virtual_memory().available)
+    except ImportError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def process_alive(pid: Optional[int]) -> Optional[bool]:
+    """
+    Indica si existe un proceso con ese PID en esta máquina
+
+    Usa psutil si está instalado y, si no, os.kill(pid, 0) en POSIX. En
+    Windows sin psutil no se puede saber sin riesgo (la señal 0 es CTRL_C).
+
+    Args:
+        pid (Optional[int]): Identificador del proceso
+
+    Returns:
+        Optional[bool]: True o False, o None si no se puede saber
+    """
+    if pid is None:
+        return None
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        pass
+    if os.name != "posix":
+        return None
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # It exists but belongs to another user
+        return True
+    return True
+
+
+def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+    """Convert a jobs row to a dictionary with decoded JSON columns"""
+    job = dict(row)
+    job["options"] = json.loads(job["options"])
+    job["artifacts"] = json.loads(job["artifacts"])
+    return job
@@ -0,0 +1,282 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from src.core.job_queue import TRANSCRIPTION_MEMORY_BYTES, available_memory
+
+
+class SharedModel:
+    """
+    Modelo residente entregado por el registro a cada usuario
+
+    Whisper guarda estado por llamada en el modelo (los hooks de la caché
+    KV del decodificador), así que dos transcribe() simultáneos sobre la
+    misma instancia se corrompen. Todos los usuarios reciben el mismo
+    SharedModel y sus transcribe() se ejecutan de uno en uno; el resto de
+    atributos se leen del modelo original.
+    """
+    __slots__ = ("model", "_lock")
+
+    def __init__(self, model: Any):
+        self.model = model
+        self._lock = threading.Lock()
+
+    def transcribe(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        """model.transcribe(), esperando a que termine la llamada en curso de otro usuario"""
+        with self._lock:
+            return self.model.transcribe(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.model, name)
+
+
+class _RegistryEntry:
+    """A loaded model together with its usage bookkeeping"""
+    __slots__ = ("model", "references", "last_used", "timer")
+
+    def __init__(self, model: Any):
+        self.model = SharedModel(model)
+        self.references = 0
+        self.last_used = time.monotonic()
+        self.timer: Optional[threading.Timer] = None
+
+
+class ModelRegistry:
+    """
+    Registro de modelos Whisper cargados, compartido por todo el proceso
+
+    Cada combinación (modelo, dispositivo) se carga una sola vez y se reutiliza
+    en ejecuciones posteriores. Un modelo sin usuarios se descarga tras
+    idle_timeout segundos, y antes de cargar uno nuevo se descargan los
+    inactivos más antiguos hasta quedar por debajo de max_models. Los modelos
+    en uso nunca se descargan: si siguen ocupando todo el cupo, el nuevo
+    solo se carga a su lado cuando el dispositivo tiene libre al menos
+    model_memory bytes; si no, la carga espera a que uno quede libre. Los
+    usuarios comparten la instancia, pero sus llamadas a transcribe() no se
+    solapan (ver SharedModel).
+    """
+    # Constants
+    DEFAULT_IDLE_TIMEOUT = 600.0
+    DEFAULT_MAX_MODELS = 1
+
+    def __init__(self, loader: Optional[Callable[[str, str], Any]] = None,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 max_models: int = DEFAULT_MAX_MODELS,
+                 model_memory: int = TRANSCRIPTION_MEMORY_BYTES,
+                 free_memory: Optional[Callable[[str], Optional[int]]] = None):
+        """
+        Args:
+            loader (Optional[Callable]): Carga (modelo, dispositivo); por defecto Whisper
+            idle_timeout (float): Segundos sin usuarios antes de descargar un modelo
+            max_models (int): Modelos residentes a la vez mientras no se usen todos
+            model_memory (int): Memoria que necesita un modelo en bytes
+            free_memory (Optional[Callable]): Memoria libre de un dispositivo en
+                bytes, o None si no se sabe
+        """
+        self.loader = loader or _load_whisper_model
+        self.idle_timeout = idle_timeout
+        self.max_models = max_models
+        self.model_memory = model_memory
+        self.free_memory = free_memory or _free_memory
+        self._entries: Dict[Tuple[str, str], _RegistryEntry] = {}
+        # A condition so that loads waiting for memory wake up on release()
+        self._lock = threading.Condition()
+        self._load_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+    def acquire(self, model_name: str, device: str) -> SharedModel:
+        """
+        Devuelve el modelo solicitado, cargándolo si todavía no está residente
+
+        Cada llamada debe ir seguida de release() cuando el modelo deje de usarse.
+
+        Args:
+            model_name (str): Nombre del modelo Whisper (con "+int8" para la
+                variante cuantizada, ver InferenceProfile.model_key)
+            device (str): Dispositivo ("cpu" o "cuda")
+
+        Returns:
+            SharedModel: Modelo Whisper listo para transcribir
+        """
+        key = (model_name, device)
+        with self._lock:
+            entry = self._take_reference(key)
+            if entry is not None:
+                return entry.model
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Load outside the registry lock so other models stay available;
+        # the per-key lock makes concurrent requests wait for a single load
+        with load_lock:
+            with self._lock:
+                entry = self._take_reference(key)
+                if entry is not None:
+                    return entry.model
+                self._make_room(device)
+
+            model = self.loader(model_name, device)
+
+            with self._lock:
+                entry = _RegistryEntry(model)
+                self._entries[key] = entry
+                entry.references = 1
+                return entry.model
+
+    def release(self, model_name: str, device: str) -> None:
+        """
+        Indica que un usuario ha terminado con el modelo
+
+        Args:
+            model_name (str): Nombre del modelo Whisper
+            device (str): Dispositivo ("cpu" o "cuda")
+        """
+        key = (model_name, device)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.references = max(0, entry.references - 1)
+            entry.last_used = time.monotonic()
+            if entry.references == 0:
+                self._schedule_unload(key, entry)
+                self._lock.notify_all()
+
+    @contextmanager
+    def use(self, model_name: str, device: str) -> Iterator[SharedModel]:
+        """
+        Context manager que combina acquire() y release()
+
+        Args:
+            model_name (str): Nombre del modelo Whisper
+            device (str): Dispositivo ("cpu" o "cuda")
+        """
+        model = self.acquire(model_name, device)
+        try:
+            yield model
+        finally:
+            self.release(model_name, device)
+
+    def is_loaded(self, model_name: str, device: str) -> bool:
+        """Indica si el modelo está residente"""
+        with self._lock:
+            return (model_name, device) in self._entries
+
+    def clear(self) -> None:
+        """Descarga todos los modelos sin usuarios"""
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry.references == 0]:
+                self._unload(key)
+
+    def _take_reference(self, key: Tuple[str, str]) -> Optional[_RegistryEntry]:
+        """Register a new user of a resident model (registry lock held)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        entry.references += 1
+        entry.last_used = time.monotonic()
+        if entry.timer is not None:
+            entry.timer.cancel()
+            entry.timer = None
+        return entry
+
+    def _schedule_unload(self, key: Tuple[str, str], entry: _RegistryEntry) -> None:
+        """Start the idle timer of an unused model (registry lock held)"""
+        if entry.timer is not None:
+            entry.timer.cancel()
+        entry.timer = threading.Timer(self.idle_timeout, self._unload_if_idle, args=(key,))
+        entry.timer.daemon = True
+        entry.timer.start()
+
+    def _unload_if_idle(self, key: Tuple[str, str]) -> None:
+        """Timer callback: unload the model if nobody used it meanwhile"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.references > 0:
+                return
+            if time.monotonic() - entry.last_used < self.idle_timeout:
+                return
+            self._unload(key)
+
+    def _make_room(self, device: str) -> None:
+        """
+        Evict idle models for a new one; with every slot busy, load beside
+        them only if the device has the memory, else wait for a release
+        (registry lock held)
+        """
+        while True:
+            self._evict_for_new_model()
+            if len(self._entries) < self.max_models:
+                return
+            free = self.free_memory(device)
+            if free is not None and free >= self.model_memory:
+                return
+            self._lock.wait()
+
+    def _evict_for_new_model(self) -> None:
+        """Unload least recently used idle models to make room (registry lock held)"""
+        idle = sorted(
+            (entry.last_used, key) for key, entry in self._entries.items()
+            if entry.references == 0
+        )
+        for _, key in idle:
+            if len(self._entries) < self.max_models:
+                break
+            self._unload(key)
+
+    def _unload(self, key: Tuple[str, str]) -> None:
+        """Drop a model and return its memory (registry lock held)"""
+        entry = self._entries.pop(key)
+        if entry.timer is not None:
+            entry.timer.cancel()
+        entry.model = None
+        if key[1] == "cuda":
+            _release_cuda_memory()
+
+
+def _load_whisper_model(model_name: str, device: str) -> Any:
+    """Default loader: read the Whisper checkpoint onto the device, quantized if requested"""
+    import whisper
+    from src.core.inference_profile import quantize_model, split_model_key
+
+    checkpoint_name, quantized = split_model_key(model_name)
+    model = whisper.load_model(checkpoint_name, device=device)
+    if quantized and device == "cpu":
+        model = quantize_model(model)
+    return model
+
+
+def _free_memory(device: str) -> Optional[int]:
+    """Free memory on the device a model would be loaded onto"""
+    if device == "cuda":
+        try:
+            import torch
+            free, _ = torch.cuda.mem_get_info()
+            return int(free)
+        except (ImportError, RuntimeError):
+            return None
+    return available_memory()
+
+
+def _release_cuda_memory() -> None:
+    """Give cached CUDA blocks back to the driver after unloading a model"""
+    import torch
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """
+    Devuelve el registro de modelos compartido por el proceso
+
+    Returns:
+        ModelRegistry: Instancia única del registro
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
@@ -0,0 +1,1042 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+
+import numpy as np
+from typing import Dict, List, Set, Any, Callable, Iterable, Iterator, Optional, Tuple, Union
+
+from src.core.alignment import align_segments
+from src.core.anchored_alignment import align_segments_anchored
+from src.core.audio_cache import AudioCache
+from src.core.chunked_transcription import (find_chunk_regions, iter_chunk_segments, 
+                                            iter_pack_segments, build_result, default_workers,
+                                            DEFAULT_CHUNK_SECONDS, DEFAULT_OVERLAP_SECONDS)
+from src.core.dialogue_index import DialogueIndex
+from src.core.inference_profile import get_inference_profile, DEFAULT_PROFILE
+from src.core.model_registry import get_model_registry
+from src.core.run_manifest import RunManifestStore, add_to_ranges, diff_dialogues
+from src.core.script_parser import load_script, Script
+from src.core.similarity import similarity_matrix
+from src.core.tracing import Tracer, traced
+from src.core.transcription_cache import TranscriptionCache, TranscriptionCheckpoint
+from src.core.windowed_matcher import WindowedMatcher
+from src.core.timecode import Timecode, get_frame_rate, timecodes_from_seconds
+from src.core.vad import detect_speech_regions, pack_regions, speech_seconds, SAMPLE_RATE
+from src.core.utils import (similar, similar_lowered,
+                            SIMILARITY_BACKEND_DIFFLIB, SIMILARITY_BACKEND_NUMBA)
+
+
+class SyncCancelled(Exception):
+    """La sincronización se ha cancelado a petición del usuario"""
+
+
+class SyncPipeline:
+    """
+    Proceso completo de sincronización de audio y guion, independiente de Qt
+    
+    Transcribe el audio, lee el guion y empareja segmentos con diálogos.
+    El progreso y los mensajes se comunican mediante callbacks, de modo que
+    la misma lógica sirve para la interfaz gráfica y para la línea de comandos.
+    """
+    # Constants
+    SIMILARITY_THRESHOLD = 0.5
+    DEFAULT_LANGUAGE = "en"
+    
+    # Matching strategies
+    MATCHER_GREEDY = "greedy"
+    MATCHER_ALIGNMENT = "alignment"
+    MATCHER_MATRIX = "matrix"
+    MATCHER_WINDOWED = "windowed"
+    MATCHER_ANCHORED = "anchored"
+    
+    # Matchers that can match each chunk as it arrives; the others need
+    # the whole transcription at once
+    STREAMING_MATCHERS = (MATCHER_GREEDY, MATCHER_WINDOWED)
+    
+    # Transcription modes
+    TRANSCRIPTION_FULL = "full"
+    TRANSCRIPTION_CHUNKED = "chunked"
+    
+    # Window length of a checkpointed full-file transcription. Opt-in: the
+    # windows are decoded separately and cached under their own key, so the
+    # segments can differ slightly from a single whole-file call
+    CHECKPOINT_WINDOW_SECONDS = 120.0
+    
+    # Options that change the results of a run, recorded in its manifest
+    MANIFEST_SETTINGS = (
+        "matcher", "candidate_pruning", "candidate_count", "matrix_candidates",
+        "window_size", "window_lookback", "similarity_backend", "streaming",
+        "transcription_mode", "chunk_seconds", "chunk_overlap", "vad", "checkpoint",
+        "inference_profile"
+    )
+    
+    # Above this fraction of edited lines a full run matches better
+    MAX_RESYNC_FRACTION = 0.5
+    
+    DEFAULT_OPTIONS = {
+        "matcher": MATCHER_GREEDY,
+        "candidate_pruning": True,
+        "candidate_count": DialogueIndex.DEFAULT_CANDIDATES,
+        "matrix_candidates": 3,
+        "window_size": WindowedMatcher.DEFAULT_WINDOW,
+        "window_lookback": WindowedMatcher.DEFAULT_LOOKBACK,
+        "anchor_workers": 0,
+        "similarity_backend": SIMILARITY_BACKEND_DIFFLIB,
+        "use_cache": True,
+        "cache_dir": None,
+        "incremental": True,
+        "manifest_dir": None,
+        "audio_cache": True,
+        "audio_cache_dir": None,
+        "transcription_mode": TRANSCRIPTION_FULL,
+        "chunk_seconds": DEFAULT_CHUNK_SECONDS,
+        "chunk_overlap": DEFAULT_OVERLAP_SECONDS,
+        "chunk_workers": 0,
+        "checkpoint": False,
+        "checkpoint_dir": None,
+        "vad": False,
+        "inference_profile": DEFAULT_PROFILE,
+        "streaming": False,
+        "profile": False,
+        "frame_rate": None,
+    }
+    
+    def __init__(self, audio_path: str, script_path: str, 
+                 options: Optional[Dict[str, Any]] = None,
+                 on_log: Optional[Callable[[str], None]] = None,
+                 on_progress: Optional[Callable[[int], None]] = None,
+                 on_partial: Optional[Callable[[List[Dict[str, Any]]], None]] = None):
+        self.audio_path = audio_path
+        self.script_path = script_path
+        self.options = {**self.DEFAULT_OPTIONS, **(options or {})}
+        self.on_log = on_log or _ignore
+        self.on_progress = on_progress or _ignore
+        self.on_partial = on_partial or _ignore
+        self.stats: Dict[str, int] = {}
+        self.tracer = Tracer(enabled=self.options["profile"])
+        self.frame_rate = get_frame_rate(self.options["frame_rate"])
+        self.inference_profile = get_inference_profile(self.options["inference_profile"])
+        if self.options["streaming"] and self.options["matcher"] not in self.STREAMING_MATCHERS:
+            raise ValueError(
+                f"El método de sincronización {self.options['matcher']} no admite el modo "
+                f"streaming (use {' o '.join(self.STREAMING_MATCHERS)})"
+            )
+        self._encoded_dialogues: Optional[tuple] = None
+        self._transcription_key: Optional[str] = None
+        self._cancel_requested = threading.Event()
+        
+    @traced("run")
+    def run(self) -> Dict[str, Any]:
+        """
+        Ejecuta la sincronización completa
+        
+        Returns:
+            Dict[str, Any]: Estructura JSON con la cabecera y los diálogos sincronizados
+        """
+        self._initialize_progress()
+        if self.options["incremental"]:
+            json_data = self._resync_incrementally()
+            if json_data is not None:
+                return json_data
+        
+        device = self._get_device()
+        
+        if self.options["streaming"]:
+            dialogues = self._load_script()
+            json_data = self._create_json_structure()
+            matched_dialogues = self._stream_segments(device, dialogues, json_data)
+        else:
+            transcription = self._get_transcription(device)
+            self._check_cancelled()
+            dialogues = self._load_script()
+            json_data = self._create_json_structure()
+            self.on_log(f"Método de sincronización: {self.options['matcher']}")
+            matched_dialogues = self._process_segments(transcription, dialogues, json_data)
+        
+        self._add_unmatched_dialogues(dialogues, matched_dialogues, json_data)
+        self._finalize_results(dialogues, matched_dialogues, json_data)
+        self._save_manifest(dialogues, matched_dialogues, json_data)
+        return json_data
+    
+    def cancel(self) -> None:
+        """
+        Pide que la sincronización se detenga al terminar el fragmento en curso
+        
+        Se puede llamar desde otro hilo. run() lanza SyncCancelled; con la
+        opción "checkpoint", los fragmentos ya transcritos quedan en el
+        punto de control y la siguiente ejecución continúa desde el último.
+        """
+        self._cancel_requested.set()
+    
+    def _check_cancelled(self) -> None:
+        """Raise SyncCancelled if cancel() was called"""
+        if self._cancel_requested.is_set():
+            raise SyncCancelled("Sincronización cancelada")
+    
+    def report_profile(self, trace_path: Optional[str] = None) -> None:
+        """
+        Log the per-stage timings and optionally write them as a Chrome trace
+        
+        Callers may add their own stages (saving, exporting) with
+        self.tracer.span() before calling this. Does nothing unless the
+        "profile" option is enabled.
+        
+        Args:
+            trace_path (Optional[str]): Path of the trace_event JSON file
+        """
+        if not self.tracer.enabled:
+            return
+        for line in self.tracer.summary_lines():
+            self.on_log(line)
+        if trace_path:
+            self.tracer.write_chrome_trace(trace_path)
+            self.on_log(f"Traza de tiempos guardada en: {trace_path}")
+    
+    @traced("incremental_resync")
+    def _resync_incrementally(self) -> Optional[Dict[str, Any]]:
+        """
+        Re-sync from the previous run's manifest, re-matching only edited lines
+        
+        Unchanged dialogues keep their previous IN and OUT. Each run of
+        inserted or modified lines (plus DEFAULT_NEIGHBORHOOD lines around it),
+        and of unchanged lines that had no match, is matched with the
+        selected matcher against the segments between the kept matches on
+        either side. Returns None when a full run is needed: no manifest, the
+        transcription is no longer cached, or too much of the script changed.
+        """
+        store, key = self._open_manifest()
+        manifest = store.load(key) if store is not None else None
+        if manifest is None:
+            return None
+        transcription = TranscriptionCache(self.options["cache_dir"]).get(manifest["transcription_key"])
+        if transcription is None:
+            return None
+        
+        dialogues = self._load_script()
+        kept, dirty_ranges = diff_dialogues(manifest["dialogues"], dialogues)
+        edited_count = sum(end - start for start, end in dirty_ranges)
+        if edited_count > len(dialogues) * self.MAX_RESYNC_FRACTION:
+            self.on_log("El guion ha cambiado demasiado: se sincroniza de nuevo por completo")
+            return None
+        self._transcription_key = manifest["transcription_key"]
+        
+        # Previous matches of the lines that did not change, by new index;
+        # unchanged lines that had no match get another chance
+        previous = {index: (in_frames, out_frames) 
+                    for index, in_frames, out_frames in manifest["matches"]}
+        kept_frames = {new_index: previous[old_index] 
+                       for new_index, old_index in sorted(kept.items()) if old_index in previous}
+        retried = [new_index for new_index, old_index in kept.items() if old_index not in previous]
+        dirty_ranges = add_to_ranges(dirty_ranges, retried)
+        self.on_log(f"Resincronización incremental: {edited_count} diálogos editados y "
+                    f"{len(retried)} sin coincidencia por emparejar, de {len(dialogues)}")
+        self.on_log(f"Método de sincronización: {self.options['matcher']}")
+        
+        json_data = self._create_json_structure()
+        matched_dialogues = set(kept_frames)
+        for index, (in_frames, out_frames) in kept_frames.items():
+            self._add_matched_dialogue(
+                json_data, 
+                index, 
+                Timecode(in_frames, self.frame_rate), 
+                Timecode(out_frames, self.frame_rate), 
+                dialogues
+            )
+        
+        kept_order = list(kept_frames)
+        for start, end in dirty_ranges:
+            window = self._segments_between(transcription["segments"], kept_frames, 
+                                            kept_order, start, end)
+            matched_dialogues |= self._match_range(window, dialogues, start, end, json_data)
+        
+        self._add_unmatched_dialogues(dialogues, matched_dialogues, json_data)
+        self._finalize_results(dialogues, matched_dialogues, json_data)
+        self._save_manifest(dialogues, matched_dialogues, json_data)
+        return json_data
+    
+    def _match_range(self, segments: List[Dict[str, Any]], 
+                     dialogues: List[Dict[str, str]], 
+                     start: int, end: int, 
+                     json_data: Dict[str, Any]) -> Set[int]:
+        """Match dialogues [start, end) against segments with the selected matcher"""
+        range_data = self._create_json_structure()
+        matched = self._process_segments({"segments": segments}, dialogues[start:end], range_data)
+        for entry in range_data["data"]:
+            entry["ID"] += start
+            json_data["data"].append(entry)
+        return {index + start for index in matched}
+    
+    def _segments_between(self, segments: List[Dict[str, Any]], 
+                          kept_frames: Dict[int, Tuple[int, int]], 
+                          kept_order: List[int], 
+                          start: int, end: int) -> List[Dict[str, Any]]:
+        """Segments that fall between the kept matches around dialogues [start, end)"""
+        position = bisect_left(kept_order, start)
+        lower = (Timecode(kept_frames[kept_order[position - 1]][1], self.frame_rate).seconds 
+                 if position > 0 else float("-inf"))
+        position = bisect_left(kept_order, end)
+        upper = (Timecode(kept_frames[kept_order[position]][0], self.frame_rate).seconds 
+                 if position < len(kept_order) else float("inf"))
+        return [segment for segment in segments 
+                if lower <= (segment["start"] + segment["end"]) / 2 <= upper]
+    
+    def _open_manifest(self) -> Tuple[Optional[RunManifestStore], Optional[str]]:
+        """Open the run manifest store and compute this run's key, unless disabled"""
+        # The manifest points into the transcription cache, so it needs it
+        if not (self.options["incremental"] and self.options["use_cache"]):
+            return None, None
+        store = RunManifestStore(self.options["manifest_dir"])
+        settings = {name: self.options[name] for name in self.MANIFEST_SETTINGS}
+        settings["frame_rate"] = self.frame_rate.name
+        settings["threshold"] = self.SIMILARITY_THRESHOLD
+        return store, store.make_key(self.audio_path, self.script_path, settings)
+    
+    def _save_manifest(self, dialogues: List[Dict[str, str]], 
+                       matched_dialogues: Set[int], 
+                       json_data: Dict[str, Any]) -> None:
+        """Record this run so the next one can re-sync incrementally"""
+        if self._transcription_key is None:
+            return
+        store, key = self._open_manifest()
+        if store is None:
+            return
+        matches = [(entry["ID"], entry["IN"].frames, entry["OUT"].frames) 
+                   for entry in json_data["data"] if entry["ID"] in matched_dialogues]
+        try:
+            store.save(key, self._transcription_key, dialogues, matches)
+        except OSError as e:
+            self.on_log(f"No se pudo guardar el manifiesto de la sincronización: {str(e)}")
+    
+    def _initialize_progress(self) -> None:
+        """Initialize progress indicators"""
+        self.on_progress(0)
+        self.on_log("Iniciando procesamiento...")
+    
+    @traced("device")
+    def _get_device(self) -> str:
+        """Determine the processing device (CPU or CUDA)"""
+        import torch
+        
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.on_log(f"Usando dispositivo: {device}")
+        return device
+    
+    @traced("load_model")
+    def _load_whisper_model(self, device: str) -> Any:
+        """
+        Get the Whisper model from the process-wide registry
+        
+        The model stays resident between runs; callers must release it
+        through the registry when they are done.
+        """
+        self.on_progress(5)
+        self.on_log(f"Cargando modelo Whisper (perfil {self.inference_profile.describe()})...")
+        if device == "cpu":
+            self.inference_profile.apply_threads()
+        elif self.inference_profile.quantize:
+            self.on_log("La cuantización int8 solo se aplica en CPU; se usa el modelo original")
+        
+        registry = get_model_registry()
+        if registry.is_loaded(self._model_name(device), device):
+            self.on_log("Reutilizando modelo ya cargado en memoria")
+        else:
+            # Check if model exists in user's cache directory
+            from pathlib import Path
+            
+            # Get the whisper cache directory
+            cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "whisper")
+            Path(cache_dir).mkdir(parents=True, exist_ok=True)
+            
+            self.on_log(f"Buscando o descargando modelo en: {cache_dir}")
+        
+        model = registry.acquire(self._model_name(device), device)
+        self.on_progress(10)
+        return model
+    
+    @traced("transcription", count=lambda result: len(result["segments"]))
+    def _get_transcription(self, device: str) -> Dict[str, Any]:
+        """Return the cached transcription or transcribe the audio"""
+        cache, cache_key = self._open_cache(device)
+        if cache is not None:
+            with self.tracer.span("cache_lookup"):
+                transcription = cache.get(cache_key)
+            if transcription is not None:
+                self.on_log("Transcripción recuperada de la caché")
+                self.on_progress(50)
+                return transcription
+        
+        if self._transcribes_in_windows():
+            transcription = self._transcribe_chunked(device)
+        else:
+            model = self._load_whisper_model(device)
+            try:
+                transcription = self._transcribe_audio(model, device)
+            finally:
+                get_model_registry().release(self._model_name(device), device)
+        
+        if cache is not None:
+            with self.tracer.span("cache_store"):
+                self._store_transcription(cache, cache_key, transcription)
+        return transcription
+    
+    def _store_transcription(self, cache: TranscriptionCache, cache_key: str, 
+                             transcription: Dict[str, Any]) -> None:
+        """Save a finished transcription; a cache that cannot be written only logs a warning"""
+        try:
+            cache.put(cache_key, transcription)
+        except OSError as e:
+            self.on_log(f"No se pudo guardar la transcripción en la caché: {str(e)}")
+    
+    def _open_cache(self, device: str) -> Tuple[Optional[TranscriptionCache], Optional[str]]:
+        """Open the transcription cache and compute this run's key, unless bypassed"""
+        if not self.options["use_cache"]:
+            return None, None
+        cache = TranscriptionCache(self.options["cache_dir"])
+        cache_key = cache.make_key(
+            self.audio_path, 
+            self._model_name(device), 
+            self.DEFAULT_LANGUAGE, 
+            self._cache_key_options(device)
+        )
+        self._transcription_key = cache_key
+        return cache, cache_key
+    
+    def _model_name(self, device: str) -> str:
+        """Registry name of the inference profile's model on this device"""
+        return self.inference_profile.model_key(device)
+    
+    def _decode_options(self, device: str) -> Dict[str, Any]:
+        """Decode options passed to Whisper"""
+        return {
+            "fp16": device == "cuda",
+            **self.inference_profile.decode_options()
+        }
+    
+    def _cache_key_options(self, device: str) -> Dict[str, Any]:
+        """Everything besides audio, model and language that changes the transcription"""
+        key_options = dict(self._decode_options(device))
+        if self._uses_chunks():
+            key_options["chunk_seconds"] = self._chunk_seconds()
+            key_options["chunk_overlap"] = self.options["chunk_overlap"]
+        if self.options["vad"]:
+            key_options["vad"] = True
+        return key_options
+    
+    def _uses_chunks(self) -> bool:
+        """Whether the transcription is produced chunk by chunk"""
+        return self.options["streaming"] or self._transcribes_in_windows()
+    
+    def _transcribes_in_windows(self) -> bool:
+        """
+        Whether _get_transcription goes through _transcribe_chunked
+        
+        The VAD transcribes packed speech regions, and checkpointing needs
+        windows to save; a full-file run without checkpoints stays one
+        whole-file call.
+        """
+        return (self.options["transcription_mode"] == self.TRANSCRIPTION_CHUNKED or 
+                self.options["vad"] or 
+                self.options["checkpoint"])
+    
+    def _full_file_windows(self) -> bool:
+        """Whether the chunks are only checkpoint windows of a full-file run"""
+        return (self.options["transcription_mode"] == self.TRANSCRIPTION_FULL and 
+                not self.options["streaming"] and 
+                not self.options["vad"])
+    
+    def _chunk_seconds(self) -> float:
+        """Target chunk length"""
+        if self._full_file_windows():
+            return self.CHECKPOINT_WINDOW_SECONDS
+        return self.options["chunk_seconds"]
+    
+    @traced("decode_audio", count=len)
+    def _load_audio(self) -> np.ndarray:
+        """
+        Decode the audio to 16 kHz mono float32
+        
+        With the audio cache the file is decoded once and later runs get a
+        memory map of the cached samples.
+        """
+        if self.options["audio_cache"]:
+            cache = AudioCache(self.options["audio_cache_dir"])
+            if os.path.exists(cache.entry_path(self.audio_path)):
+                self.on_log("Audio decodificado recuperado de la caché")
+            else:
+                self.on_log("Decodificando audio...")
+            return cache.load(self.audio_path)
+        
+        import whisper
+        self.on_log("Decodificando audio...")
+        return whisper.load_audio(self.audio_path)
+    
+    @traced("transcribe", count=lambda result: len(result["segments"]))
+    def _transcribe_audio(self, model: Any, device: str) -> Dict[str, Any]:
+        """Transcribe the audio file using Whisper"""
+        audio = self._load_audio()
+        self.on_log("Transcribiendo audio...")
+        result = model.transcribe(
+            audio,
+            language=self.DEFAULT_LANGUAGE,
+            verbose=False,
+            **self._decode_options(device)
+        )
+        self.on_progress(50)
+        return result
+    
+    @traced("transcribe_chunked", count=lambda result: len(result["segments"]))
+    def _transcribe_chunked(self, device: str) -> Dict[str, Any]:
+        """Transcribe the audio in silence-delimited chunks and join the segments"""
+        segments = []
+        for done, total, chunk_segments in self._iter_transcribed_chunks(device):
+            segments.extend(chunk_segments)
+            # Update progress (10% to 50%) and log each finished chunk
+            self.on_progress(10 + int((done / total) * 40))
+            self.on_log(f"Fragmento {done} de {total} transcrito")
+        
+        self.on_progress(50)
+        return build_result(segments, self.DEFAULT_LANGUAGE)
+    
+    def _iter_transcribed_chunks(self, device: str) -> Iterator[Tuple[int, int, List[Dict[str, Any]]]]:
+        """
+        Yield (finished chunks, total chunks, segments) as each chunk is transcribed
+        
+        With several workers every chunk goes to a pool process holding its own
+        model; with one worker the chunks run here on the shared model (always
+        for the checkpoint windows of a full-file run). With the "vad" option
+        the chunks are packs of speech regions and the rest of the audio is
+        never transcribed. Each finished chunk is saved to the checkpoint, and
+        chunks saved by an earlier, interrupted run are not transcribed again.
+        Cancellation is checked between chunks.
+        """
+        audio = self._load_audio()
+        if self.options["vad"]:
+            layout = self._find_speech_packs(audio)
+        else:
+            with self.tracer.span("find_chunks") as span:
+                layout = find_chunk_regions(audio, self._chunk_seconds())
+                span.items = len(layout)
+        chunk_count = len(layout)
+        if not chunk_count:
+            return
+        
+        checkpoint = self._open_checkpoint(device, layout)
+        completed = checkpoint.completed() if checkpoint is not None else {}
+        if completed:
+            self.on_log(f"Reanudando la transcripción: {len(completed)} de {chunk_count} "
+                        f"fragmentos ya transcritos")
+        pending = [index for index in range(chunk_count) if index not in completed]
+        
+        if self._full_file_windows():
+            workers = 1
+        else:
+            workers = self.options["chunk_workers"] or default_workers(len(pending), device)
+        model = self._load_whisper_model(device) if pending and workers <= 1 else None
+        if pending:
+            self.on_log(f"Transcribiendo audio por fragmentos ({workers} procesos)...")
+        
+        transcribed = self._iter_pending_chunks(audio, layout, pending, device, workers, model)
+        try:
+            start_time = time.perf_counter()
+            for index in range(chunk_count):
+                self._check_cancelled()
+                chunk_segments = completed.get(index)
+                if chunk_segments is None:
+                    chunk_segments = next(transcribed)
+                    if checkpoint is not None:
+                        checkpoint.append(index, chunk_segments)
+                yield index + 1, chunk_count, chunk_segments
+            if self.options["vad"]:
+                self._log_vad_savings(audio, layout, time.perf_counter() - start_time)
+            if checkpoint is not None:
+                checkpoint.remove()
+        finally:
+            # Stops the pool early when cancelled
+            transcribed.close()
+            if model is not None:
+                get_model_registry().release(self._model_name(device), device)
+    
+    def _iter_pending_chunks(self, audio: np.ndarray, layout: List[Any], pending: List[int], 
+                             device: str, workers: int, 
+                             model: Any) -> Iterator[List[Dict[str, Any]]]:
+        """Transcribe the chunks of layout (regions or VAD packs) listed in pending, in order"""
+        transcription_args = (
+            self._model_name(device), 
+            device, 
+            self.DEFAULT_LANGUAGE, 
+            self._decode_options(device)
+        )
+        if self.options["vad"]:
+            return iter_pack_segments(audio, [layout[index] for index in pending], 
+                                      *transcription_args, workers=workers, model=model)
+        return iter_chunk_segments(audio, [layout[index] for index in pending], 
+                                   *transcription_args, 
+                                   overlap_seconds=self.options["chunk_overlap"],
+                                   workers=workers, model=model)
+    
+    def _open_checkpoint(self, device: str, layout: List[Any]) -> Optional[TranscriptionCheckpoint]:
+        """Checkpoint of this transcription, named after its cache key, unless disabled"""
+        if not self.options["checkpoint"]:
+            return None
+        _, cache_key = self._open_cache(device)
+        if cache_key is None:
+            return None
+        return TranscriptionCheckpoint(cache_key, layout, self.options["checkpoint_dir"])
+    
+    @traced("vad", count=len)
+    def _find_speech_packs(self, audio: np.ndarray) -> List[List[Tuple[int, int]]]:
+        """Detect speech regions and group them into packs of up to chunk_seconds"""
+        regions = detect_speech_regions(audio)
+        total_seconds = len(audio) / SAMPLE_RATE
+        skipped_seconds = total_seconds - speech_seconds(regions)
+        if total_seconds:
+            self.on_log(
+                f"VAD: {len(regions)} regiones de voz; se omite el "
+                f"{skipped_seconds / total_seconds:.0%} del audio "
+                f"({skipped_seconds / 60:.1f} min de silencio o música)"
+            )
+        if not regions:
+            self.on_log("VAD: no se ha detectado voz en el audio")
+        return pack_regions(regions, self.options["chunk_seconds"])
+    
+    def _log_vad_savings(self, audio: np.ndarray, packs: List[List[Tuple[int, int]]], 
+                         elapsed: float) -> None:
+        """Log the transcription time the VAD saved, extrapolated from the speech rate"""
+        transcribed = speech_seconds([region for pack in packs for region in pack])
+        skipped = len(audio) / SAMPLE_RATE - transcribed
+        if transcribed > 0:
+            self.on_log(f"VAD: tiempo ahorrado estimado {elapsed * skipped / transcribed:.1f} s")
+    
+    @traced("stream_segments", count=len)
+    def _stream_segments(self, device: str, 
+                         dialogues: List[Dict[str, str]], 
+                         json_data: Dict[str, Any]) -> Set[int]:
+        """
+        Match segments as soon as each chunk is transcribed
+        
+        New matches are reported through on_partial; matching runs while
+        the next chunk is being decoded, so it adds almost nothing to the
+        transcription time.
+        """
+        matched_dialogues = set()
+        find_match = self._create_match_function(dialogues, matched_dialogues)
+        self.on_log(f"Método de sincronización: {self.options['matcher']} (streaming)")
+        
+        cache, cache_key = self._open_cache(device)
+        cached = cache.get(cache_key) if cache is not None else None
+        if cached is not None:
+            self.on_log("Transcripción recuperada de la caché")
+            batches = iter([(1, 1, cached["segments"])])
+        else:
+            batches = self._iter_transcribed_chunks(device)
+        
+        segments = []
+        for done, total, chunk_segments in batches:
+            segments.extend(chunk_segments)
+            entries = self._match_segments_incrementally(
+                chunk_segments, dialogues, matched_dialogues, find_match, json_data
+            )
+            if entries:
+                self.on_partial(entries)
+            
+            # Update progress (10% to 90%) and log each finished chunk
+            self.on_progress(10 + int((done / total) * 80))
+            self.on_log(f"Fragmento {done} de {total}: {len(entries)} diálogos sincronizados")
+        
+        if cached is None and cache is not None:
+            self._store_transcription(cache, cache_key, build_result(segments, self.DEFAULT_LANGUAGE))
+        return matched_dialogues
+    
+    def _create_match_function(self, dialogues: List[Dict[str, str]], 
+                               matched_dialogues: Set[int]) -> Callable[[str], Dict[str, Any]]:
+        """
+        Build the per-segment matcher used for incremental matching
+        
+        The windowed matcher keeps its cursor between calls; the greedy one
+        uses the (index-pruned) search. These are the STREAMING_MATCHERS.
+        """
+        if self.options["matcher"] == self.MATCHER_WINDOWED:
+            windowed = WindowedMatcher(
+                dialogues,
+                lambda text, indices: self._score_dialogues(text, dialogues, indices),
+                self.SIMILARITY_THRESHOLD,
+                window_size=self.options["window_size"],
+                lookback=self.options["window_lookback"]
+            )
+            return lambda text: windowed.match(text, matched_dialogues)
+        
+        index = DialogueIndex(dialogues) if self.options["candidate_pruning"] else None
+        return lambda text: self._find_best_dialogue_match(text, dialogues, matched_dialogues, index)
+    
+    def _match_segments_incrementally(self, segments: List[Dict[str, Any]], 
+                                      dialogues: List[Dict[str, str]], 
+                                      matched_dialogues: Set[int], 
+                                      find_match: Callable[[str], Dict[str, Any]], 
+                                      json_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Match a batch of new segments and return the entries it produced"""
+        entries = []
+        for segment in segments:
+            best_match = find_match(segment["text"].strip())
+            
+            if best_match["score"] > self.SIMILARITY_THRESHOLD and best_match["index"] >= 0:
+                entries.append(self._add_matched_dialogue(
+                    json_data, 
+                    best_match["index"], 
+                    segment["start"], 
+                    segment["end"], 
+                    dialogues
+                ))
+                matched_dialogues.add(best_match["index"])
+        return entries
+    
+    @traced("parse_script", count=len)
+    def _load_script(self) -> Script:
+        """Load the parsed script, shared with any earlier parse of the same file"""
+        self.on_log("Leyendo guion...")
+        dialogues = load_script(self.script_path)
+        self.on_progress(55)
+        return dialogues
+    
+    def _create_json_structure(self) -> Dict[str, Any]:
+        """Create the base JSON structure for results"""
+        return {
+            "header": {
+                "reference_number": "000000",
+                "product_name": "PAW PATROL",
+                "chapter_number": "01",
+                "type": "Animacion"
+            },
+            "data": []
+        }
+    
+    @traced("match_segments", count=len)
+    def _process_segments(self, transcription: Dict[str, Any], 
+                          dialogues: List[Dict[str, str]], 
+                          json_data: Dict[str, Any]) -> Set[int]:
+        """Match the transcribed segments with the dialogues using the selected matcher"""
+        matcher = self.options["matcher"]
+        if matcher == self.MATCHER_ALIGNMENT:
+            return self._process_segments_aligned(transcription, dialogues, json_data)
+        if matcher == self.MATCHER_GREEDY:
+            return self._process_segments_greedy(transcription, dialogues, json_data)
+        if matcher == self.MATCHER_MATRIX:
+            return self._process_segments_matrix(transcription, dialogues, json_data)
+        if matcher == self.MATCHER_WINDOWED:
+            return self._process_segments_windowed(transcription, dialogues, json_data)
+        if matcher == self.MATCHER_ANCHORED:
+            return self._process_segments_anchored(transcription, dialogues, json_data)
+        raise ValueError(f"Método de sincronización desconocido: {matcher}")
+    
+    def _process_segments_aligned(self, transcription: Dict[str, Any], 
+                                  dialogues: List[Dict[str, str]], 
+                                  json_data: Dict[str, Any]) -> Set[int]:
+        """Align the whole segment sequence with the script in order"""
+        self.on_log("Alineando segmentos con el guion...")
+        
+        def report_progress(row: int, total_rows: int) -> None:
+            # Update progress (55% to 90%) every few rows
+            if row % 20 == 0:
+                self.on_progress(55 + int((row / total_rows) * 35))
+        
+        matches = align_segments(
+            transcription["segments"], 
+            dialogues, 
+            threshold=self.SIMILARITY_THRESHOLD,
+            backend=self.options["similarity_backend"],
+            progress_callback=report_progress
+        )
+        return self._add_aligned_matches(matches, dialogues, json_data)
+    
+    def _process_segments_anchored(self, transcription: Dict[str, Any], 
+                                   dialogues: List[Dict[str, str]], 
+                                   json_data: Dict[str, Any]) -> Set[int]:
+        """
+        Align the segments between unique exact matches, gap by gap in a process pool
+        
+        Equivalent to the alignment matcher on ordinary episodes, but its cost
+        follows the largest gap between anchors instead of the whole episode.
+        """
+        self.on_log("Alineando segmentos con el guion por tramos entre anclas...")
+        
+        def report_progress(done: int, total: int) -> None:
+            # Update progress (55% to 90%) as gaps finish
+            self.on_progress(55 + int((done / total) * 35))
+        
+        matches = align_segments_anchored(
+            transcription["segments"], 
+            dialogues, 
+            threshold=self.SIMILARITY_THRESHOLD,
+            workers=self.options["anchor_workers"],
+            backend=self.options["similarity_backend"],
+            progress_callback=report_progress
+        )
+        return self._add_aligned_matches(matches, dialogues, json_data)
+    
+    def _add_aligned_matches(self, matches: List[Dict[str, Any]], 
+                             dialogues: List[Dict[str, str]], 
+                             json_data: Dict[str, Any]) -> Set[int]:
+        """Add ordered {"index", "start", "end"} matches to the results"""
+        matched_dialogues = set()
+        
+        # Convert every IN and OUT to frames in one pass
+        in_times = timecodes_from_seconds([match["start"] for match in matches], self.frame_rate)
+        out_times = timecodes_from_seconds([match["end"] for match in matches], self.frame_rate)
+        for match, in_time, out_time in zip(matches, in_times, out_times):
+            self._add_matched_dialogue(
+                json_data, 
+                match["index"], 
+                in_time, 
+                out_time, 
+                dialogues
+            )
+            matched_dialogues.add(match["index"])
+        
+        return matched_dialogues
+    
+    def _process_segments_matrix(self, transcription: Dict[str, Any], 
+                                 dialogues: List[Dict[str, str]], 
+                                 json_data: Dict[str, Any]) -> Set[int]:
+        """
+        Match segments greedily using a precomputed similarity matrix
+        
+        The matrix ranks every dialogue for a segment in one pass; only the
+        best few unmatched ones are confirmed with similar() so the threshold
+        keeps its usual meaning.
+        """
+        matched_dialogues = set()
+        segments = transcription["segments"]
+        if not segments or not dialogues:
+            return matched_dialogues
+        
+        self.on_log("Calculando matriz de similitud...")
+        segment_texts = [segment["text"].strip() for segment in segments]
+        scores = similarity_matrix(segment_texts, [d["dialogue"] for d in dialogues])
+        available = np.ones(len(dialogues), dtype=bool)
+        candidate_count = min(self.options["matrix_candidates"], len(dialogues))
+        
+        self.on_log("Sincronizando segmentos...")
+        total_segments = len(segments)
+        
+        for segment_idx, segment in enumerate(segments):
+            if segment_idx % 20 == 0:
+                self.on_progress(55 + int((segment_idx / total_segments) * 35))
+            
+            row = np.where(available, scores[segment_idx], -1.0)
+            candidates = np.argpartition(row, -candidate_count)[-candidate_count:]
+            candidates = [int(i) for i in candidates if available[i]]
+            
+            best_match = self._score_dialogues(segment_texts[segment_idx], dialogues, candidates)
+            if best_match["score"] > self.SIMILARITY_THRESHOLD and best_match["index"] >= 0:
+                self._add_matched_dialogue(
+                    json_data, 
+                    best_match["index"], 
+                    segment["start"], 
+                    segment["end"], 
+                    dialogues
+                )
+                matched_dialogues.add(best_match["index"])
+                available[best_match["index"]] = False
+        
+        return matched_dialogues
+    
+    def _process_segments_windowed(self, transcription: Dict[str, Any], 
+                                   dialogues: List[Dict[str, str]], 
+                                   json_data: Dict[str, Any]) -> Set[int]:
+        """Match segments in order, searching only near the last confident match"""
+        matched_dialogues = set()
+        find_match = self._create_match_function(dialogues, matched_dialogues)
+        segments = transcription["segments"]
+        
+        self.on_log("Sincronizando segmentos...")
+        batch_size = 50
+        for start in range(0, len(segments), batch_size):
+            # Update progress (55% to 90%)
+            self.on_progress(55 + int((start / len(segments)) * 35))
+            self._match_segments_incrementally(
+                segments[start:start + batch_size], dialogues, matched_dialogues, find_match, json_data
+            )
+        
+        return matched_dialogues
+    
+    def _process_segments_greedy(self, transcription: Dict[str, Any], 
+                                 dialogues: List[Dict[str, str]], 
+                                 json_data: Dict[str, Any]) -> Set[int]:
+        """Process each transcribed segment and match with dialogues"""
+        matched_dialogues = set()
+        index = DialogueIndex(dialogues) if self.options["candidate_pruning"] else None
+        
+        self.on_log("Sincronizando segmentos...")
+        total_segments = len(transcription["segments"])
+        
+        for segment_idx, segment in enumerate(transcription["segments"]):
+            # Update progress (55% to 90%)
+            progress = 55 + int((segment_idx / total_segments) * 35)
+            self.on_progress(progress)
+            
+            if segment_idx % 5 == 0:
+                self.on_log(f"Procesando segmento {segment_idx+1} de {total_segments}...")
+            
+            text = segment["text"].strip()
+            start_time = segment["start"]
+            end_time = segment["end"]
+            
+            best_match = self._find_best_dialogue_match(text, dialogues, matched_dialogues, index)
+            
+            if best_match["score"] > self.SIMILARITY_THRESHOLD and best_match["index"] >= 0:
+                self._add_matched_dialogue(
+                    json_data, 
+                    best_match["index"], 
+                    start_time, 
+                    end_time, 
+                    dialogues
+                )
+                matched_dialogues.add(best_match["index"])
+        
+        return matched_dialogues
+    
+    def _find_best_dialogue_match(self, text: str, 
+                                 dialogues: List[Dict[str, str]], 
+                                 matched_dialogues: Set[int],
+                                 index: Optional[DialogueIndex] = None) -> Dict[str, Any]:
+        """
+        Find the best matching dialogue for a transcribed segment
+        
+        With an index only the top candidates are scored; the exhaustive scan
+        is used when there is no index or the candidates are too weak.
+        """
+        if index is not None:
+            candidates = index.candidates(
+                text, 
+                self.options["candidate_count"], 
+                exclude=matched_dialogues
+            )
+            best_match = self._score_dialogues(text, dialogues, candidates)
+            if best_match["score"] > self.SIMILARITY_THRESHOLD:
+                return best_match
+        
+        unmatched = (i for i in range(len(dialogues)) if i not in matched_dialogues)
+        return self._score_dialogues(text, dialogues, unmatched)
+    
+    def _score_dialogues(self, text: str, 
+                         dialogues: List[Dict[str, str]], 
+                         dialogue_indices: Iterable[int]) -> Dict[str, Any]:
+        """Score the given dialogues against the text and keep the best one"""
+        if self.options["similarity_backend"] == SIMILARITY_BACKEND_NUMBA:
+            return self._score_dialogues_compiled(text, dialogues, dialogue_indices)
+        
+        best_match_score = 0
+        best_match_index = -1
+        text_lower = text.lower()
+        
+        for i in dialogue_indices:
+            # Script dialogues carry their lowercased text from parse time
+            lowered = getattr(dialogues[i], "lowered", None)
+            if lowered is not None:
+                similarity = similar_lowered(text_lower, lowered)
+            else:
+                similarity = similar(text, dialogues[i]["dialogue"])
+            
+            if similarity > best_match_score:
+                best_match_score = similarity
+                best_match_index = i
+        
+        return {
+            "score": best_match_score,
+            "index": best_match_index
+        }
+    
+    def _score_dialogues_compiled(self, text: str, 
+                                  dialogues: List[Dict[str, str]], 
+                                  dialogue_indices: Iterable[int]) -> Dict[str, Any]:
+        """Score the given dialogues in parallel with the compiled edit-distance kernel"""
+        from src.core.edit_distance import encode_texts, similarity_to_many
+        
+        # Encode the script once per dialogue list
+        if self._encoded_dialogues is None or self._encoded_dialogues[0] is not dialogues:
+            buffer, offsets = encode_texts([d["dialogue"] for d in dialogues])
+            self._encoded_dialogues = (dialogues, buffer, offsets)
+        _, buffer, offsets = self._encoded_dialogues
+        
+        indices = np.fromiter(dialogue_indices, dtype=np.int64)
+        if len(indices) == 0:
+            return {"score": 0, "index": -1}
+        
+        scores = similarity_to_many(text, buffer, offsets, indices)
+        best = int(np.argmax(scores))
+        if scores[best] <= 0:
+            return {"score": 0, "index": -1}
+        
+        return {
+            "score": float(scores[best]),
+            "index": int(indices[best])
+        }
+    
+    def _add_matched_dialogue(self, json_data: Dict[str, Any], 
+                             dialogue_index: int, 
+                             start_time: Union[float, Timecode], 
+                             end_time: Union[float, Timecode],
+                             dialogues: List[Dict[str, str]]) -> Dict[str, Any]:
+        """
+        Add a matched dialogue to the JSON data and return the new entry
+        
+        IN and OUT are stored as Timecode (integer frames at the run's frame
+        rate); they become strings only when saved or displayed.
+        """
+        if not isinstance(start_time, Timecode):
+            start_time = Timecode.from_seconds(start_time, self.frame_rate)
+        if not isinstance(end_time, Timecode):
+            end_time = Timecode.from_seconds(end_time, self.frame_rate)
+        entry = {
+            "ID": dialogue_index,
+            "IN": start_time,
+            "OUT": end_time,
+            "PERSONAJE": dialogues[dialogue_index]["character"],
+            "DIÁLOGO": dialogues[dialogue_index]["dialogue"],
+            "SCENE": 1
+        }
+        json_data["data"].append(entry)
+        return entry
+    
+    @traced("unmatched")
+    def _add_unmatched_dialogues(self, dialogues: List[Dict[str, str]], 
+                                matched_dialogues: Set[int], 
+                                json_data: Dict[str, Any]) -> None:
+        """Add unmatched dialogues with default timestamps"""
+        self.on_progress(90)
+        self.on_log("Añadiendo diálogos no coincidentes...")
+        
+        unset = Timecode(0, self.frame_rate)
+        for i in range(len(dialogues)):
+            if i not in matched_dialogues:
+                entry = {
+                    "ID": i,
+                    "IN": unset,
+                    "OUT": unset,
+                    "PERSONAJE": dialogues[i]["character"],
+                    "DIÁLOGO": dialogues[i]["dialogue"],
+                    "SCENE": 1
+                }
+                json_data["data"].append(entry)
+        
+        # Sort the data by ID to maintain script order
+        json_data["data"].sort(key=lambda x: x["ID"])
+    
+    def _finalize_results(self, dialogues: List[Dict[str, str]], 
+                         matched_dialogues: Set[int], 
+                         json_data: Dict[str, Any]) -> None:
+        """Log the final counts and record them in stats"""
+        self.stats = {
+            "dialogues": len(dialogues),
+            "matched": len(matched_dialogues)
+        }
+        self.on_progress(95)
+        self.on_log(f"\nProcesados {len(dialogues)} diálogos")
+        self.on_log(f"Coincidentes: {len(matched_dialogues)}")
+        self.on_log(f"No coincidentes: {len(dialogues) - len(matched_dialogues)}")
+        
+        self.on_progress(100)
+
+
+def _ignore(_value: Any) -> None:
+    """Default callback that discards log and progress updates"""
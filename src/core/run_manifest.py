@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from src.core.utils import file_stat_key, remove_quietly
+
+
+# Script lines re-matched on each side of an edit
+DEFAULT_NEIGHBORHOOD = 2
+
+
+class RunManifestStore:
+    """
+    Manifiestos de las últimas sincronizaciones, uno por audio y guion
+
+    Un manifiesto guarda la clave de la transcripción en TranscriptionCache,
+    los diálogos del guion y la tabla de coincidencias en fotogramas, de modo
+    que una nueva sincronización tras editar el guion solo tiene que volver a
+    emparejar las líneas modificadas.
+    """
+    # Constants
+    DEFAULT_MANIFEST_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sync_script", "runs")
+    MANIFEST_VERSION = 1
+    ENTRY_SUFFIX = ".json"
+
+    def __init__(self, manifest_dir: Optional[str] = None):
+        self.manifest_dir = manifest_dir or self.DEFAULT_MANIFEST_DIR
+        Path(self.manifest_dir).mkdir(parents=True, exist_ok=True)
+
+    def make_key(self, audio_path: str, script_path: str, settings: Dict[str, Any]) -> str:
+        """
+        Construye la clave del manifiesto de un audio y un guion
+
+        El guion entra por su ruta y no por su contenido: el manifiesto debe
+        encontrarse precisamente cuando el guion ha cambiado. El audio entra
+        por su ruta, fecha y tamaño (file_stat_key) para no leerlo entero en
+        cada resincronización; el manifiesto ya apunta a su transcripción.
+
+        Args:
+            audio_path (str): Ruta al archivo de audio
+            script_path (str): Ruta al guion
+            settings (Dict[str, Any]): Opciones que cambian el resultado
+
+        Returns:
+            str: Clave hexadecimal
+        """
+        parameters = json.dumps({
+            "audio": list(file_stat_key(audio_path)),
+            "script": os.path.abspath(script_path),
+            "settings": settings
+        }, sort_keys=True)
+        return hashlib.sha256(parameters.encode("utf-8")).hexdigest()
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Lee un manifiesto
+
+        Args:
+            key (str): Clave devuelta por make_key
+
+        Returns:
+            Optional[Dict[str, Any]]: Manifiesto o None si no existe o es de otra versión
+        """
+        try:
+            with open(self._entry_path(key), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("version") != self.MANIFEST_VERSION:
+            return None
+        return manifest
+
+    def save(self, key: str, transcription_key: str,
+             dialogues: Sequence[Dict[str, str]],
+             matches: List[Tuple[int, int, int]]) -> None:
+        """
+        Guarda el manifiesto de una sincronización
+
+        Args:
+            key (str): Clave devuelta por make_key
+            transcription_key (str): Clave de la transcripción en TranscriptionCache
+            dialogues (Sequence[Dict[str, str]]): Diálogos del guion
+            matches (List[Tuple[int, int, int]]): (diálogo, IN, OUT) en fotogramas
+        """
+        manifest = {
+            "version": self.MANIFEST_VERSION,
+            "transcription_key": transcription_key,
+            "dialogues": [[dialogue["character"], dialogue["dialogue"]] for dialogue in dialogues],
+            "matches": [list(match) for match in matches]
+        }
+        entry_path = self._entry_path(key)
+        temp_path = f"{entry_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(temp_path, entry_path)
+
+    def clear(self) -> None:
+        """Elimina todos los manifiestos"""
+        with os.scandir(self.manifest_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(self.ENTRY_SUFFIX):
+                    remove_quietly(entry.path)
+
+    def _entry_path(self, key: str) -> str:
+        """Path of the manifest file for a key"""
+        return os.path.join(self.manifest_dir, f"{key}{self.ENTRY_SUFFIX}")
+
+
+def diff_dialogues(old_dialogues: Sequence[Sequence[str]],
+                   new_dialogues: Sequence[Dict[str, str]],
+                   neighborhood: int = DEFAULT_NEIGHBORHOOD) -> Tuple[Dict[int, int], List[Tuple[int, int]]]:
+    """
+    Compara dos versiones de un guion línea a línea
+
+    Las líneas insertadas o modificadas, y neighborhood líneas a cada lado
+    (también alrededor de las eliminadas), quedan pendientes de emparejar;
+    el resto conserva su coincidencia anterior.
+
+    Args:
+        old_dialogues (Sequence[Sequence[str]]): (personaje, diálogo) de la versión anterior
+        new_dialogues (Sequence[Dict[str, str]]): Diálogos de la versión nueva
+        neighborhood (int): Líneas vecinas que se vuelven a emparejar
+
+    Returns:
+        Tuple[Dict[int, int], List[Tuple[int, int]]]: Índice anterior de cada
+        línea nueva que se conserva, y rangos [inicio, fin) de líneas nuevas
+        que hay que volver a emparejar
+    """
+    old_lines = [tuple(dialogue) for dialogue in old_dialogues]
+    new_lines = [(dialogue["character"], dialogue["dialogue"]) for dialogue in new_dialogues]
+    n_new = len(new_lines)
+
+    kept: Dict[int, int] = {}
+    dirty: Set[int] = set()
+    opcodes = SequenceMatcher(None, old_lines, new_lines, autojunk=False).get_opcodes()
+    for tag, old_start, _, new_start, new_end in opcodes:
+        if tag == "equal":
+            for offset in range(new_end - new_start):
+                kept[new_start + offset] = old_start + offset
+            continue
+        # A deletion has an empty new range; its neighbours still need a look
+        first = max(0, new_start - neighborhood)
+        last = min(n_new, new_end + neighborhood)
+        dirty.update(range(first, last))
+
+    for index in dirty:
+        kept.pop(index, None)
+    return kept, _ranges(sorted(dirty))
+
+
+def add_to_ranges(ranges: List[Tuple[int, int]],
+                  indices: Iterable[int]) -> List[Tuple[int, int]]:
+    """
+    Añade índices sueltos a una lista de rangos [inicio, fin)
+
+    Args:
+        ranges (List[Tuple[int, int]]): Rangos devueltos por diff_dialogues
+        indices (Iterable[int]): Índices que también hay que volver a emparejar
+
+    Returns:
+        List[Tuple[int, int]]: Rangos ordenados que cubren ambos
+    """
+    covered = {index for start, end in ranges for index in range(start, end)}
+    covered.update(indices)
+    return _ranges(sorted(covered))
+
+
+def _ranges(indices: List[int]) -> List[Tuple[int, int]]:
+    """Group sorted indices into half-open runs of consecutive values"""
+    ranges: List[Tuple[int, int]] = []
+    for index in indices:
+        if ranges and ranges[-1][1] == index:
+            ranges[-1] = (ranges[-1][0], index + 1)
+        else:
+            ranges.append((index, index + 1))
+    return ranges
@@ -1,96 +1,226 @@
-from typing import List, Dict, Any
+import hashlib
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
+
+from src.core.utils import normalize_text
+
+
+class Dialogue:
+    """
+    Diálogo del guion con sus formas precalculadas para comparar
+
+    Se comporta como el diccionario que devolvía read_script para las claves
+    "character" y "dialogue".
+    """
+    __slots__ = ("character", "dialogue", "lowered", "normalized", "token_ids", "text_hash")
+
+    def __init__(self, character: str, dialogue: str, vocabulary: Dict[str, int]):
+        self.character = character
+        self.dialogue = dialogue
+        self.lowered = dialogue.lower()
+        self.normalized = normalize_text(dialogue)
+        self.token_ids = array('I', (vocabulary.setdefault(word, len(vocabulary))
+                                     for word in self.normalized.split()))
+        self.text_hash = text_hash(self.normalized)
+
+    def __getitem__(self, key: str) -> str:
+        if key == "character":
+            return self.character
+        if key == "dialogue":
+            return self.dialogue
+        raise KeyError(key)
+
+    def to_dict(self) -> Dict[str, str]:
+        """Representación como diccionario, igual que la de read_script"""
+        return {
+            "character": self.character,
+            "dialogue": self.dialogue
+        }
+
+
+class Script:
+    """
+    Guion analizado: texto original, diálogos en orden y vocabulario de palabras
+
+    Se puede usar como una lista de Dialogue (len, índice, iteración).
+    """
+    __slots__ = ("path", "text", "dialogues", "vocabulary")
+
+    def __init__(self, path: str, text: str, dialogues: List[Dialogue], vocabulary: Dict[str, int]):
+        self.path = path
+        self.text = text
+        self.dialogues = dialogues
+        self.vocabulary = vocabulary
+
+    def __len__(self) -> int:
+        return len(self.dialogues)
+
+    def __getitem__(self, index: int) -> Dialogue:
+        return self.dialogues[index]
+
+    def __iter__(self) -> Iterator[Dialogue]:
+        return iter(self.dialogues)
+
+    def as_dicts(self) -> List[Dict[str, str]]:
+        """Lista de diccionarios con personajes y diálogos"""
+        return [dialogue.to_dict() for dialogue in self.dialogues]
 
 
 def read_script(script_path: str) -> List[Dict[str, str]]:
     """
     Lee un archivo de guion y extrae los diálogos y personajes
-    
+
     Args:
         script_path (str): Ruta al archivo de guion
-        
+
     Returns:
         list: Lista de diccionarios con personajes y diálogos
     """
-    dialogues = []
-    
-    # Read and filter the script file
-    filtered_lines = _read_and_filter_script(script_path)
-    
-    # Process the filtered lines to extract characters and dialogues
-    i = 0
-    while i < len(filtered_lines):
-        if _is_character_line(filtered_lines[i]):
-            character = filtered_lines[i]
-            i += 1
-            
-            dialogue_parts, i = _collect_dialogue_parts(filtered_lines, i)
-            
-            if dialogue_parts:
-                full_dialogue = " ".join(dialogue_parts)
-                dialogues.append({
-                    "character": character,
-                    "dialogue": full_dialogue
-                })
-            else:
-                dialogues.append({
-                    "character": character,
-                    "dialogue": ""
-                })
-        else:
-            i += 1
-    
-    return dialogues
-
-
-def _read_and_filter_script(script_path: str) -> List[str]:
-    """
-    Read the script file and filter out empty lines and stage directions
-    
+    return load_script(script_path).as_dicts()
+
+
+def load_script(script_path: str) -> Script:
+    """
+    Devuelve el guion analizado, reutilizando el análisis previo si el archivo
+    no ha cambiado (misma ruta, fecha de modificación y tamaño)
+
     Args:
-        script_path (str): Path to the script file
-        
+        script_path (str): Ruta al archivo de guion
+
     Returns:
-        List[str]: Filtered lines from the script
+        Script: Guion analizado, compartido entre todos los que lo piden
     """
+    stat = os.stat(script_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    cached = cached_script(script_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
     with open(script_path, 'r', encoding='utf-8') as file:
-        lines = file.readlines()
-    
-    # Filter out empty lines and stage directions that start with '|'
-    return [line.strip() for line in lines if line.strip() and not line.strip().startswith('|')]
+        script = parse_script(file, script_path)
+    store_script(script_path, signature, script)
+    return script
+
+
+def cached_script(script_path: str) -> Optional[Tuple[Tuple[int, int], Script]]:
+    """
+    Último análisis guardado de un guion, sin comprobar si el archivo ha cambiado
+
+    Args:
+        script_path (str): Ruta al archivo de guion
+
+    Returns:
+        Optional[Tuple[Tuple[int, int], Script]]: (st_mtime_ns, st_size) del
+        archivo analizado y el guion, o None si no se ha analizado
+    """
+    key = os.path.abspath(script_path)
+    with _cache_lock:
+        cached = _script_cache.get(key)
+        if cached is not None:
+            _script_cache.move_to_end(key)
+        return cached
+
+
+def store_script(script_path: str, signature: Tuple[int, int], script: Script) -> None:
+    """
+    Guarda un guion analizado para las siguientes llamadas a load_script
+
+    Sirve también para pasar a otro proceso el análisis hecho en este
+    (cached_script en el origen, store_script en el destino).
+
+    Args:
+        script_path (str): Ruta al archivo de guion
+        signature (Tuple[int, int]): (st_mtime_ns, st_size) del archivo analizado
+        script (Script): Guion analizado
+    """
+    key = os.path.abspath(script_path)
+    with _cache_lock:
+        _script_cache[key] = (signature, script)
+        _script_cache.move_to_end(key)
+        while len(_script_cache) > SCRIPT_CACHE_SIZE:
+            _script_cache.popitem(last=False)
+
+
+def clear_script_cache() -> None:
+    """Olvida los guiones analizados, para forzar una nueva lectura"""
+    with _cache_lock:
+        _script_cache.clear()
+
+
+def parse_script(lines: Iterable[str], script_path: str = "") -> Script:
+    """
+    Analiza un guion en una sola pasada
+
+    Se ignoran las líneas vacías y las acotaciones que empiezan por '|'.
+    Una línea en mayúsculas abre un diálogo nuevo y las siguientes líneas
+    se unen como su texto hasta el próximo personaje.
+
+    Args:
+        lines (Iterable[str]): Líneas del guion, p. ej. un archivo abierto
+        script_path (str): Ruta de origen, solo informativa
+
+    Returns:
+        Script: Guion analizado
+    """
+    raw_lines = []
+    dialogues: List[Dialogue] = []
+    vocabulary: Dict[str, int] = {}
+    character: Optional[str] = None
+    dialogue_parts: List[str] = []
+
+    for raw_line in lines:
+        raw_lines.append(raw_line)
+        line = raw_line.strip()
+        if not line or line.startswith('|'):
+            continue
+
+        if _is_character_line(line):
+            if character is not None:
+                dialogues.append(Dialogue(character, " ".join(dialogue_parts), vocabulary))
+            character = line
+            dialogue_parts = []
+        elif character is not None:
+            dialogue_parts.append(line)
+
+    if character is not None:
+        dialogues.append(Dialogue(character, " ".join(dialogue_parts), vocabulary))
+
+    return Script(script_path, "".join(raw_lines), dialogues, vocabulary)
+
+
+def text_hash(text: str) -> int:
+    """
+    Hash estable (entre procesos y ejecuciones) de un texto
+
+    Args:
+        text (str): Texto, normalmente ya normalizado
+
+    Returns:
+        int: Hash de 64 bits
+    """
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
 
 
 def _is_character_line(line: str) -> bool:
     """
     Check if a line represents a character name
-    
+
     Args:
         line (str): The line to check
-        
+
     Returns:
         bool: True if the line is a character name, False otherwise
     """
-    return (line.isupper() and 
-            not line.startswith('<') and 
+    return (line.isupper() and
+            not line.startswith('<') and
             not line.startswith('('))
 
 
-def _collect_dialogue_parts(filtered_lines: List[str], start_index: int) -> tuple:
-    """
-    Collect all dialogue parts for a character
-    
-    Args:
-        filtered_lines (List[str]): The filtered script lines
-        start_index (int): The index to start collecting from
-        
-    Returns:
-        tuple: (dialogue_parts, new_index)
-    """
-    dialogue_parts = []
-    i = start_index
-    
-    while (i < len(filtered_lines) and 
-           not _is_character_line(filtered_lines[i])):
-        dialogue_parts.append(filtered_lines[i])
-        i += 1
-    
-    return dialogue_parts, i
\ No newline at end of file
+# Parsed scripts by absolute path, with the (mtime, size) they were parsed from
+SCRIPT_CACHE_SIZE = 8
+_script_cache: "OrderedDict[str, Tuple[Tuple[int, int], Script]]" = OrderedDict()
+_cache_lock = threading.Lock()
@@ -0,0 +1,124 @@
+import zlib
+from typing import List, Tuple
+
+import numpy as np
+
+from src.core.utils import normalize_text
+
+
+# Default vectorizer parameters
+DEFAULT_NGRAM_SIZE = 3
+DEFAULT_FEATURES = 2 ** 12
+
+
+def similarity_matrix(segment_texts: List[str],
+                      dialogue_texts: List[str],
+                      ngram_size: int = DEFAULT_NGRAM_SIZE,
+                      n_features: int = DEFAULT_FEATURES) -> np.ndarray:
+    """
+    Calcula de una vez la similitud entre todos los segmentos y todos los diálogos
+
+    Cada texto se representa como un vector TF-IDF de n-gramas de caracteres
+    proyectados con hashing a un número fijo de columnas; la similitud es el
+    coseno entre vectores, obtenido con un único producto de matrices.
+
+    Args:
+        segment_texts (List[str]): Textos de los segmentos transcritos
+        dialogue_texts (List[str]): Textos de los diálogos del guion
+        ngram_size (int): Longitud de los n-gramas de caracteres
+        n_features (int): Número de columnas del espacio hash
+
+    Returns:
+        np.ndarray: Matriz float32 (segmentos x diálogos) con valores entre 0 y 1
+    """
+    segment_vectors, dialogue_vectors = tfidf_vectors(segment_texts, dialogue_texts,
+                                                      ngram_size, n_features)
+    return segment_vectors @ dialogue_vectors.T
+
+
+def tfidf_vectors(segment_texts: List[str],
+                  dialogue_texts: List[str],
+                  ngram_size: int = DEFAULT_NGRAM_SIZE,
+                  n_features: int = DEFAULT_FEATURES) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectores TF-IDF normalizados de segmentos y diálogos, sin multiplicarlos
+
+    El idf se calcula sobre los diálogos. Sirve cuando solo hacen falta
+    algunos pares (por ejemplo, una banda alrededor de la diagonal).
+
+    Args:
+        segment_texts (List[str]): Textos de los segmentos transcritos
+        dialogue_texts (List[str]): Textos de los diálogos del guion
+        ngram_size (int): Longitud de los n-gramas de caracteres
+        n_features (int): Número de columnas del espacio hash
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Matrices float32 (segmentos x n_features)
+        y (diálogos x n_features) con filas de norma 1 (o 0)
+    """
+    segment_counts = _hashed_counts(segment_texts, ngram_size, n_features)
+    dialogue_counts = _hashed_counts(dialogue_texts, ngram_size, n_features)
+
+    idf = _inverse_document_frequency(dialogue_counts)
+    return _tfidf(segment_counts, idf), _tfidf(dialogue_counts, idf)
+
+
+def _hashed_counts(texts: List[str], ngram_size: int, n_features: int) -> np.ndarray:
+    """
+    Count the hashed character n-grams of each text
+
+    Args:
+        texts (List[str]): Raw texts
+        ngram_size (int): Length of the character n-grams
+        n_features (int): Number of hash buckets
+
+    Returns:
+        np.ndarray: float32 matrix (texts x n_features) of n-gram counts
+    """
+    rows = []
+    columns = []
+    for row, text in enumerate(texts):
+        padded = f" {normalize_text(text)} "
+        for i in range(len(padded) - ngram_size + 1):
+            rows.append(row)
+            columns.append(zlib.crc32(padded[i:i + ngram_size].encode("utf-8")) % n_features)
+
+    counts = np.zeros((len(texts), n_features), dtype=np.float32)
+    np.add.at(counts, (np.asarray(rows, dtype=np.intp), np.asarray(columns, dtype=np.intp)), 1.0)
+    return counts
+
+
+def _inverse_document_frequency(counts: np.ndarray) -> np.ndarray:
+    """
+    Smoothed inverse document frequency of each hash bucket
+
+    Args:
+        counts (np.ndarray): n-gram counts of the reference documents
+
+    Returns:
+        np.ndarray: float32 idf weight per column
+    """
+    n_documents = counts.shape[0]
+    document_frequency = np.count_nonzero(counts, axis=0)
+    return (np.log((1.0 + n_documents) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+
+
+def _tfidf(counts: np.ndarray, idf: np.ndarray) -> np.ndarray:
+    """
+    Turn raw counts into L2-normalised, sublinear TF-IDF row vectors
+
+    Args:
+        counts (np.ndarray): n-gram counts
+        idf (np.ndarray): idf weight per column
+
+    Returns:
+        np.ndarray: float32 matrix with unit-length (or zero) rows
+    """
+    weights = np.zeros_like(counts)
+    nonzero = counts > 0
+    weights[nonzero] = 1.0 + np.log(counts[nonzero])
+    weights *= idf
+
+    norms = np.linalg.norm(weights, axis=1, keepdims=True)
+    np.divide(weights, norms, out=weights, where=norms > 0)
+    return weights
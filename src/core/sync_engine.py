@@ -0,0 +1,390 @@
+import atexit
+import multiprocessing
+import pickle
+import queue
+import threading
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from src.core.pipeline import SyncCancelled, SyncPipeline
+from src.core.script_parser import cached_script, store_script
+
+
+# Payloads at least this large travel through shared memory instead of the pipe
+SHARED_MEMORY_THRESHOLD = 64 * 1024
+
+# Idle engines kept for the next sync, with their models still loaded
+MAX_IDLE_ENGINES = 1
+
+
+class EngineError(Exception):
+    """La sincronización ha fallado en el proceso motor, o el proceso ha terminado"""
+
+
+class SyncEngine:
+    """
+    Proceso motor que ejecuta SyncPipeline fuera del proceso de la interfaz
+
+    La transcripción y el emparejamiento no compiten por el GIL con el hilo
+    de Qt. Los mensajes, el progreso y las órdenes (ejecutar, cancelar)
+    viajan por dos tuberías de un solo sentido; los datos grandes (filas
+    parciales, resultados) se escriben en memoria compartida y por la
+    tubería solo pasa su nombre. El proceso sirve una sincronización tras
+    otra, así que el modelo Whisper sigue cargado en su registro entre
+    ejecuciones. Si el proceso de la interfaz ya ha analizado el guion
+    (vista previa), el análisis viaja con la orden y el motor no lo repite.
+    """
+    JOIN_TIMEOUT_SECONDS = 5.0
+
+    def __init__(self):
+        # spawn: never fork a process that holds Qt and worker threads
+        context = multiprocessing.get_context("spawn")
+        commands_reader, self._commands = context.Pipe(duplex=False)
+        self._events, events_writer = context.Pipe(duplex=False)
+        # Not a daemon: the pipeline starts its own process pools (anchored
+        # gaps, chunk workers), which daemonic processes may not do. close(),
+        # shutdown_engines() and the exit hook stop it instead
+        self._process = context.Process(target=_engine_main, args=(commands_reader, events_writer),
+                                        name="sync-engine", daemon=False)
+        self._process.start()
+        with _idle_lock:
+            _live_engines.add(self)
+        # The child holds its own ends; closing ours lets recv() see it exit
+        commands_reader.close()
+        events_writer.close()
+        self._lock = threading.Lock()
+        self._running = False
+        # Between acquire_engine() and release_engine(): a cancel that comes
+        # before run() is kept for it; outside that window there is no sync
+        self._reserved = False
+        self._cancel_pending = False
+
+    def run(self, audio_path: str, script_path: str, options: Optional[Dict[str, Any]],
+            on_log: Callable[[str], None], on_progress: Callable[[int], None],
+            on_partial: Callable[[List[Dict[str, Any]]], None]) -> Dict[str, Any]:
+        """
+        Ejecuta una sincronización en el proceso motor y espera al resultado
+
+        Los callbacks se llaman desde el hilo que ejecuta run(), igual que
+        los de SyncPipeline.
+
+        Args:
+            audio_path (str): Ruta al archivo de audio
+            script_path (str): Ruta al guion
+            options (Optional[Dict[str, Any]]): Opciones de SyncPipeline
+            on_log (Callable[[str], None]): Recibe cada mensaje
+            on_progress (Callable[[int], None]): Recibe cada porcentaje
+            on_partial (Callable[[List[Dict[str, Any]]], None]): Recibe las filas parciales
+
+        Returns:
+            Dict[str, Any]: "json_data" (resultado de SyncPipeline.run), "stats"
+            y "spans" (etapas medidas, ver Tracer.records)
+
+        Raises:
+            SyncCancelled: Si se ha llamado a cancel()
+            EngineError: Si la sincronización falla o el proceso termina
+        """
+        shared = cached_script(script_path)
+        with self._lock:
+            self._send(("run", audio_path, script_path, options, shared))
+            self._running = True
+            if self._cancel_pending:
+                self._send(("cancel",))
+                self._cancel_pending = False
+        try:
+            while True:
+                message = self._receive()
+                kind = message[0]
+                if kind == "log":
+                    on_log(message[1])
+                elif kind == "progress":
+                    on_progress(message[1])
+                elif kind == "partial":
+                    on_partial(self._unpack(message[1]))
+                elif kind == "result":
+                    return self._unpack(message[1])
+                elif kind == "cancelled":
+                    raise SyncCancelled(message[1])
+                elif kind == "error":
+                    raise EngineError(message[1])
+        finally:
+            with self._lock:
+                self._running = False
+                self._cancel_pending = False
+
+    def cancel(self) -> None:
+        """
+        Pide la cancelación cooperativa de la sincronización en curso (desde cualquier hilo)
+
+        Si el motor está reservado y run() todavía no ha enviado la
+        sincronización, la cancelación se envía justo después. Sin
+        sincronización en curso ni pendiente, no hace nada.
+        """
+        with self._lock:
+            if self._running:
+                self._send(("cancel",))
+            elif self._reserved:
+                self._cancel_pending = True
+
+    def is_alive(self) -> bool:
+        """Indica si el proceso motor sigue en marcha"""
+        return self._process.is_alive()
+
+    def close(self) -> None:
+        """Detiene el proceso motor al terminar la sincronización en curso"""
+        with _idle_lock:
+            _live_engines.discard(self)
+        with self._lock:
+            try:
+                self._send(("stop",))
+            except EngineError:
+                pass
+        self._process.join(self.JOIN_TIMEOUT_SECONDS)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+        self._commands.close()
+        self._events.close()
+
+    def _set_reserved(self, reserved: bool) -> None:
+        """Mark the engine as handed out or returned; either way, forget old cancels"""
+        with self._lock:
+            self._reserved = reserved
+            self._cancel_pending = False
+
+    def _send(self, command: Tuple[Any, ...]) -> None:
+        """Send a command to the engine (caller holds self._lock)"""
+        try:
+            self._commands.send(command)
+        except (OSError, ValueError) as e:
+            raise EngineError(f"No se pudo comunicar con el motor de sincronización: {str(e)}")
+
+    def _receive(self) -> Tuple[Any, ...]:
+        """Next event from the engine; a closed pipe means the process died"""
+        try:
+            return self._events.recv()
+        except (EOFError, OSError):
+            self._process.join(self.JOIN_TIMEOUT_SECONDS)
+            raise EngineError("El motor de sincronización se ha detenido inesperadamente "
+                              f"(código de salida {self._process.exitcode})")
+
+    def _unpack(self, payload: Tuple[Any, ...]) -> Any:
+        """Decode an inline or shared-memory payload and free its segment"""
+        if payload[0] == "inline":
+            return pickle.loads(payload[1])
+        _, name, size = payload
+        segment = _attach_segment(name)
+        view = segment.buf[:size]
+        try:
+            return pickle.loads(view)
+        finally:
+            view.release()
+            segment.close()
+            # The engine created the segment, so it unlinks it
+            with self._lock:
+                self._send(("release", name))
+
+
+_idle_engines: List[SyncEngine] = []
+# Every engine not yet closed, idle or running, for the exit hook
+_live_engines: Set[SyncEngine] = set()
+_idle_lock = threading.Lock()
+
+
+def acquire_engine() -> SyncEngine:
+    """
+    Devuelve un proceso motor libre, arrancando uno nuevo si no hay
+
+    Cada llamada debe ir seguida de release_engine() al terminar.
+
+    Returns:
+        SyncEngine: Motor listo para run()
+    """
+    with _idle_lock:
+        while _idle_engines:
+            engine = _idle_engines.pop()
+            if engine.is_alive():
+                engine._set_reserved(True)
+                return engine
+            engine.close()
+    engine = SyncEngine()
+    engine._set_reserved(True)
+    return engine
+
+
+def release_engine(engine: SyncEngine) -> None:
+    """
+    Devuelve un motor: se conserva para la siguiente sincronización si hay
+    sitio entre los libres (MAX_IDLE_ENGINES) y, si no, se detiene
+
+    Args:
+        engine (SyncEngine): Motor obtenido con acquire_engine()
+    """
+    # A cancel that lands after run() returned must not reach the next sync
+    engine._set_reserved(False)
+    with _idle_lock:
+        if engine.is_alive() and len(_idle_engines) < MAX_IDLE_ENGINES:
+            _idle_engines.append(engine)
+            return
+    engine.close()
+
+
+def shutdown_engines() -> None:
+    """Detiene los motores libres (al cerrar la aplicación)"""
+    with _idle_lock:
+        engines = list(_idle_engines)
+        _idle_engines.clear()
+    for engine in engines:
+        engine.close()
+
+
+@atexit.register
+def _close_all_engines() -> None:
+    """Stop every engine, busy ones included, so interpreter exit never waits on one"""
+    shutdown_engines()
+    with _idle_lock:
+        engines = list(_live_engines)
+    for engine in engines:
+        engine.close()
+
+
+def _attach_segment(name: str) -> shared_memory.SharedMemory:
+    """
+    Open a segment created by the engine without taking ownership of it
+
+    The engine is a spawn child and shares this process's resource tracker,
+    which holds one registration per name: the engine's, removed when it
+    unlinks the segment. Unregistering here would drop that registration
+    (the tracker then fails on the engine's unlink, and a crashed engine's
+    segments leak); Python 3.13+ attaches without registering at all.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class _EventSender:
+    """Engine side of the event pipe; keeps shared segments until the GUI releases them"""
+
+    def __init__(self, events: Any):
+        self._events = events
+        self._lock = threading.Lock()
+        self._segments: Dict[str, shared_memory.SharedMemory] = {}
+        self._percent: Optional[int] = None
+
+    def log(self, message: str) -> None:
+        self._send(("log", message))
+
+    def progress(self, percent: int) -> None:
+        # Many rows report the same percentage; only changes cross the pipe
+        if percent != self._percent:
+            self._percent = percent
+            self._send(("progress", percent))
+
+    def partial(self, entries: List[Dict[str, Any]]) -> None:
+        self._send(("partial", self._pack(entries)))
+
+    def result(self, result: Dict[str, Any]) -> None:
+        self._percent = None
+        self._send(("result", self._pack(result)))
+
+    def finish(self, kind: str, message: str) -> None:
+        self._percent = None
+        self._send((kind, message))
+
+    def release(self, name: str) -> None:
+        """Free a segment the GUI has finished reading"""
+        with self._lock:
+            segment = self._segments.pop(name, None)
+        if segment is not None:
+            segment.close()
+            segment.unlink()
+
+    def release_all(self) -> None:
+        """Free every segment still waiting to be read"""
+        with self._lock:
+            names = list(self._segments)
+        for name in names:
+            self.release(name)
+
+    def _pack(self, value: Any) -> Tuple[Any, ...]:
+        """Pickle a payload; large ones go into a new shared-memory segment"""
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) < SHARED_MEMORY_THRESHOLD:
+            return ("inline", data)
+        segment = shared_memory.SharedMemory(create=True, size=len(data))
+        segment.buf[:len(data)] = data
+        with self._lock:
+            self._segments[segment.name] = segment
+        return ("shared", segment.name, len(data))
+
+    def _send(self, event: Tuple[Any, ...]) -> None:
+        with self._lock:
+            self._events.send(event)
+
+
+def _engine_main(commands: Any, events: Any) -> None:
+    """Engine process: read commands on a thread, run the queued syncs on this one"""
+    sender = _EventSender(events)
+    jobs: "queue.Queue[Any]" = queue.Queue()
+    reader = threading.Thread(target=_read_commands, args=(commands, sender, jobs),
+                              name="sync-engine-commands", daemon=True)
+    reader.start()
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        if isinstance(job, Exception):
+            sender.finish("error", str(job))
+            continue
+        try:
+            json_data = job.run()
+        except SyncCancelled as e:
+            sender.finish("cancelled", str(e))
+        except Exception as e:
+            sender.finish("error", str(e))
+        else:
+            sender.result({"json_data": json_data, "stats": job.stats,
+                           "spans": job.tracer.records()})
+    sender.release_all()
+
+
+def _read_commands(commands: Any, sender: _EventSender, jobs: "queue.Queue[Any]") -> None:
+    """
+    Engine command loop
+
+    The pipeline is built here rather than on the main thread so that a
+    cancel that follows right after its run always finds it.
+    """
+    current: Optional[SyncPipeline] = None
+    while True:
+        try:
+            command = commands.recv()
+        except (EOFError, OSError):
+            # The GUI process is gone
+            command = ("stop",)
+        kind = command[0]
+        if kind == "run":
+            _, audio_path, script_path, options, shared = command
+            if shared is not None:
+                # The GUI already parsed this script; load_script still
+                # checks the file's date and size before using it
+                store_script(script_path, *shared)
+            try:
+                current = SyncPipeline(audio_path, script_path, options, on_log=sender.log,
+                                       on_progress=sender.progress, on_partial=sender.partial)
+                jobs.put(current)
+            except Exception as e:
+                jobs.put(e)
+        elif kind == "cancel":
+            if current is not None:
+                current.cancel()
+        elif kind == "release":
+            sender.release(command[1])
+        elif kind == "stop":
+            if current is not None:
+                current.cancel()
+            jobs.put(None)
+            return
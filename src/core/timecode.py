@@ -0,0 +1,355 @@
+import functools
+import math
+from typing import Any, Dict, Iterable, List, Sequence, Tuple, Union
+
+import numpy as np
+
+
+class FrameRate:
+    """
+    Frecuencia de fotogramas de un proyecto
+
+    fps es la frecuencia real (p. ej. 30000/1001) y nominal la que se cuenta en
+    el código de tiempo (30). En drop-frame se omiten los números de
+    fotograma 0 y 1 (0 a 3 a 59.94) al empezar cada minuto, salvo los
+    múltiplos de 10, para que el código de tiempo siga al reloj.
+    """
+    __slots__ = ("name", "fps", "nominal", "drop_frame")
+
+    def __init__(self, name: str, fps: float, nominal: int, drop_frame: bool = False):
+        self.name = name
+        self.fps = fps
+        self.nominal = nominal
+        self.drop_frame = drop_frame
+
+    @property
+    def dropped_per_minute(self) -> int:
+        """Frame numbers skipped at the start of each non-tenth minute"""
+        return round(self.nominal / 15) if self.drop_frame else 0
+
+    def __repr__(self) -> str:
+        return f"FrameRate({self.name!r})"
+
+    def __reduce__(self) -> Tuple[Any, Tuple[str]]:
+        # Pickle presets by name so they stay the same object across processes
+        return get_frame_rate, (self.name,)
+
+
+FRAME_RATES: Dict[str, FrameRate] = {
+    "23.976": FrameRate("23.976", 24000 / 1001, 24),
+    "24": FrameRate("24", 24.0, 24),
+    "25": FrameRate("25", 25.0, 25),
+    "29.97": FrameRate("29.97", 30000 / 1001, 30, drop_frame=True),
+    "29.97ndf": FrameRate("29.97ndf", 30000 / 1001, 30),
+    "30": FrameRate("30", 30.0, 30),
+    "50": FrameRate("50", 50.0, 50),
+    "59.94": FrameRate("59.94", 60000 / 1001, 60, drop_frame=True),
+    "60": FrameRate("60", 60.0, 60),
+}
+
+DEFAULT_FRAME_RATE = "25"
+
+# Tolerance so that e.g. 0.28 s at 25 fps is frame 7 and not 6.999...
+_FRAME_EPSILON = 1e-6
+
+_default_rate = FRAME_RATES[DEFAULT_FRAME_RATE]
+
+RateLike = Union[None, str, int, float, FrameRate]
+
+
+def get_frame_rate(rate: RateLike = None) -> FrameRate:
+    """
+    Resuelve una frecuencia de fotogramas
+
+    Args:
+        rate: Nombre ("25", "29.97"...), número, FrameRate o None para la
+            frecuencia por defecto del proyecto
+
+    Returns:
+        FrameRate: Frecuencia correspondiente
+    """
+    if rate is None:
+        return _default_rate
+    if isinstance(rate, FrameRate):
+        return rate
+    name = rate if isinstance(rate, str) else f"{rate:g}"
+    try:
+        return FRAME_RATES[name]
+    except KeyError:
+        raise ValueError(f"Frecuencia de fotogramas desconocida: {rate}") from None
+
+
+def set_default_frame_rate(rate: RateLike) -> None:
+    """
+    Cambia la frecuencia de fotogramas usada por defecto en todo el proyecto
+
+    Args:
+        rate: Nombre, número o FrameRate
+    """
+    global _default_rate
+    _default_rate = get_frame_rate(rate)
+
+
+@functools.total_ordering
+class Timecode:
+    """
+    Código de tiempo guardado como número entero de fotogramas
+
+    Las comparaciones son comparaciones de enteros; la cadena HH:MM:SS:FF
+    (HH:MM:SS;FF en drop-frame) solo se genera al mostrarla o exportarla.
+    """
+    __slots__ = ("frames", "rate")
+
+    def __init__(self, frames: int = 0, rate: RateLike = None):
+        self.frames = int(frames)
+        self.rate = get_frame_rate(rate)
+
+    @classmethod
+    def from_seconds(cls, seconds: float, rate: RateLike = None) -> "Timecode":
+        """Fotograma que contiene el instante dado"""
+        rate = get_frame_rate(rate)
+        # Floor, like seconds_to_frames, so negative times round the same way
+        return cls(math.floor(seconds * rate.fps + _FRAME_EPSILON), rate)
+
+    @classmethod
+    def parse(cls, text: str, rate: RateLike = None) -> "Timecode":
+        """
+        Interpreta una cadena HH:MM:SS:FF (o HH:MM:SS;FF)
+
+        Una cadena con formato no válido se interpreta como el fotograma 0.
+        """
+        rate = get_frame_rate(rate)
+        parts = text.replace(';', ':').split(':')
+        if len(parts) != 4:
+            return cls(0, rate)
+        try:
+            hours, minutes, seconds, frames = map(int, parts)
+        except ValueError:
+            return cls(0, rate)
+        return cls(_components_to_frames(hours, minutes, seconds, frames, rate), rate)
+
+    @property
+    def seconds(self) -> float:
+        return self.frames / self.rate.fps
+
+    def __str__(self) -> str:
+        hours, minutes, seconds, frames = _frames_to_components(self.frames, self.rate)
+        separator = ';' if self.rate.drop_frame else ':'
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{frames:02d}"
+
+    def __repr__(self) -> str:
+        return f"Timecode({str(self)!r}, {self.rate.name!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Timecode):
+            return NotImplemented
+        if self.rate is other.rate:
+            return self.frames == other.frames
+        return self.seconds == other.seconds
+
+    def __lt__(self, other: "Timecode") -> bool:
+        if not isinstance(other, Timecode):
+            return NotImplemented
+        if self.rate is other.rate:
+            return self.frames < other.frames
+        return self.seconds < other.seconds
+
+    def __hash__(self) -> int:
+        return hash((self.frames, self.rate.name))
+
+
+def as_timecode(value: Union[Timecode, str], rate: RateLike = None) -> Timecode:
+    """
+    Convierte una cadena de código de tiempo en Timecode (los Timecode se
+    devuelven tal cual)
+
+    Args:
+        value: Timecode o cadena HH:MM:SS:FF
+        rate: Frecuencia con la que interpretar una cadena
+
+    Returns:
+        Timecode: Código de tiempo
+    """
+    if isinstance(value, Timecode):
+        return value
+    return Timecode.parse(value, rate)
+
+
+def seconds_to_frames(seconds: Union[Sequence[float], np.ndarray],
+                      rate: RateLike = None) -> np.ndarray:
+    """
+    Convierte un array de segundos en fotogramas
+
+    Args:
+        seconds: Tiempos en segundos
+        rate: Frecuencia de fotogramas
+
+    Returns:
+        np.ndarray: Fotogramas (int64)
+    """
+    rate = get_frame_rate(rate)
+    values = np.asarray(seconds, dtype=np.float64)
+    return np.floor(values * rate.fps + _FRAME_EPSILON).astype(np.int64)
+
+
+def frames_to_seconds(frames: Union[Sequence[int], np.ndarray],
+                      rate: RateLike = None) -> np.ndarray:
+    """
+    Convierte un array de fotogramas en segundos
+
+    Args:
+        frames: Fotogramas
+        rate: Frecuencia de fotogramas
+
+    Returns:
+        np.ndarray: Segundos (float64)
+    """
+    rate = get_frame_rate(rate)
+    return np.asarray(frames, dtype=np.int64) / rate.fps
+
+
+def timecodes_from_seconds(seconds: Union[Sequence[float], np.ndarray],
+                           rate: RateLike = None) -> List[Timecode]:
+    """
+    Convierte un array de segundos en Timecode de una sola vez
+
+    Args:
+        seconds: Tiempos en segundos
+        rate: Frecuencia de fotogramas
+
+    Returns:
+        List[Timecode]: Un Timecode por tiempo
+    """
+    rate = get_frame_rate(rate)
+    return [Timecode(frames, rate) for frames in seconds_to_frames(seconds, rate).tolist()]
+
+
+def format_frames(frames: Union[Sequence[int], np.ndarray], rate: RateLike = None) -> List[str]:
+    """
+    Genera las cadenas HH:MM:SS:FF de un array de fotogramas
+
+    La descomposición en horas, minutos, segundos y fotogramas (incluida la
+    compensación drop-frame) se hace con operaciones vectorizadas.
+
+    Args:
+        frames: Fotogramas
+        rate: Frecuencia de fotogramas
+
+    Returns:
+        List[str]: Cadenas de código de tiempo
+    """
+    rate = get_frame_rate(rate)
+    components = _frames_to_components_array(np.asarray(frames, dtype=np.int64), rate)
+    template = "%02d:%02d:%02d;%02d" if rate.drop_frame else "%02d:%02d:%02d:%02d"
+    return [template % row for row in zip(*(column.tolist() for column in components))]
+
+
+def parse_timecodes(texts: Iterable[str], rate: RateLike = None) -> np.ndarray:
+    """
+    Convierte cadenas HH:MM:SS:FF en un array de fotogramas
+
+    Las cadenas con formato no válido se interpretan como el fotograma 0.
+
+    Args:
+        texts: Cadenas de código de tiempo
+        rate: Frecuencia de fotogramas
+
+    Returns:
+        np.ndarray: Fotogramas (int64)
+    """
+    rate = get_frame_rate(rate)
+    rows = []
+    for text in texts:
+        parts = text.replace(';', ':').split(':')
+        try:
+            rows.append([int(part) for part in parts] if len(parts) == 4 else [0, 0, 0, 0])
+        except ValueError:
+            rows.append([0, 0, 0, 0])
+    if not rows:
+        return np.zeros(0, dtype=np.int64)
+    hours, minutes, seconds, frames = np.array(rows, dtype=np.int64).T
+    return _components_to_frames(hours, minutes, seconds, frames, rate)
+
+
+def timecode_frames(values: Sequence[Union[Timecode, str]], rate: RateLike = None) -> np.ndarray:
+    """
+    Fotogramas de una lista de Timecode o cadenas, para comparar en bloque
+
+    Args:
+        values: Timecode o cadenas
+        rate: Frecuencia con la que interpretar las cadenas
+
+    Returns:
+        np.ndarray: Fotogramas (int64)
+    """
+    return np.fromiter((as_timecode(value, rate).frames for value in values),
+                       dtype=np.int64, count=len(values))
+
+
+def timecode_strings(values: Sequence[Union[Timecode, str]]) -> List[str]:
+    """
+    Cadenas de una lista de Timecode (las cadenas se dejan como están)
+
+    Los Timecode con la misma frecuencia que el primero se formatean juntos
+    con format_frames().
+
+    Args:
+        values: Timecode o cadenas
+
+    Returns:
+        List[str]: Cadenas de código de tiempo
+    """
+    first = next((value for value in values if isinstance(value, Timecode)), None)
+    if first is None:
+        return list(values)
+    rate = first.rate
+    batch = [position for position, value in enumerate(values)
+             if isinstance(value, Timecode) and value.rate is rate]
+    strings = [value if isinstance(value, str) else str(value) for value in values]
+    for position, text in zip(batch, format_frames([values[i].frames for i in batch], rate)):
+        strings[position] = text
+    return strings
+
+
+def _frames_to_components(frames: int, rate: FrameRate) -> Tuple[int, int, int, int]:
+    """Hours, minutes, seconds and frame number shown for a frame count"""
+    frames = max(0, frames)
+    dropped = rate.dropped_per_minute
+    if dropped:
+        frames_per_minute = rate.nominal * 60 - dropped
+        frames_per_ten_minutes = frames_per_minute * 10 + dropped
+        tens, remainder = divmod(frames, frames_per_ten_minutes)
+        frames += dropped * 9 * tens
+        if remainder > dropped:
+            frames += dropped * ((remainder - dropped) // frames_per_minute)
+
+    frame_number = frames % rate.nominal
+    total_seconds = frames // rate.nominal
+    return total_seconds // 3600, (total_seconds // 60) % 60, total_seconds % 60, frame_number
+
+
+def _frames_to_components_array(frames: np.ndarray,
+                                rate: FrameRate) -> Tuple[np.ndarray, ...]:
+    """Vectorized _frames_to_components"""
+    frames = np.maximum(frames, 0)
+    dropped = rate.dropped_per_minute
+    if dropped:
+        frames_per_minute = rate.nominal * 60 - dropped
+        frames_per_ten_minutes = frames_per_minute * 10 + dropped
+        tens, remainder = np.divmod(frames, frames_per_ten_minutes)
+        extra = np.where(remainder > dropped, (remainder - dropped) // frames_per_minute, 0)
+        frames = frames + dropped * (9 * tens + extra)
+
+    total_seconds, frame_number = np.divmod(frames, rate.nominal)
+    return total_seconds // 3600, (total_seconds // 60) % 60, total_seconds % 60, frame_number
+
+
+def _components_to_frames(hours: Any, minutes: Any, seconds: Any, frames: Any,
+                          rate: FrameRate) -> Any:
+    """Frame count of a displayed timecode; works on ints and on arrays"""
+    total_minutes = hours * 60 + minutes
+    count = (total_minutes * 60 + seconds) * rate.nominal + frames
+    dropped = rate.dropped_per_minute
+    if dropped:
+        count = count - dropped * (total_minutes - total_minutes // 10)
+    return count
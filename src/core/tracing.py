@@ -0,0 +1,212 @@
+import functools
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class Span:
+    """
+    Intervalo medido de una etapa: tiempo real, tiempo de CPU del proceso y
+    número de elementos procesados (que la etapa puede fijar con span.items)
+    """
+    __slots__ = ("name", "depth", "thread_id", "start", "wall", "cpu", "items", "args",
+                 "_tracer", "_cpu_start")
+
+    def __init__(self, tracer: "Tracer", name: str, args: Dict[str, Any]):
+        self.name = name
+        self.args = args
+        self.items: Optional[int] = None
+        self.depth = 0
+        self.thread_id = 0
+        self.start = 0.0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self._tracer = tracer
+        self._cpu_start = 0.0
+
+    def __enter__(self) -> "Span":
+        self.depth = self._tracer._enter()
+        self.thread_id = threading.get_ident()
+        self._cpu_start = time.process_time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.wall = time.perf_counter() - self.start
+        self.cpu = time.process_time() - self._cpu_start
+        self._tracer._exit(self)
+
+
+class _NullSpan:
+    """Span that measures nothing, shared by every disabled tracer"""
+    __slots__ = ()
+
+    items = None
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Stages may set span.items whether or not the tracer is enabled
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """
+    Registro de tiempos por etapa con exportación al formato trace_event de Chrome
+
+    Desactivado, span() devuelve siempre el mismo objeto vacío y no se mide
+    nada, de modo que la instrumentación puede quedarse en el código.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.spans: List[Span] = []
+        self._origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def span(self, name: str, **args: Any) -> Any:
+        """
+        Mide el bloque de un with
+
+        Args:
+            name (str): Nombre de la etapa
+            **args: Datos adicionales que se guardan en la traza
+
+        Returns:
+            Span: Intervalo (o uno vacío si el tracer está desactivado)
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, args)
+
+    def summary_lines(self) -> List[str]:
+        """
+        Desglose legible de las etapas medidas, anidadas según se ejecutaron
+
+        Returns:
+            List[str]: Una línea por etapa
+        """
+        if not self.spans:
+            return []
+        lines = ["Tiempos por etapa:"]
+        for span in sorted(self.spans, key=lambda span: span.start):
+            label = f"{'  ' * (span.depth + 1)}{span.name}"
+            line = f"{label:<32} {span.wall:9.3f} s  (CPU {span.cpu:.3f} s)"
+            if span.items is not None:
+                line += f"  {span.items} elementos"
+            lines.append(line)
+        return lines
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """
+        Etapas medidas como eventos completos ("ph": "X") de trace_event
+
+        Returns:
+            Dict[str, Any]: Documento que se abre en chrome://tracing o Perfetto
+        """
+        pid = os.getpid()
+        events = []
+        for span in self.spans:
+            args = {"cpu_ms": span.cpu * 1000, **span.args}
+            if span.items is not None:
+                args["items"] = span.items
+            events.append({
+                "name": span.name,
+                "cat": "sync",
+                "ph": "X",
+                "ts": (span.start - self._origin) * 1e6,
+                "dur": span.wall * 1e6,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": args
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def records(self) -> List[Dict[str, Any]]:
+        """
+        Etapas medidas como diccionarios, para enviarlas a otro proceso
+
+        Returns:
+            List[Dict[str, Any]]: Un registro por etapa
+        """
+        return [
+            {"name": span.name, "args": span.args, "items": span.items, "depth": span.depth,
+             "thread_id": span.thread_id, "start": span.start, "wall": span.wall, "cpu": span.cpu}
+            for span in self.spans
+        ]
+
+    def add_records(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Añade etapas medidas en otro proceso (devueltas por records())
+
+        Los instantes de inicio son de perf_counter, un reloj monótono común
+        a los procesos de la máquina, así que la traza conserva el orden.
+
+        Args:
+            records (List[Dict[str, Any]]): Registros de etapas
+        """
+        if not self.enabled:
+            return
+        for record in records:
+            span = Span(self, record["name"], record["args"])
+            for field in ("items", "depth", "thread_id", "start", "wall", "cpu"):
+                setattr(span, field, record[field])
+            with self._lock:
+                self.spans.append(span)
+
+    def write_chrome_trace(self, path: str) -> None:
+        """
+        Guarda la traza en un archivo JSON
+
+        Args:
+            path (str): Ruta del archivo
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, default=str)
+
+    def _enter(self) -> int:
+        """Depth of a span that starts now on this thread"""
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        return depth
+
+    def _exit(self, span: Span) -> None:
+        """Record a finished span"""
+        self._local.depth = span.depth
+        with self._lock:
+            self.spans.append(span)
+
+
+def traced(name: str, count: Optional[Callable[[Any], int]] = None) -> Callable:
+    """
+    Decorador que mide un método con el tracer de su objeto (self.tracer)
+
+    Args:
+        name (str): Nombre de la etapa
+        count (Optional[Callable]): Obtiene del resultado el número de elementos
+
+    Returns:
+        Callable: Decorador
+    """
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+            if not self.tracer.enabled:
+                return method(self, *args, **kwargs)
+            with self.tracer.span(name) as span:
+                result = method(self, *args, **kwargs)
+                if count is not None:
+                    span.items = count(result)
+                return result
+        return wrapper
+    return decorator
@@ -0,0 +1,218 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.core.utils import hash_file, remove_quietly
+
+
+class TranscriptionCache:
+    """
+    Caché en disco de transcripciones de Whisper con expulsión LRU por tamaño
+
+    Cada entrada es un archivo JSON cuyo nombre deriva del contenido del audio
+    y de los parámetros de decodificación; la fecha de modificación del
+    archivo se actualiza en cada lectura y sirve como orden LRU.
+    """
+    # Constants
+    DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sync_script", "transcriptions")
+    DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+    ENTRY_SUFFIX = ".json"
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or self.DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        Path(self.cache_dir).mkdir(parents=True, exist_ok=True)
+
+    def make_key(self, audio_path: str, model_name: str, language: str,
+                 decode_options: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Construye la clave de una transcripción
+
+        Args:
+            audio_path (str): Ruta al archivo de audio
+            model_name (str): Nombre del modelo Whisper
+            language (str): Idioma de la transcripción
+            decode_options (Optional[Dict[str, Any]]): Opciones de decodificación
+
+        Returns:
+            str: Clave hexadecimal
+        """
+        parameters = json.dumps({
+            "audio": hash_file(audio_path),
+            "model": model_name,
+            "language": language,
+            "options": decode_options or {}
+        }, sort_keys=True)
+        return hashlib.sha256(parameters.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Recupera una transcripción y la marca como usada recientemente
+
+        Args:
+            key (str): Clave devuelta por make_key
+
+        Returns:
+            Optional[Dict[str, Any]]: Resultado de Whisper o None si no existe
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            os.utime(entry_path)
+            return result
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        Guarda una transcripción y expulsa las entradas más antiguas si se
+        supera el tamaño máximo
+
+        Args:
+            key (str): Clave devuelta por make_key
+            result (Dict[str, Any]): Resultado de Whisper
+
+        Raises:
+            OSError: Si no se puede escribir en el directorio de la caché
+        """
+        entry_path = self._entry_path(key)
+        temp_path = f"{entry_path}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, default=_to_serializable)
+            os.replace(temp_path, entry_path)
+        except OSError:
+            # A full disk must not leave half-written entries behind
+            remove_quietly(temp_path)
+            raise
+        self._evict()
+
+    def clear(self) -> None:
+        """Elimina todas las entradas de la caché"""
+        for entry in self._entries():
+            remove_quietly(entry.path)
+
+    def _entry_path(self, key: str) -> str:
+        """Path of the cache file for a key"""
+        return os.path.join(self.cache_dir, f"{key}{self.ENTRY_SUFFIX}")
+
+    def _entries(self) -> list:
+        """List the cache entry files"""
+        with os.scandir(self.cache_dir) as it:
+            return [entry for entry in it
+                    if entry.is_file() and entry.name.endswith(self.ENTRY_SUFFIX)]
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits max_bytes"""
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_bytes:
+                break
+            remove_quietly(path)
+            total_size -= size
+
+
+class TranscriptionCheckpoint:
+    """
+    Segmentos de los fragmentos ya transcritos de una transcripción en curso
+
+    Archivo JSON Lines con una cabecera que describe el reparto en
+    fragmentos y una línea por fragmento terminado, escrita y sincronizada
+    con el disco en cuanto acaba. Si la ejecución se cancela o se
+    interrumpe, la siguiente con la misma clave y el mismo reparto continúa
+    desde los fragmentos guardados. Una última línea incompleta (escritura
+    interrumpida) se ignora.
+    """
+    # Constants
+    DEFAULT_CHECKPOINT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sync_script", "checkpoints")
+    ENTRY_SUFFIX = ".jsonl"
+
+    def __init__(self, key: str, layout: Any, checkpoint_dir: Optional[str] = None):
+        """
+        Args:
+            key (str): Clave de la transcripción (TranscriptionCache.make_key)
+            layout (Any): Reparto en fragmentos (regiones o paquetes), serializable en JSON
+            checkpoint_dir (Optional[str]): Directorio de los puntos de control
+        """
+        self.checkpoint_dir = checkpoint_dir or self.DEFAULT_CHECKPOINT_DIR
+        Path(self.checkpoint_dir).mkdir(parents=True, exist_ok=True)
+        self.path = os.path.join(self.checkpoint_dir, f"{key}{self.ENTRY_SUFFIX}")
+        # Compare layouts in their JSON form (tuples become lists)
+        self.layout = json.loads(json.dumps(layout))
+
+    def completed(self) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Segmentos de los fragmentos terminados en ejecuciones anteriores
+
+        Un punto de control con otro reparto se descarta.
+
+        Returns:
+            Dict[int, List[Dict[str, Any]]]: Segmentos absolutos por índice de fragmento
+        """
+        chunks: Dict[int, List[Dict[str, Any]]] = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except OSError:
+            return chunks
+        try:
+            header = json.loads(lines[0])
+        except (IndexError, ValueError):
+            header = None
+        if not header or header.get("layout") != self.layout:
+            self.remove()
+            return chunks
+
+        valid = 1
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            chunks[entry["chunk"]] = entry["segments"]
+            valid += 1
+        if valid < len(lines):
+            # Drop the torn line so the next append starts on a clean line
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.writelines(lines[:valid])
+        return chunks
+
+    def append(self, chunk_index: int, segments: List[Dict[str, Any]]) -> None:
+        """
+        Guarda los segmentos de un fragmento terminado
+
+        Args:
+            chunk_index (int): Índice del fragmento en el reparto
+            segments (List[Dict[str, Any]]): Segmentos con tiempos absolutos
+        """
+        new_file = not os.path.exists(self.path)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            if new_file:
+                f.write(json.dumps({"layout": self.layout}) + "\n")
+            f.write(json.dumps({"chunk": chunk_index, "segments": segments},
+                               ensure_ascii=False, default=_to_serializable) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def remove(self) -> None:
+        """Elimina el punto de control"""
+        remove_quietly(self.path)
+
+
+def _to_serializable(value: Any) -> Any:
+    """Convert NumPy scalars and arrays found in Whisper results to JSON types"""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
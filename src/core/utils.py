@@ -1,52 +1,165 @@
+import hashlib
+import os
+import re
+import threading
 from difflib import SequenceMatcher
-from typing import Union, Tuple
+from typing import Any, Dict, Tuple
 
 
-def seconds_to_timecode(seconds: float, fps: int = 25) -> str:
+_NON_WORD_PATTERN = re.compile(r"[^\w]+")
+
+# Similarity backends
+SIMILARITY_BACKEND_DIFFLIB = "difflib"
+SIMILARITY_BACKEND_NUMBA = "numba"
+
+
+def seconds_to_timecode(seconds: float, fps: Any = None) -> str:
     """
     Convierte segundos a formato de código de tiempo HH:MM:SS:FF
     
     Args:
         seconds (float): Tiempo en segundos
-        fps (int): Frames por segundo
+        fps: Frecuencia de fotogramas (nombre, número o FrameRate); por
+            defecto, la del proyecto
         
     Returns:
-        str: Código de tiempo en formato HH:MM:SS:FF
+        str: Código de tiempo en formato HH:MM:SS:FF (HH:MM:SS;FF en drop-frame)
     """
-    components = _split_seconds_to_components(seconds, fps)
-    hours, minutes, secs, frames = components
-    
-    return f"{hours:02d}:{minutes:02d}:{secs:02d}:{frames:02d}"
+    from src.core.timecode import Timecode
+    return str(Timecode.from_seconds(seconds, fps))
 
 
-def _split_seconds_to_components(seconds: float, fps: int) -> Tuple[int, int, int, int]:
+def timecode_to_seconds(timecode: Any, fps: Any = None) -> float:
     """
-    Divide los segundos en componentes de tiempo (horas, minutos, segundos, frames)
+    Convierte un código de tiempo HH:MM:SS:FF a segundos
     
     Args:
-        seconds (float): Tiempo en segundos
-        fps (int): Frames por segundo
+        timecode: Cadena HH:MM:SS:FF o Timecode
+        fps: Frecuencia con la que interpretar una cadena; por defecto,
+            la del proyecto
         
     Returns:
-        Tuple[int, int, int, int]: Tupla con (horas, minutos, segundos, frames)
+        float: Tiempo en segundos (0.0 si el formato no es válido)
     """
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    frames = int((seconds % 1) * fps)
-    
-    return hours, minutes, secs, frames
+    from src.core.timecode import as_timecode
+    return as_timecode(timecode, fps).seconds
 
 
-def similar(a: str, b: str) -> float:
+def similar(a: str, b: str, backend: str = SIMILARITY_BACKEND_DIFFLIB) -> float:
     """
     Calcula la similitud entre dos cadenas de texto
     
     Args:
         a (str): Primera cadena
         b (str): Segunda cadena
+        backend (str): "difflib" (referencia) o "numba" (distancia de edición
+            compilada; su valor es mayor o igual que el de difflib, ver
+            edit_distance.indel_similarity)
+        
+    Returns:
+        float: Valor de similitud entre 0 y 1
+    """
+    if backend == SIMILARITY_BACKEND_DIFFLIB:
+        return similar_lowered(a.lower(), b.lower())
+    if backend == SIMILARITY_BACKEND_NUMBA:
+        from src.core.edit_distance import indel_similarity
+        return indel_similarity(a, b)
+    raise ValueError(f"Backend de similitud desconocido: {backend}")
+
+
+def similar_lowered(a: str, b: str) -> float:
+    """
+    Igual que similar() con el backend difflib, para textos ya en minúsculas
+    
+    Args:
+        a (str): Primera cadena en minúsculas
+        b (str): Segunda cadena en minúsculas
         
     Returns:
         float: Valor de similitud entre 0 y 1
     """
-    return SequenceMatcher(None, a.lower(), b.lower()).ratio()
\ No newline at end of file
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normaliza un texto para compararlo: minúsculas, sin puntuación y con
+    los espacios colapsados
+    
+    Args:
+        text (str): Texto original
+        
+    Returns:
+        str: Texto normalizado
+    """
+    return _NON_WORD_PATTERN.sub(" ", text.lower()).strip()
+
+
+
+def hash_file(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Calcula el hash SHA-256 de un archivo leyéndolo por bloques
+    
+    El resultado se recuerda mientras el archivo conserve su fecha de
+    modificación y tamaño, para no releer el audio en cada caché.
+    
+    Args:
+        file_path (str): Ruta al archivo
+        chunk_size (int): Tamaño de cada bloque leído en bytes
+        
+    Returns:
+        str: Hash en hexadecimal
+    """
+    key = file_stat_key(file_path)
+    with _hash_lock:
+        cached = _hash_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    
+    with _hash_lock:
+        _hash_cache[key] = digest.hexdigest()
+        while len(_hash_cache) > HASH_CACHE_SIZE:
+            _hash_cache.pop(next(iter(_hash_cache)))
+    return digest.hexdigest()
+
+
+def file_stat_key(file_path: str) -> Tuple[str, int, int]:
+    """
+    Identifica un archivo por su ruta absoluta, fecha de modificación y tamaño
+    
+    Es la clave con la que hash_file recuerda sus resultados. Sirve para
+    reconocer un archivo sin leerlo, a costa de tratarlo como distinto si
+    solo cambia su fecha.
+    
+    Args:
+        file_path (str): Ruta al archivo
+        
+    Returns:
+        Tuple[str, int, int]: (ruta absoluta, st_mtime_ns, st_size)
+    """
+    stat = os.stat(file_path)
+    return os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size
+
+
+def remove_quietly(path: str) -> None:
+    """
+    Elimina un archivo, ignorando que otro proceso ya lo haya borrado
+    
+    Args:
+        path (str): Ruta del archivo
+    """
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# File hashes by (absolute path, mtime, size)
+HASH_CACHE_SIZE = 64
+_hash_cache: Dict[Tuple[str, int, int], str] = {}
+_hash_lock = threading.Lock()
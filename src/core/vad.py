@@ -0,0 +1,252 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# Analysis parameters (Whisper's sample rate and hop)
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 400
+HOP_LENGTH = 160
+FFT_SIZE = 512
+BLOCK_FRAMES = 8192
+SPEECH_BAND_HZ = (300.0, 3400.0)
+
+# Decision defaults
+DEFAULT_ENERGY_MARGIN_DB = 10.0
+DEFAULT_MIN_BAND_RATIO = 0.35
+DEFAULT_FLUX_PERCENTILE = 10.0
+DEFAULT_MIN_SPEECH_SECONDS = 0.25
+DEFAULT_MIN_SILENCE_SECONDS = 0.5
+DEFAULT_PADDING_SECONDS = 0.2
+DEFAULT_PACK_GAP_SECONDS = 0.3
+FLUX_SMOOTHING_FRAMES = 20
+
+
+def detect_speech_regions(audio: np.ndarray,
+                          sample_rate: int = SAMPLE_RATE,
+                          energy_margin_db: float = DEFAULT_ENERGY_MARGIN_DB,
+                          min_band_ratio: float = DEFAULT_MIN_BAND_RATIO,
+                          flux_percentile: float = DEFAULT_FLUX_PERCENTILE,
+                          min_speech_seconds: float = DEFAULT_MIN_SPEECH_SECONDS,
+                          min_silence_seconds: float = DEFAULT_MIN_SILENCE_SECONDS,
+                          padding_seconds: float = DEFAULT_PADDING_SECONDS) -> List[Tuple[int, int]]:
+    """
+    Detecta las regiones con voz de un audio mono
+
+    Una trama se considera voz si su energía supera en energy_margin_db el
+    suelo de ruido (percentil 10 de la pista), si al menos min_band_ratio de
+    su energía cae en la banda de la voz (300-3400 Hz) y si su flujo espectral
+    suavizado no está entre el flux_percentile % más estable de las tramas
+    activas (música sostenida). Después se rellenan las pausas cortas, se
+    descartan los fragmentos breves y se añade un margen a cada lado; los
+    umbrales son conservadores para no perder diálogo.
+
+    Args:
+        audio (np.ndarray): Audio mono float32
+        sample_rate (int): Frecuencia de muestreo
+        energy_margin_db (float): Margen sobre el suelo de ruido
+        min_band_ratio (float): Fracción mínima de energía en la banda de voz
+        flux_percentile (float): Percentil de flujo por debajo del cual se descarta
+        min_speech_seconds (float): Duración mínima de una región
+        min_silence_seconds (float): Pausas más cortas se unen a la voz
+        padding_seconds (float): Margen añadido a cada región
+
+    Returns:
+        List[Tuple[int, int]]: Regiones (muestra inicial, muestra final) ordenadas
+    """
+    if len(audio) < FRAME_LENGTH:
+        return [(0, len(audio))] if len(audio) else []
+
+    energy_db, band_ratio, flux = _frame_features(audio, sample_rate)
+    active = energy_db > np.percentile(energy_db, 10) + energy_margin_db
+    if not active.any():
+        return []
+
+    kernel = np.ones(FLUX_SMOOTHING_FRAMES) / FLUX_SMOOTHING_FRAMES
+    smoothed_flux = np.convolve(flux, kernel, mode="same")
+    flux_floor = np.percentile(smoothed_flux[active], flux_percentile)
+    voiced = active & (band_ratio >= min_band_ratio) & (smoothed_flux >= flux_floor)
+
+    frames_per_second = sample_rate / HOP_LENGTH
+    runs = _runs(voiced)
+    runs = _close_gaps(runs, int(min_silence_seconds * frames_per_second))
+    runs = [(start, end) for start, end in runs
+            if end - start >= min_speech_seconds * frames_per_second]
+
+    padding = int(padding_seconds * sample_rate)
+    regions: List[Tuple[int, int]] = []
+    for start, end in runs:
+        region = (max(0, start * HOP_LENGTH - padding),
+                  min(len(audio), end * HOP_LENGTH + FRAME_LENGTH + padding))
+        if regions and region[0] <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], max(regions[-1][1], region[1]))
+        else:
+            regions.append(region)
+    return regions
+
+
+def pack_regions(regions: List[Tuple[int, int]], max_seconds: float,
+                 gap_seconds: float = DEFAULT_PACK_GAP_SECONDS,
+                 sample_rate: int = SAMPLE_RATE) -> List[List[Tuple[int, int]]]:
+    """
+    Agrupa regiones consecutivas en paquetes de hasta max_seconds de voz
+
+    Cada paquete se transcribe como un solo audio concatenado, lo que evita
+    pagar una ventana completa de Whisper por cada frase corta. Una región
+    más larga que max_seconds forma su propio paquete.
+
+    Args:
+        regions (List[Tuple[int, int]]): Regiones de voz ordenadas
+        max_seconds (float): Duración máxima de un paquete
+        gap_seconds (float): Silencio que se inserta entre regiones
+        sample_rate (int): Frecuencia de muestreo
+
+    Returns:
+        List[List[Tuple[int, int]]]: Paquetes de regiones
+    """
+    max_samples = int(max_seconds * sample_rate)
+    gap = int(gap_seconds * sample_rate)
+    packs: List[List[Tuple[int, int]]] = []
+    size = 0
+    for start, end in regions:
+        length = end - start
+        if packs and size + gap + length <= max_samples:
+            packs[-1].append((start, end))
+            size += gap + length
+        else:
+            packs.append([(start, end)])
+            size = length
+    return packs
+
+
+def concatenate_pack(audio: np.ndarray, pack: List[Tuple[int, int]],
+                     gap_seconds: float = DEFAULT_PACK_GAP_SECONDS,
+                     sample_rate: int = SAMPLE_RATE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Une las regiones de un paquete separadas por silencio
+
+    Args:
+        audio (np.ndarray): Audio completo
+        pack (List[Tuple[int, int]]): Regiones del paquete
+        gap_seconds (float): Silencio entre regiones
+        sample_rate (int): Frecuencia de muestreo
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Audio concatenado y tabla de
+        correspondencia con una fila (inicio en el paquete, inicio original,
+        longitud) por región, en muestras
+    """
+    gap = int(gap_seconds * sample_rate)
+    pieces = []
+    timeline = []
+    position = 0
+    for index, (start, end) in enumerate(pack):
+        if index:
+            pieces.append(np.zeros(gap, dtype=np.float32))
+            position += gap
+        pieces.append(np.asarray(audio[start:end], dtype=np.float32))
+        timeline.append((position, start, end - start))
+        position += end - start
+    return np.concatenate(pieces), np.array(timeline, dtype=np.int64)
+
+
+def map_segments(segments: List[Dict[str, Any]], timeline: np.ndarray,
+                 sample_rate: int = SAMPLE_RATE) -> List[Dict[str, Any]]:
+    """
+    Lleva los segmentos de un paquete a la línea de tiempo original
+
+    Cada instante se asigna a la región del paquete que lo contiene (o a la
+    más cercana si cae en un silencio insertado) y se desplaza con ella.
+
+    Args:
+        segments (List[Dict[str, Any]]): Segmentos relativos al paquete
+        timeline (np.ndarray): Tabla devuelta por concatenate_pack
+        sample_rate (int): Frecuencia de muestreo
+
+    Returns:
+        List[Dict[str, Any]]: Segmentos con start y end absolutos
+    """
+    if not segments:
+        return []
+    pack_starts = timeline[:, 0] / sample_rate
+    original_starts = timeline[:, 1] / sample_rate
+    lengths = timeline[:, 2] / sample_rate
+
+    times = np.array([[segment["start"], segment["end"]] for segment in segments], dtype=np.float64)
+    region = np.clip(np.searchsorted(pack_starts, times, side="right") - 1, 0, len(timeline) - 1)
+    # A time inside an inserted gap is clamped to the end of the region before it
+    within = np.minimum(times - pack_starts[region], lengths[region])
+    absolute = original_starts[region] + np.maximum(within, 0.0)
+
+    mapped = []
+    for segment, (start, end) in zip(segments, absolute.tolist()):
+        segment = dict(segment)
+        segment["start"] = start
+        segment["end"] = max(start, end)
+        if "seek" in segment:
+            segment["seek"] = int(start * sample_rate) // HOP_LENGTH
+        mapped.append(segment)
+    return mapped
+
+
+def speech_seconds(regions: List[Tuple[int, int]], sample_rate: int = SAMPLE_RATE) -> float:
+    """Total duration of the speech regions in seconds"""
+    return sum(end - start for start, end in regions) / sample_rate
+
+
+def _frame_features(audio: np.ndarray,
+                    sample_rate: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Log energy, speech-band energy ratio and spectral flux of every frame
+
+    Frames are analysed in blocks so long tracks never materialise the
+    whole spectrogram.
+    """
+    n_frames = 1 + (len(audio) - FRAME_LENGTH) // HOP_LENGTH
+    window = np.hanning(FRAME_LENGTH).astype(np.float32)
+    frequencies = np.fft.rfftfreq(FFT_SIZE, 1.0 / sample_rate)
+    band = (frequencies >= SPEECH_BAND_HZ[0]) & (frequencies <= SPEECH_BAND_HZ[1])
+
+    energy_db = np.empty(n_frames, dtype=np.float32)
+    band_ratio = np.empty(n_frames, dtype=np.float32)
+    flux = np.empty(n_frames, dtype=np.float32)
+    previous: Optional[np.ndarray] = None
+
+    for first in range(0, n_frames, BLOCK_FRAMES):
+        last = min(n_frames, first + BLOCK_FRAMES)
+        samples = np.asarray(audio[first * HOP_LENGTH:(last - 1) * HOP_LENGTH + FRAME_LENGTH],
+                             dtype=np.float32)
+        frames = np.lib.stride_tricks.sliding_window_view(samples, FRAME_LENGTH)[::HOP_LENGTH]
+
+        energy_db[first:last] = 10 * np.log10(np.mean(np.square(frames), axis=1) + 1e-10)
+
+        power = np.square(np.abs(np.fft.rfft(frames * window, n=FFT_SIZE, axis=1)))
+        band_ratio[first:last] = power[:, band].sum(axis=1) / (power.sum(axis=1) + 1e-10)
+
+        log_magnitude = np.log1p(np.sqrt(power[:, band]))
+        if previous is None:
+            previous = log_magnitude[:1]
+        steps = np.diff(np.vstack((previous, log_magnitude)), axis=0)
+        flux[first:last] = np.maximum(steps, 0).mean(axis=1)
+        previous = log_magnitude[-1:]
+
+    return energy_db, band_ratio, flux
+
+
+def _runs(mask: np.ndarray) -> List[Tuple[int, int]]:
+    """(start, end) frame indices of the True runs of a boolean array"""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def _close_gaps(runs: List[Tuple[int, int]], min_gap: int) -> List[Tuple[int, int]]:
+    """Join runs separated by fewer than min_gap frames"""
+    closed: List[Tuple[int, int]] = []
+    for start, end in runs:
+        if closed and start - closed[-1][1] < min_gap:
+            closed[-1] = (closed[-1][0], end)
+        else:
+            closed.append((start, end))
+    return closed
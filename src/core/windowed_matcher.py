@@ -0,0 +1,91 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+
+class WindowedMatcher:
+    """
+    Emparejador en línea que solo busca cerca de la última posición confirmada
+
+    Mantiene un cursor en el último diálogo emparejado con confianza y puntúa
+    únicamente los window_size diálogos siguientes y unos pocos anteriores.
+    Si ninguno supera el umbral, la ventana se duplica en ambos sentidos (solo
+    se puntúan los diálogos nuevos) hasta max_window diálogos por delante.
+    Una coincidencia encontrada fuera de la ventana inicial solo mueve el
+    cursor si supera jump_confidence, para que un falso positivo lejano no
+    arrastre la búsqueda.
+    """
+    # Constants
+    DEFAULT_WINDOW = 20
+    DEFAULT_LOOKBACK = 3
+    DEFAULT_MAX_WIDENING = 16
+    DEFAULT_JUMP_CONFIDENCE = 0.7
+
+    def __init__(self, dialogues: List[Dict[str, str]],
+                 score_dialogues: Callable[[str, Iterable[int]], Dict[str, Any]],
+                 threshold: float,
+                 window_size: int = DEFAULT_WINDOW,
+                 lookback: int = DEFAULT_LOOKBACK,
+                 max_window: Optional[int] = None,
+                 jump_confidence: float = DEFAULT_JUMP_CONFIDENCE):
+        """
+        Args:
+            dialogues (List[Dict[str, str]]): Diálogos devueltos por read_script
+            score_dialogues (Callable): Puntúa un texto contra unos índices y
+                devuelve {"score", "index"} del mejor
+            threshold (float): Similitud mínima para aceptar una coincidencia
+            window_size (int): Diálogos examinados por delante del cursor
+            lookback (int): Diálogos examinados por detrás del cursor
+            max_window (Optional[int]): Máximo de diálogos por delante tras ensanchar
+            jump_confidence (float): Similitud necesaria para mover el cursor
+                a una coincidencia encontrada tras ensanchar la ventana
+        """
+        self.dialogue_count = len(dialogues)
+        self.score_dialogues = score_dialogues
+        self.threshold = threshold
+        self.window_size = window_size
+        self.lookback = lookback
+        self.max_window = max_window or window_size * self.DEFAULT_MAX_WIDENING
+        self.jump_confidence = jump_confidence
+        self.cursor = -1
+
+    def match(self, text: str, matched_dialogues: Set[int]) -> Dict[str, Any]:
+        """
+        Busca el diálogo que corresponde a un segmento y avanza el cursor
+
+        Args:
+            text (str): Texto del segmento transcrito
+            matched_dialogues (Set[int]): Diálogos ya emparejados
+
+        Returns:
+            Dict[str, Any]: {"score", "index"} de la mejor coincidencia encontrada
+        """
+        best_match = {"score": 0, "index": -1}
+        scored_lo = scored_hi = self.cursor + 1
+        ahead = self.window_size
+        behind = self.lookback
+        widened = False
+
+        while True:
+            lo = max(0, self.cursor + 1 - behind)
+            hi = min(self.dialogue_count, self.cursor + 1 + ahead)
+
+            # Score only the dialogues added by this widening
+            new_indices = [i for i in range(lo, scored_lo) if i not in matched_dialogues]
+            new_indices += [i for i in range(scored_hi, hi) if i not in matched_dialogues]
+            scored_lo, scored_hi = min(lo, scored_lo), max(hi, scored_hi)
+
+            if new_indices:
+                candidate = self.score_dialogues(text, new_indices)
+                if candidate["score"] > best_match["score"]:
+                    best_match = candidate
+
+            covers_script = lo == 0 and hi == self.dialogue_count
+            if best_match["score"] > self.threshold or covers_script or ahead >= self.max_window:
+                break
+            ahead *= 2
+            behind = max(behind, ahead // 2)
+            widened = True
+
+        confidence = self.jump_confidence if widened else self.threshold
+        if best_match["score"] > confidence and best_match["index"] >= 0:
+            self.cursor = best_match["index"]
+        return best_match
@@ -3,6 +3,8 @@ from typing import Optional, Tuple, Callable
 from PyQt5.QtWidgets import (QWidget, QPushButton, QHBoxLayout, QVBoxLayout, 
                             QLabel, QFileDialog, QMessageBox)
 
+from src.core.script_parser import load_script
+
 
 class FileSelectionPanel(QWidget):
     def __init__(self, parent):
@@ -129,9 +131,9 @@ class FileSelectionPanel(QWidget):
             file_path: Path to the script file
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                script_content = f.read()
-            self.parent.show_script_preview(script_content)
+            # The parsed script is cached, so the sync run will reuse it
+            script = load_script(file_path)
+            self.parent.show_script_preview(script.text)
         except Exception as e:
             self.parent.show_script_preview(f"Error al cargar el guion: {str(e)}")
             QMessageBox.warning(self, "Error de Lectura", 
@@ -0,0 +1,222 @@
+import os
+from typing import Any, Dict, List, Optional, Set
+
+from PyQt5.QtCore import QObject, QThread, QTimer, pyqtSignal
+
+from src.core.audio_sync import ExportWorker, SyncWorker
+from src.core.job_queue import JobQueue, max_concurrent_transcriptions, HEARTBEAT_INTERVAL_SECONDS
+
+
+class JobScheduler(QObject):
+    """
+    Ejecuta los trabajos de una JobQueue con un límite de sincronizaciones simultáneas
+
+    Cada trabajo reclamado se ejecuta en un SyncWorker (cuyo pipeline corre
+    en un proceso motor aparte) y sus resultados se escriben con un
+    ExportWorker junto a la salida del trabajo (JSON y Excel); las rutas
+    quedan en los artefactos del trabajo. El límite por defecto se vuelve
+    a calcular cada vez que se busca hueco, con la memoria libre en ese
+    momento. Mientras hay trabajos en curso, un temporizador renueva su
+    latido en la cola y recupera los trabajos de instancias que han muerto;
+    al arrancar se recuperan los de sesiones anteriores que ya no se
+    ejecutan. La caché de transcripciones evita repetir lo ya terminado.
+    """
+    job_changed = pyqtSignal(int)  # Estado de un trabajo modificado (-1 = varios)
+    job_progress = pyqtSignal(int, int)  # (trabajo, porcentaje)
+    job_log = pyqtSignal(int, str)  # (trabajo, mensaje)
+
+    def __init__(self, queue: Optional[JobQueue] = None, max_concurrent: int = 0,
+                 parent: Optional[QObject] = None):
+        """
+        Args:
+            queue (Optional[JobQueue]): Cola de trabajos; por defecto la del usuario
+            max_concurrent (int): Sincronizaciones simultáneas (0 = según memoria y núcleos)
+            parent (Optional[QObject]): Objeto padre de Qt
+        """
+        super().__init__(parent)
+        self.queue = queue or JobQueue()
+        self.max_concurrent = max_concurrent
+        self.running = False
+        self.active: Dict[int, SyncWorker] = {}
+        self._threads: Set[QThread] = set()
+        self._heartbeat_timer = QTimer(self)
+        self._heartbeat_timer.setInterval(int(HEARTBEAT_INTERVAL_SECONDS * 1000))
+        self._heartbeat_timer.timeout.connect(self._heartbeat)
+
+    def start(self) -> int:
+        """
+        Recupera los trabajos interrumpidos y empieza a ejecutar la cola
+
+        Returns:
+            int: Número de trabajos interrumpidos que se han vuelto a poner en cola
+        """
+        requeued = self.queue.requeue_interrupted()
+        self.running = True
+        self._heartbeat_timer.start()
+        self._schedule()
+        return requeued
+
+    def stop(self) -> None:
+        """
+        Deja de lanzar trabajos nuevos
+
+        Los trabajos en curso terminan y siguen latiendo; si la aplicación
+        se cierra antes, dejan de latir y se recuperan en el próximo start().
+        """
+        self.running = False
+
+    def submit(self, audio_path: str, script_path: str, output_path: str,
+               options: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Añade un trabajo a la cola y lo lanza si hay hueco
+
+        Args:
+            audio_path (str): Ruta al archivo de audio
+            script_path (str): Ruta al guion
+            output_path (str): Ruta del JSON de resultados
+            options (Optional[Dict[str, Any]]): Opciones de SyncPipeline
+
+        Returns:
+            int: Identificador del trabajo
+        """
+        job_id = self.queue.add(audio_path, script_path, output_path, options)
+        self.job_changed.emit(job_id)
+        self._schedule()
+        return job_id
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Cancela un trabajo pendiente, o detiene uno en curso al terminar su
+        fragmento actual (con la opción "checkpoint", lo transcrito queda en
+        su punto de control)
+
+        Args:
+            job_id (int): Identificador del trabajo
+
+        Returns:
+            bool: True si se ha cancelado o se ha pedido la cancelación
+        """
+        worker = self.active.get(job_id)
+        if worker is not None:
+            worker.cancel()
+            return True
+        cancelled = self.queue.cancel(job_id)
+        if cancelled:
+            self.job_changed.emit(job_id)
+        return cancelled
+
+    def retry(self, job_id: int) -> bool:
+        """
+        Vuelve a poner en cola un trabajo fallido o cancelado
+
+        Args:
+            job_id (int): Identificador del trabajo
+
+        Returns:
+            bool: True si se ha vuelto a poner en cola
+        """
+        retried = self.queue.retry(job_id)
+        if retried:
+            self.job_changed.emit(job_id)
+            self._schedule()
+        return retried
+
+    def active_jobs(self) -> List[int]:
+        """Identificadores de los trabajos que se están sincronizando"""
+        return list(self.active)
+
+    def concurrency_limit(self) -> int:
+        """
+        Sincronizaciones simultáneas permitidas ahora mismo
+
+        Returns:
+            int: El límite fijo, o el que permiten la memoria libre y los núcleos
+        """
+        if self.max_concurrent:
+            return self.max_concurrent
+        return max_concurrent_transcriptions(running=len(self.active))
+
+    def _schedule(self) -> None:
+        """Claim pending jobs while there are free slots"""
+        if not self.running:
+            return
+        # Measured once: the jobs started below have not taken their memory yet
+        limit = self.concurrency_limit()
+        while len(self.active) < limit:
+            job = self.queue.claim_next()
+            if job is None:
+                return
+            self._start_job(job)
+
+    def _heartbeat(self) -> None:
+        """Keep this instance's running jobs claimed and pick up those of dead instances"""
+        if self.active:
+            self.queue.heartbeat()
+        if self.running and self.queue.requeue_interrupted():
+            self.job_changed.emit(-1)
+            self._schedule()
+
+    def _start_job(self, job: Dict[str, Any]) -> None:
+        """Run one claimed job in a SyncWorker"""
+        job_id = job["id"]
+        worker = SyncWorker(job["audio"], job["script"], job["options"])
+        worker.progress_update.connect(lambda message: self.job_log.emit(job_id, message))
+        worker.progress_percent.connect(lambda percent: self.job_progress.emit(job_id, percent))
+        worker.finished_signal.connect(lambda json_data: self._sync_finished(job, json_data))
+        worker.error_signal.connect(lambda message: self._job_failed(job_id, message))
+        worker.cancelled_signal.connect(lambda: self._job_cancelled(job_id))
+        self._keep_until_finished(worker)
+        self.active[job_id] = worker
+        worker.start()
+        self.job_changed.emit(job_id)
+
+    def _sync_finished(self, job: Dict[str, Any], json_data: Dict[str, Any]) -> None:
+        """Free the job's slot and write its results in the background"""
+        job_id = job["id"]
+        stats = self.active.pop(job_id).pipeline.stats
+        self._schedule()
+
+        json_path = job["output"]
+        excel_path = f"{os.path.splitext(json_path)[0]}.xlsx"
+        errors: List[str] = []
+        export_worker = ExportWorker(json_data, json_path, excel_path)
+        export_worker.progress_update.connect(lambda message: self.job_log.emit(job_id, message))
+        export_worker.error_signal.connect(lambda _format, message: errors.append(message))
+        export_worker.finished_signal.connect(
+            lambda written: self._export_finished(job_id, written, errors, stats)
+        )
+        self._keep_until_finished(export_worker)
+        export_worker.start()
+
+    def _export_finished(self, job_id: int, written: Dict[str, str],
+                         errors: List[str], stats: Dict[str, int]) -> None:
+        """Record the job's artifacts, or the export error"""
+        if errors:
+            self.queue.mark_failed(job_id, "; ".join(errors))
+        else:
+            self.queue.mark_done(job_id, {"files": written, "stats": stats})
+        self.job_changed.emit(job_id)
+
+    def _job_failed(self, job_id: int, message: str) -> None:
+        """Record a failed sync and free its slot"""
+        self.active.pop(job_id, None)
+        self.queue.mark_failed(job_id, message)
+        self.job_changed.emit(job_id)
+        self._schedule()
+
+    def _job_cancelled(self, job_id: int) -> None:
+        """Record a sync stopped by cancel() and free its slot"""
+        self.active.pop(job_id, None)
+        self.queue.mark_cancelled(job_id)
+        self.job_changed.emit(job_id)
+        self._schedule()
+
+    def _keep_until_finished(self, thread: QThread) -> None:
+        """Hold a reference to a thread until it stops, then let Qt delete it"""
+        self._threads.add(thread)
+
+        def release() -> None:
+            self._threads.discard(thread)
+            thread.deleteLater()
+
+        thread.finished.connect(release)
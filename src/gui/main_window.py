@@ -4,7 +4,10 @@ from typing import Dict, Any, Optional
 from PyQt5.QtWidgets import (QMainWindow, QVBoxLayout, QWidget, QSplitter, QTabWidget)
 from PyQt5.QtCore import Qt
 
+from src.core.sync_engine import shutdown_engines
 from src.gui.file_panel import FileSelectionPanel
+from src.gui.job_scheduler import JobScheduler
+from src.gui.queue_panel import QueuePanel
 from src.gui.results_panel import ResultsPanel
 from src.gui.sync_panel import SyncPanel
 from src.gui.preview_panel import PreviewPanel
@@ -27,10 +30,13 @@ class SyncApp(QMainWindow):
         self.sync_panel: Optional[SyncPanel] = None
         self.preview_panel: Optional[PreviewPanel] = None
         self.results_panel: Optional[ResultsPanel] = None
+        self.queue_panel: Optional[QueuePanel] = None
+        self.job_scheduler: Optional[JobScheduler] = None
         self.tab_widget: Optional[QTabWidget] = None
         
         # Setup UI
         self.initUI()
+        self._start_job_scheduler()
         
     def initUI(self):
         """Initialize the user interface components"""
@@ -62,6 +68,9 @@ class SyncApp(QMainWindow):
         self.sync_panel = SyncPanel(self)
         self.preview_panel = PreviewPanel()
         self.results_panel = ResultsPanel()
+        self.job_scheduler = JobScheduler(parent=self)
+        self.job_scheduler.job_log.connect(self.log_job_message)
+        self.queue_panel = QueuePanel(self.job_scheduler)
     
     def _create_tab_container(self, main_layout: QVBoxLayout):
         """Create and set up the tab container"""
@@ -73,6 +82,7 @@ class SyncApp(QMainWindow):
         self.tab_widget.addTab(self.preview_panel, "Vista Previa del Guion")
         self.tab_widget.addTab(self.results_panel, "Resultados de Sincronización")
         self.tab_widget.addTab(self.sync_panel.log_area, "Log de Procesamiento")
+        self.tab_widget.addTab(self.queue_panel, "Cola de Trabajos")
         
         # Add tabs to splitter
         splitter.addWidget(self.tab_widget)
@@ -82,6 +92,18 @@ class SyncApp(QMainWindow):
         main_layout.addWidget(self.sync_panel)
         main_layout.addWidget(splitter, 1)  # Splitter takes remaining space
     
+    def _start_job_scheduler(self):
+        """Resume the jobs left unfinished by the previous session"""
+        requeued = self.job_scheduler.start()
+        if requeued:
+            self.update_log(f"Se han recuperado {requeued} trabajos interrumpidos de la cola")
+    
+    def closeEvent(self, event):
+        """Stop launching queued jobs and the idle engines; unfinished jobs resume on the next start"""
+        self.job_scheduler.stop()
+        shutdown_engines()
+        super().closeEvent(event)
+    
     # Path getters and setters
     def get_audio_path(self) -> str:
         """Get the audio file path"""
@@ -129,6 +151,10 @@ class SyncApp(QMainWindow):
         """Update the log with a new message"""
         self.sync_panel.update_log(message)
         
+    def log_job_message(self, job_id: int, message: str) -> None:
+        """Add a queued job's messages to the log, tagged with the job id"""
+        self.update_log("\n".join(f"[Trabajo {job_id}] {line}" for line in message.split("\n")))
+        
     def switch_to_results_tab(self) -> None:
         """Switch to the results tab"""
         self.tab_widget.setCurrentIndex(1)
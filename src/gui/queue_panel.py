@@ -0,0 +1,128 @@
+import os
+from typing import Any, Dict, List, Optional
+
+from PyQt5.QtWidgets import (QWidget, QTableWidget, QTableWidgetItem, QHeaderView,
+                             QPushButton, QHBoxLayout, QVBoxLayout, QLabel, QAbstractItemView)
+
+from src.core.job_queue import (JOB_PENDING, JOB_RUNNING, JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+from src.gui.job_scheduler import JobScheduler
+
+
+class QueuePanel(QWidget):
+    """
+    Vista de la cola de trabajos: estado, progreso y resultado de cada uno
+    """
+    # Table columns
+    COLUMN_HEADERS = ["ID", "Audio", "Guion", "Estado", "Progreso", "Detalle"]
+    COL_ID = 0
+    COL_AUDIO = 1
+    COL_SCRIPT = 2
+    COL_STATE = 3
+    COL_PROGRESS = 4
+    COL_DETAIL = 5
+
+    STATE_LABELS = {
+        JOB_PENDING: "En cola",
+        JOB_RUNNING: "Sincronizando",
+        JOB_DONE: "Terminado",
+        JOB_FAILED: "Error",
+        JOB_CANCELLED: "Cancelado"
+    }
+
+    BUTTON_CANCEL_TEXT = "Cancelar"
+    BUTTON_RETRY_TEXT = "Reintentar"
+    BUTTON_CLEAR_TEXT = "Quitar terminados"
+
+    def __init__(self, scheduler: JobScheduler) -> None:
+        super().__init__()
+        self.scheduler = scheduler
+        self.progress: Dict[int, int] = {}
+        self.initUI()
+
+        scheduler.job_changed.connect(self.refresh)
+        scheduler.job_progress.connect(self.update_progress)
+        self.refresh()
+
+    def initUI(self) -> None:
+        layout = QVBoxLayout()
+
+        self.limit_label = QLabel()
+
+        self.table = QTableWidget(0, len(self.COLUMN_HEADERS))
+        self.table.setHorizontalHeaderLabels(self.COLUMN_HEADERS)
+        self.table.horizontalHeader().setSectionResizeMode(self.COL_DETAIL, QHeaderView.Stretch)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+
+        button_layout = QHBoxLayout()
+        self.cancel_button = QPushButton(self.BUTTON_CANCEL_TEXT)
+        self.cancel_button.clicked.connect(self.cancel_selected)
+        self.retry_button = QPushButton(self.BUTTON_RETRY_TEXT)
+        self.retry_button.clicked.connect(self.retry_selected)
+        self.clear_button = QPushButton(self.BUTTON_CLEAR_TEXT)
+        self.clear_button.clicked.connect(self.clear_finished)
+        button_layout.addWidget(self.cancel_button)
+        button_layout.addWidget(self.retry_button)
+        button_layout.addWidget(self.clear_button)
+        button_layout.addStretch()
+
+        layout.addWidget(self.limit_label)
+        layout.addWidget(self.table)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+    def refresh(self, _job_id: Optional[int] = None) -> None:
+        """Vuelve a leer la cola y rellena la tabla"""
+        self.limit_label.setText(
+            f"Sincronizaciones simultáneas: {self.scheduler.concurrency_limit()}"
+        )
+        jobs = self.scheduler.queue.list_jobs()
+        self.table.setRowCount(len(jobs))
+        for row, job in enumerate(jobs):
+            detail = job["error"] or ", ".join(job["artifacts"].get("files", {}).values())
+            values = [
+                str(job["id"]),
+                os.path.basename(job["audio"]),
+                os.path.basename(job["script"]),
+                self.STATE_LABELS.get(job["state"], job["state"]),
+                self._progress_text(job),
+                detail
+            ]
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+
+    def update_progress(self, job_id: int, percent: int) -> None:
+        """Actualiza la columna de progreso de un trabajo en curso"""
+        self.progress[job_id] = percent
+        for row in range(self.table.rowCount()):
+            if self.table.item(row, self.COL_ID).text() == str(job_id):
+                self.table.setItem(row, self.COL_PROGRESS, QTableWidgetItem(f"{percent}%"))
+                return
+
+    def cancel_selected(self) -> None:
+        """Cancela los trabajos seleccionados (los que están en curso, al terminar su fragmento)"""
+        for job_id in self._selected_job_ids():
+            self.scheduler.cancel(job_id)
+
+    def retry_selected(self) -> None:
+        """Vuelve a poner en cola los trabajos fallidos o cancelados seleccionados"""
+        for job_id in self._selected_job_ids():
+            self.scheduler.retry(job_id)
+
+    def clear_finished(self) -> None:
+        """Quita de la cola los trabajos que ya no se van a ejecutar"""
+        self.scheduler.queue.remove_finished()
+        self.refresh()
+
+    def _progress_text(self, job: Dict[str, Any]) -> str:
+        """Progress cell of a job: live percentage while it runs"""
+        if job["state"] == JOB_RUNNING:
+            return f"{self.progress.get(job['id'], 0)}%"
+        if job["state"] == JOB_DONE:
+            return "100%"
+        return ""
+
+    def _selected_job_ids(self) -> List[int]:
+        """Ids of the jobs in the selected rows"""
+        rows = {index.row() for index in self.table.selectionModel().selectedRows()}
+        return [int(self.table.item(row, self.COL_ID).text()) for row in sorted(rows)]
@@ -0,0 +1,164 @@
+from typing import Any, Callable, Dict, List, Optional
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt5.QtGui import QBrush
+
+from src.core.export import DEFAULT_TIMECODE, EXCEL_COLUMN_HEADERS, row_needs_highlight
+from src.core.timecode import as_timecode
+
+
+class ResultsModel(QAbstractTableModel):
+    """
+    Modelo de tabla sobre las entradas de la sincronización
+
+    Las celdas se sirven bajo demanda desde los diccionarios de resultados,
+    sin crear un objeto por celda. El orden de visualización es una
+    permutación de las filas, de modo que ordenar no modifica los datos
+    (que se comparten con la exportación). El resaltado se calcula en data()
+    comparando cada fila con la anterior del guion, no con la anterior en
+    pantalla, así que no cambia al ordenar. El modelo guarda su propia lista
+    de filas: añadir filas no modifica la lista del llamador.
+    """
+    # Result keys of each column
+    COLUMN_KEYS = ["ID", "IN", "OUT", "PERSONAJE", "DIÁLOGO"]
+    COL_ID = 0
+    COL_IN = 1
+    COL_OUT = 2
+    HIGHLIGHT_BRUSH = QBrush(Qt.yellow)
+
+    def __init__(self, parent: Optional[Any] = None):
+        super().__init__(parent)
+        self._rows: List[Dict[str, Any]] = []
+        self._order: List[int] = []
+        self._sort_column: Optional[int] = None
+        self._sort_order = Qt.AscendingOrder
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._order)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.COLUMN_KEYS)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+
+        position = self._order[index.row()]
+        if role == Qt.DisplayRole:
+            key = self.COLUMN_KEYS[index.column()]
+            if key == "ID":
+                return str(self._rows[position].get(key, ""))
+            if key in ("IN", "OUT"):
+                # Timecodes become strings only for the rows on screen
+                return str(self._rows[position].get(key, DEFAULT_TIMECODE))
+            return self._rows[position].get(key, "")
+        if role == Qt.BackgroundRole and self._is_highlighted(position):
+            return self.HIGHLIGHT_BRUSH
+        return None
+
+    def headerData(self, section: int, orientation: int, role: int = Qt.DisplayRole) -> Any:
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return EXCEL_COLUMN_HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def set_results(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Sustituye todas las filas
+
+        Args:
+            entries (List[Dict[str, Any]]): Entradas de la sincronización
+        """
+        self.beginResetModel()
+        self._rows = list(entries)
+        self._order = list(range(len(entries)))
+        self._apply_sort()
+        self.endResetModel()
+
+    def append_results(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Añade filas al final sin reconstruir las existentes
+
+        Con la tabla ordenada, cada fila nueva se inserta en su sitio por
+        búsqueda binaria, sin volver a ordenar las que ya estaban.
+
+        Args:
+            entries (List[Dict[str, Any]]): Entradas nuevas
+        """
+        if not entries:
+            return
+        first = len(self._rows)
+        self._rows.extend(entries)
+        sort_key = self._sort_key()
+        if sort_key is None:
+            self.beginInsertRows(QModelIndex(), first, first + len(entries) - 1)
+            self._order.extend(range(first, first + len(entries)))
+            self.endInsertRows()
+            return
+
+        for position in range(first, first + len(entries)):
+            row = self._insertion_row(position, sort_key)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._order.insert(row, position)
+            self.endInsertRows()
+
+    def clear(self) -> None:
+        """Elimina todas las filas"""
+        self.set_results([])
+
+    def sort(self, column: int, order: int = Qt.AscendingOrder) -> None:
+        self._sort_column = column
+        self._sort_order = order
+        self.layoutAboutToBeChanged.emit()
+        # Keep selections and the current cell on the same data rows
+        persistent = self.persistentIndexList()
+        positions = [self._order[index.row()] for index in persistent]
+        self._apply_sort()
+        new_rows = {position: row for row, position in enumerate(self._order)}
+        self.changePersistentIndexList(persistent, [
+            self.index(new_rows[position], index.column())
+            for index, position in zip(persistent, positions)
+        ])
+        self.layoutChanged.emit()
+
+    def _apply_sort(self) -> None:
+        """Reorder the display permutation by the current sort column"""
+        sort_key = self._sort_key()
+        if sort_key is None:
+            return
+        self._order.sort(key=sort_key, reverse=self._sort_order == Qt.DescendingOrder)
+
+    def _sort_key(self) -> Optional[Callable[[int], Any]]:
+        """Sort key of a data position for the current sort column, if any"""
+        if self._sort_column is None:
+            return None
+        key = self.COLUMN_KEYS[self._sort_column]
+        rows = self._rows
+        if self._sort_column == self.COL_ID:
+            return lambda position: rows[position].get(key, 0)
+        if self._sort_column in (self.COL_IN, self.COL_OUT):
+            return lambda position: as_timecode(rows[position].get(key, DEFAULT_TIMECODE))
+        return lambda position: rows[position].get(key, "")
+
+    def _insertion_row(self, position: int, sort_key: Callable[[int], Any]) -> int:
+        """Display row where a new data position keeps the order sorted (after equal keys)"""
+        key = sort_key(position)
+        descending = self._sort_order == Qt.DescendingOrder
+        lo, hi = 0, len(self._order)
+        while lo < hi:
+            middle = (lo + hi) // 2
+            other = sort_key(self._order[middle])
+            if (other < key) if descending else (key < other):
+                hi = middle
+            else:
+                lo = middle + 1
+        return lo
+
+    def _is_highlighted(self, position: int) -> bool:
+        """Whether the row at this position of the data needs highlighting"""
+        item = self._rows[position]
+        prev_in_time = self._rows[position - 1].get("IN", DEFAULT_TIMECODE) if position else None
+        return row_needs_highlight(
+            item.get("IN", DEFAULT_TIMECODE),
+            item.get("OUT", DEFAULT_TIMECODE),
+            prev_in_time
+        )
@@ -1,29 +1,35 @@
-import json
 import os
 from typing import Dict, Any, List, Optional
 
 from PyQt5.QtWidgets import (QWidget, QPushButton, QHBoxLayout, QVBoxLayout, 
                             QProgressBar, QTextEdit, QMessageBox, QFileDialog,
-                            QTableWidget)
+                            QTableWidget, QCheckBox, QComboBox)
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QTextCursor
 
-from src.core.audio_sync import SyncWorker
+from src.core.audio_sync import ExportWorker, SyncWorker
+from src.core.inference_profile import INFERENCE_PROFILES, DEFAULT_PROFILE
+from src.core.pipeline import SyncPipeline
 
 class SyncPanel(QWidget):
     # Constantes
     BUTTON_START_TEXT = "Iniciar Sincronización"
+    BUTTON_QUEUE_TEXT = "Añadir a la Cola"
+    BUTTON_CANCEL_TEXT = "Cancelar"
     BUTTON_SAVE_TEXT = "Guardar Resultados"
     BUTTON_EXPORT_TEXT = "Exportar a Excel"
-    
-    EXCEL_COLUMN_HEADERS = ["ID", "IN", "OUT", "PERSONAJE", "DIÁLOGO"]
-    EXCEL_SHEET_NAME = "Sincronización"
-    EXCEL_HIGHLIGHT_COLOR = "FFFF00"
+    STREAMING_CHECKBOX_TEXT = "Mostrar resultados durante la transcripción"
+    VAD_CHECKBOX_TEXT = "Omitir silencios y música"
+    CHECKPOINT_CHECKBOX_TEXT = "Reanudar transcripciones interrumpidas"
+    PROFILE_CHECKBOX_TEXT = "Medir tiempos por etapa"
+    INFERENCE_COMBO_TOOLTIP = "Perfil de inferencia: modelo, cuantización int8 y búsqueda"
+    TRACE_SUFFIX = ".trace.json"
+    MAX_LOG_LINES = 5000
     
     def __init__(self, parent: QWidget) -> None:
         super().__init__()
         self.parent = parent
         self.worker: Optional[SyncWorker] = None
+        self.export_workers: List[ExportWorker] = []
         self.initUI()
         
     def initUI(self) -> None:
@@ -55,6 +61,16 @@ class SyncPanel(QWidget):
         self.start_button.clicked.connect(self.start_sync)
         self.start_button.setEnabled(False)
         
+        # Botón de añadir a la cola
+        self.queue_button = QPushButton(self.BUTTON_QUEUE_TEXT)
+        self.queue_button.clicked.connect(self.queue_sync)
+        self.queue_button.setEnabled(False)
+        
+        # Botón de cancelar
+        self.cancel_button = QPushButton(self.BUTTON_CANCEL_TEXT)
+        self.cancel_button.clicked.connect(self.cancel_sync)
+        self.cancel_button.setVisible(False)
+        
         # Botón de guardar
         self.save_button = QPushButton(self.BUTTON_SAVE_TEXT)
         self.save_button.clicked.connect(lambda: self.save_results(automatic=False))
@@ -65,9 +81,34 @@ class SyncPanel(QWidget):
         self.export_button.clicked.connect(lambda: self.export_to_excel(automatic=False))
         self.export_button.setVisible(False)
         
+        # Casilla de modo streaming
+        self.streaming_checkbox = QCheckBox(self.STREAMING_CHECKBOX_TEXT)
+        
+        # Casilla de detección de voz
+        self.vad_checkbox = QCheckBox(self.VAD_CHECKBOX_TEXT)
+        
+        # Casilla de puntos de control
+        self.checkpoint_checkbox = QCheckBox(self.CHECKPOINT_CHECKBOX_TEXT)
+        
+        # Selector del perfil de inferencia
+        self.inference_combo = QComboBox()
+        self.inference_combo.addItems(list(INFERENCE_PROFILES))
+        self.inference_combo.setCurrentText(DEFAULT_PROFILE)
+        self.inference_combo.setToolTip(self.INFERENCE_COMBO_TOOLTIP)
+        
+        # Casilla de medición de tiempos
+        self.profile_checkbox = QCheckBox(self.PROFILE_CHECKBOX_TEXT)
+        
         button_layout.addWidget(self.start_button)
+        button_layout.addWidget(self.queue_button)
+        button_layout.addWidget(self.cancel_button)
         button_layout.addWidget(self.save_button)
         button_layout.addWidget(self.export_button)
+        button_layout.addWidget(self.streaming_checkbox)
+        button_layout.addWidget(self.vad_checkbox)
+        button_layout.addWidget(self.checkpoint_checkbox)
+        button_layout.addWidget(self.inference_combo)
+        button_layout.addWidget(self.profile_checkbox)
         
         return button_layout
     
@@ -82,15 +123,19 @@ class SyncPanel(QWidget):
         """Crea y configura el área de log"""
         log_area = QTextEdit()
         log_area.setReadOnly(True)
+        # Oldest lines are discarded so long runs keep appends cheap
+        log_area.document().setMaximumBlockCount(self.MAX_LOG_LINES)
         return log_area
 
     def enable_start_button(self) -> None:
         """Habilita el botón de inicio de sincronización"""
         self.start_button.setEnabled(True)
+        self.queue_button.setEnabled(True)
         
     def disable_start_button(self) -> None:
         """Deshabilita el botón de inicio de sincronización"""
         self.start_button.setEnabled(False)
+        self.queue_button.setEnabled(False)
         
     def start_sync(self) -> None:
         """Inicia el proceso de sincronización en un hilo separado"""
@@ -104,6 +149,28 @@ class SyncPanel(QWidget):
         # Crear e iniciar el worker thread
         self._create_and_start_worker(script_path)
     
+    def queue_sync(self) -> None:
+        """Añade la sincronización de los archivos seleccionados a la cola de trabajos"""
+        script_path = self.parent.get_script_path()
+        script_basename = os.path.splitext(os.path.basename(script_path))[0]
+        job_id = self.parent.job_scheduler.submit(
+            self.parent.get_audio_path(),
+            script_path,
+            os.path.abspath(f"{script_basename}.json"),
+            self._sync_options()
+        )
+        self.update_log(f"Trabajo {job_id} añadido a la cola ({script_basename})")
+    
+    def _sync_options(self) -> Dict[str, Any]:
+        """Opciones de SyncPipeline elegidas en el panel"""
+        return {
+            "streaming": self.streaming_checkbox.isChecked(),
+            "vad": self.vad_checkbox.isChecked(),
+            "checkpoint": self.checkpoint_checkbox.isChecked(),
+            "inference_profile": self.inference_combo.currentText(),
+            "profile": self.profile_checkbox.isChecked()
+        }
+    
     def _setup_output_paths(self, script_path: str) -> None:
         """Configura las rutas de salida basadas en el script"""
         script_basename = os.path.splitext(os.path.basename(script_path))[0]
@@ -113,10 +180,12 @@ class SyncPanel(QWidget):
     def _reset_ui_for_sync(self) -> None:
         """Reinicia la UI para comenzar una nueva sincronización"""
         self.log_area.clear()
-        self.parent.results_panel.results_widget.setRowCount(0)
+        self.parent.results_panel.clear_results()
         self.progress_bar.setRange(0, 100)
         self.progress_bar.setValue(0)
         self.start_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.cancel_button.setVisible(True)
         self.save_button.setVisible(False)
         self.export_button.setVisible(False)
     
@@ -124,14 +193,35 @@ class SyncPanel(QWidget):
         """Crea e inicia el worker thread para la sincronización"""
         self.worker = SyncWorker(
             self.parent.get_audio_path(), 
-            script_path
+            script_path,
+            self._sync_options()
         )
         self.worker.progress_update.connect(self.update_log)
+        self.worker.partial_results.connect(self.parent.results_panel.append_results)
         self.worker.progress_percent.connect(self.update_progress)
         self.worker.finished_signal.connect(self.sync_finished)
         self.worker.error_signal.connect(self.sync_error)
+        self.worker.cancelled_signal.connect(self.sync_cancelled)
         self.worker.start()
     
+    def cancel_sync(self) -> None:
+        """Pide al worker que se detenga al terminar el fragmento en curso"""
+        if self.worker is not None:
+            self.worker.cancel()
+            self.cancel_button.setEnabled(False)
+            self.update_log("Cancelando: se detendrá al terminar el fragmento en curso...")
+    
+    def sync_cancelled(self) -> None:
+        """Restablece la UI tras una cancelación"""
+        self.progress_bar.setValue(0)
+        self.cancel_button.setVisible(False)
+        self.start_button.setEnabled(True)
+        message = "Sincronización cancelada."
+        if self.worker is not None and self.worker.pipeline.options["checkpoint"]:
+            message += (" Los fragmentos transcritos se han guardado y la próxima "
+                        "sincronización continuará desde ahí.")
+        self.update_log(message)
+    
     def update_progress(self, percent: int) -> None:
         """Actualiza la barra de progreso con el porcentaje recibido"""
         self.progress_bar.setValue(percent)
@@ -139,12 +229,11 @@ class SyncPanel(QWidget):
         self.progress_bar.setTextVisible(True)
         
     def update_log(self, message: str) -> None:
-        """Actualiza el área de registro con nuevos mensajes"""
+        """Actualiza el área de registro con uno o varios mensajes (separados por saltos de línea)"""
         self.log_area.append(message)
         # Auto-scroll to bottom
-        cursor = self.log_area.textCursor()
-        cursor.movePosition(QTextCursor.End)
-        self.log_area.setTextCursor(cursor)
+        scroll_bar = self.log_area.verticalScrollBar()
+        scroll_bar.setValue(scroll_bar.maximum())
         
     def sync_finished(self, json_data: Dict[str, Any]) -> None:
         """Maneja la finalización exitosa del proceso de sincronización"""
@@ -164,22 +253,23 @@ class SyncPanel(QWidget):
         # Mostrar resultados en la tabla
         self.parent.display_results(json_data)
         
-        # Guardar y exportar automáticamente
-        self.save_results(automatic=True)
-        self.export_to_excel(automatic=True)
+        # Guardar y exportar automáticamente en segundo plano
+        json_path = self.parent.get_output_path()
+        self._start_export(
+            json_path=json_path, 
+            excel_path=self._get_excel_file_path(automatic=True), 
+            automatic=True
+        )
     
     def _update_ui_after_sync(self) -> None:
         """Actualiza la UI después de completar la sincronización"""
         self.update_log("\n¡Sincronización completada!")
-        self.update_log("Los resultados se han guardado automáticamente.")
         self.update_log("Revise los resultados en la pestaña 'Resultados de Sincronización'.")
         
         # Cambiar a la pestaña de resultados
         self.parent.switch_to_results_tab()
         
-        # Actualizar estado de los botones
-        self.save_button.setVisible(True)
-        self.export_button.setVisible(True)
+        self.cancel_button.setVisible(False)
         self.start_button.setEnabled(True)
     
     def sync_error(self, error_message: str) -> None:
@@ -187,6 +277,7 @@ class SyncPanel(QWidget):
         self.progress_bar.setRange(0, 100)
         self.progress_bar.setValue(0)
         self.update_log(f"ERROR: {error_message}")
+        self.cancel_button.setVisible(False)
         self.start_button.setEnabled(True)
         self.save_button.setVisible(False)
         self.export_button.setVisible(False)
@@ -201,69 +292,73 @@ class SyncPanel(QWidget):
         Args:
             automatic: Si es True, guarda automáticamente sin mostrar diálogos
         """
-        try:
-            self._save_json_file(automatic)
-        except Exception as e:
-            self._handle_save_error(str(e), automatic)
-    
-    def _save_json_file(self, automatic: bool) -> None:
-        """Guarda los resultados en un archivo JSON"""
-        output_path = self.parent.get_output_path()
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(self.parent.get_sync_results(), f, indent=4, ensure_ascii=False)
-            
-        self.update_log(f"Archivo JSON guardado en: {output_path}")
-        
-        if not automatic:
-            QMessageBox.information(self, "Guardado Completado", 
-                                  f"Los resultados se han guardado correctamente en:\n{output_path}")
-            self.save_button.setVisible(False)
-    
-    def _handle_save_error(self, error_msg: str, automatic: bool) -> None:
-        """Maneja errores durante el guardado de archivos"""
-        error_msg = f"No se pudo guardar el archivo JSON: {error_msg}"
-        self.update_log(f"ERROR: {error_msg}")
-        if not automatic:
-            QMessageBox.critical(self, "Error al Guardar", error_msg)
+        self._start_export(json_path=self.parent.get_output_path(), automatic=automatic)
     
     def export_to_excel(self, automatic: bool = False) -> None:
         """
-        Exporta los resultados a un archivo Excel (XLSX) con el mismo formato y colores
+        Exporta los resultados a un archivo Excel (XLSX) con las filas dudosas resaltadas
         
         Args:
             automatic: Si es True, exporta automáticamente sin mostrar diálogos
         """
-        try:
-            self._check_excel_dependencies()
-            data = self._get_table_data()
-            file_path = self._get_excel_file_path(automatic)
-            
-            if file_path:
-                self._create_excel_file(data, file_path, automatic)
-                
-        except ImportError as e:
-            self._handle_excel_import_error(automatic)
-        except Exception as e:
-            self._handle_excel_export_error(str(e), automatic)
+        file_path = self._get_excel_file_path(automatic)
+        if file_path:
+            self._start_export(excel_path=file_path, automatic=automatic)
     
-    def _check_excel_dependencies(self) -> None:
-        """Verifica que las dependencias para Excel estén instaladas"""
-        import pandas as pd
-        from openpyxl import Workbook
-        from openpyxl.styles import PatternFill
-        from openpyxl.utils.dataframe import dataframe_to_rows
+    def _start_export(self, json_path: Optional[str] = None, 
+                      excel_path: Optional[str] = None, 
+                      automatic: bool = False) -> None:
+        """Escribe los archivos en un hilo aparte a partir de los datos de la sincronización"""
+        # The run being exported, fixed now: another sync may start before this finishes
+        pipeline = self.worker.pipeline if automatic and self.worker else None
+        trace_path = f"{os.path.splitext(json_path)[0]}{self.TRACE_SUFFIX}" if json_path else None
+        tracer = pipeline.tracer if pipeline is not None else None
+        export_worker = ExportWorker(self.parent.get_sync_results(), json_path, excel_path, tracer)
+        export_worker.progress_update.connect(self.update_log)
+        export_worker.error_signal.connect(
+            lambda _format, message: self._handle_export_error(message, automatic)
+        )
+        export_worker.finished_signal.connect(
+            lambda written: self._export_finished(export_worker, written, automatic, 
+                                                  pipeline, trace_path)
+        )
+        self.export_workers.append(export_worker)
+        export_worker.start()
     
-    def _get_table_data(self) -> List[List[str]]:
-        """Obtiene los datos de la tabla de resultados"""
-        data = []
-        results_widget = self.parent.results_panel.results_widget
-        for row in range(results_widget.rowCount()):
-            row_data = []
-            for col in range(results_widget.columnCount()):
-                item = results_widget.item(row, col)
-                row_data.append(item.text() if item else "")
-            data.append(row_data)
-        return data
+    def _export_finished(self, export_worker: ExportWorker, 
+                         written: Dict[str, str], automatic: bool,
+                         pipeline: Optional[SyncPipeline] = None,
+                         trace_path: Optional[str] = None) -> None:
+        """Informa de los archivos escritos y libera el hilo de exportación"""
+        self.export_workers.remove(export_worker)
+        export_worker.deleteLater()
+        
+        if automatic:
+            if written:
+                self.update_log("Los resultados se han guardado automáticamente.")
+            self.save_button.setVisible(True)
+            self.export_button.setVisible(True)
+            
+            # Desglose de tiempos y traza junto al JSON (solo si se activó la medición)
+            if pipeline is not None:
+                pipeline.report_profile(trace_path)
+            return
+        
+        if ExportWorker.FORMAT_JSON in written:
+            QMessageBox.information(self, "Guardado Completado", 
+                                  f"Los resultados se han guardado correctamente en:\n"
+                                  f"{written[ExportWorker.FORMAT_JSON]}")
+            self.save_button.setVisible(False)
+        if ExportWorker.FORMAT_EXCEL in written:
+            QMessageBox.information(self, "Exportación Completada", 
+                                  f"Los resultados se han exportado correctamente a:\n"
+                                  f"{written[ExportWorker.FORMAT_EXCEL]}")
+    
+    def _handle_export_error(self, error_msg: str, automatic: bool) -> None:
+        """Maneja errores durante el guardado o la exportación de archivos"""
+        self.update_log(f"ERROR: {error_msg}")
+        if not automatic:
+            QMessageBox.critical(self, "Error al Exportar", error_msg)
     
     def _get_excel_file_path(self, automatic: bool) -> Optional[str]:
         """Determina la ruta del archivo Excel"""
@@ -282,86 +377,3 @@ class SyncPanel(QWidget):
             file_path += '.xlsx'
             
         return file_path
-    
-    def _create_excel_file(self, data: List[List[str]], file_path: str, automatic: bool) -> None:
-        """Crea y guarda el archivo Excel con los datos proporcionados"""
-        import pandas as pd
-        from openpyxl import Workbook
-        from openpyxl.styles import PatternFill
-        from openpyxl.utils.dataframe import dataframe_to_rows
-        
-        # Crear DataFrame
-        df = pd.DataFrame(data, columns=self.EXCEL_COLUMN_HEADERS)
-        
-        # Crear un libro de Excel
-        wb = Workbook()
-        ws = wb.active
-        ws.title = self.EXCEL_SHEET_NAME
-        
-        # Añadir los datos al libro
-        for r_idx, row in enumerate(dataframe_to_rows(df, index=False, header=True), 1):
-            for c_idx, value in enumerate(row, 1):
-                ws.cell(row=r_idx, column=c_idx, value=value)
-        
-        # Aplicar formato (resaltado amarillo)
-        self._apply_excel_highlighting(ws)
-        
-        # Ajustar el ancho de las columnas
-        self._adjust_excel_column_widths(ws)
-        
-        # Guardar el archivo
-        wb.save(file_path)
-        self.update_log(f"Archivo Excel guardado en: {file_path}")
-        
-        if not automatic:
-            QMessageBox.information(self, "Exportación Completada", 
-                                  f"Los resultados se han exportado correctamente a:\n{file_path}")
-    
-    def _apply_excel_highlighting(self, worksheet) -> None:
-        """Aplica el resaltado a las filas en Excel"""
-        from openpyxl.styles import PatternFill
-        
-        yellow_fill = PatternFill(
-            start_color=self.EXCEL_HIGHLIGHT_COLOR, 
-            end_color=self.EXCEL_HIGHLIGHT_COLOR, 
-            fill_type="solid"
-        )
-        
-        results_widget = self.parent.results_panel.results_widget
-        for row in range(results_widget.rowCount()):
-            # Verificar si la primera celda de la fila está resaltada
-            first_item = results_widget.item(row, 0)
-            if first_item and first_item.background().color().name() == "#ffff00":
-                # Aplicar resaltado a toda la fila en Excel
-                for col in range(1, len(self.EXCEL_COLUMN_HEADERS) + 1):
-                    worksheet.cell(row=row+2, column=col).fill = yellow_fill  # +2 porque la fila 1 es el encabezado
-    
-    def _adjust_excel_column_widths(self, worksheet) -> None:
-        """Ajusta el ancho de las columnas en Excel"""
-        for column in worksheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-                    
-            adjusted_width = (max_length + 2)
-            worksheet.column_dimensions[column_letter].width = adjusted_width
-    
-    def _handle_excel_import_error(self, automatic: bool) -> None:
-        """Maneja errores de importación de módulos para Excel"""
-        error_msg = "Para exportar a Excel, necesita instalar pandas y openpyxl:\npip install pandas openpyxl"
-        self.update_log(f"ERROR: {error_msg}")
-        if not automatic:
-            QMessageBox.warning(self, "Módulos Faltantes", error_msg)
-    
-    def _handle_excel_export_error(self, error_msg: str, automatic: bool) -> None:
-        """Maneja errores durante la exportación a Excel"""
-        error_msg = f"No se pudo exportar a Excel: {error_msg}"
-        self.update_log(f"ERROR: {error_msg}")
-        if not automatic:
-            QMessageBox.critical(self, "Error al Exportar", error_msg)
\ No newline at end of file
@@ -0,0 +1,18 @@
+import threading
+
+from src.cli.batch import run_jobs
+
+
+def test_failed_worker_does_not_lose_the_batch(tmp_path):
+    jobs = [
+        {"name": "missing", "audio": str(tmp_path / "missing.wav"),
+         "script": str(tmp_path / "missing.txt"), "output": str(tmp_path / "missing.json"),
+         "options": {}, "excel": False},
+        # Cannot be sent to a worker: its future fails instead of returning a summary
+        {"name": "broken", "audio": "", "script": "", "output": str(tmp_path / "broken.json"),
+         "options": {"lock": threading.Lock()}, "excel": False},
+    ]
+    results = run_jobs(jobs, workers=1)
+    assert [result["name"] for result in results] == ["missing", "broken"]
+    assert [result["status"] for result in results] == ["error", "error"]
+    assert results[1]["log"] == str(tmp_path / "broken.log")
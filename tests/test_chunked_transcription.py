@@ -0,0 +1,13 @@
+from src.core import chunked_transcription
+from src.core.chunked_transcription import default_workers
+
+
+def test_default_workers_stays_in_process_on_cuda(monkeypatch):
+    monkeypatch.setattr(chunked_transcription, "max_concurrent_transcriptions", lambda: 8)
+    assert default_workers(20, "cuda") == 1
+
+
+def test_default_workers_follows_machine_limit_on_cpu(monkeypatch):
+    monkeypatch.setattr(chunked_transcription, "max_concurrent_transcriptions", lambda: 3)
+    assert default_workers(20, "cpu") == 3
+    assert default_workers(2, "cpu") == 2
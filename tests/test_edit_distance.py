@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from src.core.utils import similar, SIMILARITY_BACKEND_DIFFLIB, SIMILARITY_BACKEND_NUMBA
+
+pytest.importorskip("numba")
+
+from src.core.alignment import align_segments  # noqa: E402
+
+
+THRESHOLD = 0.5
+PAIR_COUNT = 2000
+MIN_DECISION_AGREEMENT = 0.99
+
+_WORDS = ["ryder", "chase", "marshall", "skye", "rubble", "zuma", "rocky", "everest",
+          "pup", "pups", "rescue", "bay", "adventure", "tower", "mayor", "goodway",
+          "chickaletta", "the", "a", "to", "is", "on", "we", "you", "it", "go", "let's",
+          "ready", "action", "help", "need", "come", "on", "here", "there", "now"]
+
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(_WORDS) for _ in range(rng.randint(2, 14))]
+    return " ".join(words).capitalize() + rng.choice([".", "!", "?"])
+
+
+def _perturb(rng: random.Random, text: str) -> str:
+    """Drop, swap or misspell a few words, like a noisy transcription"""
+    words = text.rstrip(".!?").split()
+    for position in range(len(words)):
+        roll = rng.random()
+        if roll < 0.08:
+            words[position] = ""
+        elif roll < 0.16:
+            words[position] = rng.choice(_WORDS)
+        elif roll < 0.2 and len(words[position]) > 2:
+            words[position] = words[position][:-1]
+    return " ".join(word for word in words if word)
+
+
+def _random_pairs(seed: int = 0):
+    """Half transcriptions of their own line, half of an unrelated one"""
+    rng = random.Random(seed)
+    pairs = []
+    for position in range(PAIR_COUNT):
+        dialogue = _sentence(rng)
+        source = dialogue if position % 2 == 0 else _sentence(rng)
+        pairs.append((_perturb(rng, source), dialogue))
+    return pairs
+
+
+def test_numba_backend_agrees_with_difflib_at_threshold():
+    pairs = _random_pairs()
+    agreements = 0
+    for a, b in pairs:
+        reference = similar(a, b, SIMILARITY_BACKEND_DIFFLIB)
+        compiled = similar(a, b, SIMILARITY_BACKEND_NUMBA)
+        agreements += (reference > THRESHOLD) == (compiled > THRESHOLD)
+    assert agreements / len(pairs) >= MIN_DECISION_AGREEMENT
+
+
+def test_numba_backend_never_rejects_what_difflib_accepts():
+    # The optimal LCS covers at least the characters of difflib's blocks
+    for a, b in _random_pairs(seed=1):
+        reference = similar(a, b, SIMILARITY_BACKEND_DIFFLIB)
+        compiled = similar(a, b, SIMILARITY_BACKEND_NUMBA)
+        assert compiled >= reference - 1e-12
+
+
+@pytest.mark.parametrize("a, b, expected", [
+    ("", "", 1.0),
+    ("Hello", "hello", 1.0),
+    ("abc", "xyz", 0.0),
+])
+def test_numba_backend_edge_cases(a, b, expected):
+    assert similar(a, b, SIMILARITY_BACKEND_NUMBA) == pytest.approx(expected)
+
+
+def test_alignment_runs_on_either_backend():
+    rng = random.Random(2)
+    dialogues = [{"dialogue": _sentence(rng)} for _ in range(60)]
+    segments = [{"text": _perturb(rng, dialogue["dialogue"]), "start": float(i), "end": i + 0.9}
+                for i, dialogue in enumerate(dialogues)]
+
+    reference = align_segments(segments, dialogues, backend=SIMILARITY_BACKEND_DIFFLIB)
+    compiled = align_segments(segments, dialogues, backend=SIMILARITY_BACKEND_NUMBA)
+
+    reference_indices = {match["index"] for match in reference}
+    compiled_indices = {match["index"] for match in compiled}
+    assert len(reference_indices & compiled_indices) >= 0.9 * len(reference_indices)
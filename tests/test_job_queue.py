@@ -0,0 +1,113 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import closing
+
+import pytest
+
+from src.core.job_queue import JOB_CANCELLED, JOB_PENDING, JOB_RUNNING, JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.sqlite3"))
+
+
+def _add(queue, count=1):
+    return [queue.add("audio.wav", f"guion{index}.txt", f"guion{index}.json") for index in range(count)]
+
+
+def _set_owner(queue, job_id, pid, heartbeat):
+    with closing(queue._connect()) as connection:
+        connection.execute("UPDATE jobs SET owner_pid = ?, heartbeat = ? WHERE id = ?",
+                           (pid, heartbeat, job_id))
+
+
+def test_each_job_is_claimed_once(queue):
+    job_ids = _add(queue, 5)
+    claimed = []
+    lock = threading.Lock()
+
+    def claim():
+        job = queue.claim_next()
+        with lock:
+            claimed.append(job["id"] if job is not None else None)
+
+    threads = [threading.Thread(target=claim) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(job_id for job_id in claimed if job_id is not None) == job_ids
+    assert claimed.count(None) == 3
+    assert all(job["state"] == JOB_RUNNING and job["owner_pid"] == os.getpid()
+               for job in queue.list_jobs())
+
+
+def test_job_of_a_dead_owner_is_requeued(queue):
+    job_id, = _add(queue)
+    queue.claim_next()
+    finished = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                              capture_output=True, text=True, check=True)
+    _set_owner(queue, job_id, int(finished.stdout), time.time())
+
+    assert queue.requeue_interrupted() == 1
+    job = queue.get(job_id)
+    assert job["state"] == JOB_PENDING and job["owner_pid"] is None
+
+
+def test_job_with_a_stale_heartbeat_is_requeued(queue):
+    job_id, = _add(queue)
+    queue.claim_next()
+    _set_owner(queue, job_id, os.getpid(), time.time() - 1000)
+    assert queue.requeue_interrupted(timeout=120) == 1
+    assert queue.get(job_id)["state"] == JOB_PENDING
+
+
+def test_job_of_a_live_owner_stays_running(queue):
+    job_id, = _add(queue)
+    queue.claim_next()
+    assert queue.heartbeat() == 1
+    assert queue.requeue_interrupted() == 0
+    assert queue.get(job_id)["state"] == JOB_RUNNING
+
+
+def test_cancel_only_affects_pending_jobs(queue):
+    running_id, pending_id = _add(queue, 2)
+    queue.claim_next()
+    assert not queue.cancel(running_id)
+    assert queue.cancel(pending_id)
+    assert queue.get(pending_id)["state"] == JOB_CANCELLED
+
+
+def test_retry_requeues_failed_and_cancelled_jobs(queue):
+    failed_id, cancelled_id, done_id = _add(queue, 3)
+    for _ in range(3):
+        queue.claim_next()
+    queue.mark_failed(failed_id, "sin memoria")
+    queue.mark_cancelled(cancelled_id)
+    queue.mark_done(done_id, {"json": "guion2.json"})
+
+    assert queue.retry(failed_id) and queue.retry(cancelled_id)
+    assert not queue.retry(done_id)
+    job = queue.get(failed_id)
+    assert job["state"] == JOB_PENDING and job["error"] is None
+    assert queue.get(cancelled_id)["state"] == JOB_PENDING
+    assert queue.get(done_id)["artifacts"] == {"json": "guion2.json"}
+
+
+def test_remove_finished_keeps_pending_and_running_jobs(queue):
+    running_id, done_id, failed_id, cancelled_id, pending_id = _add(queue, 5)
+    for _ in range(3):
+        queue.claim_next()
+    queue.mark_done(done_id, {})
+    queue.mark_failed(failed_id, "error")
+    queue.cancel(cancelled_id)
+
+    assert queue.remove_finished() == 3
+    assert [job["id"] for job in queue.list_jobs()] == [running_id, pending_id]
+    assert {job["state"] for job in queue.list_jobs()} == {JOB_RUNNING, JOB_PENDING}
+
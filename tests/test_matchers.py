@@ -0,0 +1,127 @@
+import random
+
+import pytest
+
+from src.core.alignment import align_segments
+from src.core.anchored_alignment import align_segments_anchored, find_anchors
+from src.core.dialogue_index import DialogueIndex
+from src.core.pipeline import SyncPipeline
+from src.core.script_parser import parse_script
+from src.core.utils import similar
+
+
+_WORDS = ["ryder", "chase", "marshall", "skye", "rubble", "zuma", "rocky", "everest",
+          "pup", "rescue", "bay", "adventure", "tower", "mayor", "goodway", "chickaletta",
+          "ready", "action", "help", "need", "come", "here", "there", "now", "lookout"]
+
+
+def _episode(seed: int, lines: int = 40, words=_WORDS):
+    """Script and in-order transcription; segments drop a word, some lines are never heard"""
+    rng = random.Random(seed)
+    texts = [" ".join(rng.choice(words) for _ in range(rng.randint(5, 10))) for _ in range(lines)]
+    script = parse_script(line for text in texts for line in ("RYDER\n", f"{text}\n"))
+    segments = []
+    for index, text in enumerate(texts):
+        if rng.random() < 0.1:
+            continue
+        words = text.split()
+        del words[rng.randrange(len(words))]
+        segments.append({"text": " ".join(words), "start": index * 2.0, "end": index * 2.0 + 1.5})
+    return script, segments
+
+
+def _expected(segments):
+    """Every heard line matched to its own segment (25 fps)"""
+    return {int(segment["start"] // 2): int(segment["start"] * 25) for segment in segments}
+
+
+def _matches(script, segments, **options):
+    """Dialogue index -> IN frame for one matcher run"""
+    pipeline = SyncPipeline("audio.wav", "guion.txt", options)
+    json_data = pipeline._create_json_structure()
+    pipeline._process_segments({"segments": segments}, script, json_data)
+    return {entry["ID"]: entry["IN"].frames for entry in json_data["data"]}
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_matrix_matcher_agrees_with_greedy(seed):
+    script, segments = _episode(seed)
+    reference = _matches(script, segments, matcher=SyncPipeline.MATCHER_GREEDY,
+                         candidate_pruning=False)
+    assert reference == _expected(segments)
+    assert _matches(script, segments, matcher=SyncPipeline.MATCHER_MATRIX) == reference
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_candidate_pruning_keeps_greedy_matches(seed):
+    script, segments = _episode(seed)
+    exhaustive = _matches(script, segments, matcher=SyncPipeline.MATCHER_GREEDY,
+                          candidate_pruning=False)
+    assert _matches(script, segments, matcher=SyncPipeline.MATCHER_GREEDY,
+                    candidate_pruning=True) == exhaustive
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_index_candidates_include_the_best_dialogue(seed):
+    script, segments = _episode(seed, lines=80)
+    index = DialogueIndex(script)
+    for segment in segments:
+        scores = [similar(segment["text"], dialogue["dialogue"]) for dialogue in script]
+        best = max(range(len(scores)), key=scores.__getitem__)
+        if scores[best] > SyncPipeline.SIMILARITY_THRESHOLD:
+            assert best in index.candidates(segment["text"])
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_windowed_matcher_agrees_with_greedy(seed):
+    script, segments = _episode(seed)
+    reference = _matches(script, segments, matcher=SyncPipeline.MATCHER_GREEDY,
+                         candidate_pruning=False)
+    assert _matches(script, segments, matcher=SyncPipeline.MATCHER_WINDOWED) == reference
+
+
+def test_windowed_matcher_widens_past_a_long_unheard_stretch():
+    rng = random.Random(4)
+    # A large vocabulary keeps unrelated lines below the threshold
+    words = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(6)) for _ in range(300)]
+    script, segments = _episode(4, lines=120, words=words)
+    # Nothing is heard from line 10 to 69: the next segment lies outside the
+    # window, but within max_window (16 windows) ahead of the cursor
+    segments = [segment for segment in segments if not 20.0 <= segment["start"] < 140.0]
+    matches = _matches(script, segments, matcher=SyncPipeline.MATCHER_WINDOWED, window_size=5)
+    assert matches == _expected(segments)
+
+
+def _anchored_episode(seed: int, lines: int = 90):
+    """Episode where every tenth segment is heard exactly, so it can anchor"""
+    rng = random.Random(seed)
+    words = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(5)) for _ in range(60)]
+    script, segments = _episode(seed, lines=lines, words=words)
+    for segment in segments:
+        index = int(segment["start"] // 2)
+        if index % 10 == 0:
+            segment["text"] = script[index]["dialogue"]
+    return script, segments
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_anchored_alignment_agrees_with_full_alignment(workers, monkeypatch):
+    script, segments = _anchored_episode(5)
+    # Pool even these small gaps when workers > 1
+    monkeypatch.setattr("src.core.anchored_alignment.MIN_POOLED_CELLS", 1)
+    reference = align_segments(segments, script, threshold=SyncPipeline.SIMILARITY_THRESHOLD)
+    anchored = align_segments_anchored(segments, script,
+                                       threshold=SyncPipeline.SIMILARITY_THRESHOLD, workers=workers)
+    assert anchored == reference
+    correct = _expected(segments).items() & {
+        (match["index"], int(match["start"] * 25)) for match in anchored}
+    assert len(correct) >= 0.9 * len(segments)
+
+
+def test_anchors_are_unique_exact_lines_in_order():
+    script, segments = _anchored_episode(6)
+    anchors = find_anchors(segments, script)
+    heard_exactly = [(position, int(segment["start"] // 2))
+                     for position, segment in enumerate(segments)
+                     if int(segment["start"] // 2) % 10 == 0]
+    assert anchors == heard_exactly
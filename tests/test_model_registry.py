@@ -0,0 +1,81 @@
+import threading
+import time
+
+from src.core.model_registry import ModelRegistry
+
+GB = 1024 ** 3
+
+
+class _Loader:
+    """Counts loads; the 'model' is just its (name, device) key"""
+
+    def __init__(self):
+        self.loads = []
+
+    def __call__(self, model_name, device):
+        self.loads.append((model_name, device))
+        return (model_name, device)
+
+
+def _registry(free=0, **kwargs):
+    loader = _Loader()
+    registry = ModelRegistry(loader, model_memory=GB, free_memory=lambda device: free, **kwargs)
+    return registry, loader
+
+
+def test_users_share_one_load_until_the_last_release():
+    registry, loader = _registry()
+    first = registry.acquire("small", "cpu")
+    second = registry.acquire("small", "cpu")
+    assert first is second
+    assert loader.loads == [("small", "cpu")]
+    registry.release("small", "cpu")
+    registry.clear()
+    assert registry.is_loaded("small", "cpu")
+    registry.release("small", "cpu")
+    registry.clear()
+    assert not registry.is_loaded("small", "cpu")
+
+
+def test_idle_model_is_unloaded_after_timeout():
+    registry, _ = _registry(idle_timeout=0.05)
+    with registry.use("small", "cpu"):
+        time.sleep(0.1)
+        assert registry.is_loaded("small", "cpu")
+    time.sleep(0.3)
+    assert not registry.is_loaded("small", "cpu")
+
+
+def test_new_model_evicts_idle_one_at_the_cap():
+    registry, _ = _registry(max_models=1)
+    with registry.use("small", "cpu"):
+        pass
+    with registry.use("medium", "cpu"):
+        assert not registry.is_loaded("small", "cpu")
+
+
+def test_busy_model_keeps_company_only_when_memory_allows():
+    registry, _ = _registry(free=2 * GB, max_models=1)
+    registry.acquire("small", "cpu")
+    registry.acquire("medium", "cpu")
+    assert registry.is_loaded("small", "cpu") and registry.is_loaded("medium", "cpu")
+
+
+def test_load_without_memory_waits_for_the_busy_model():
+    registry, _ = _registry(free=0, max_models=1)
+    registry.acquire("small", "cpu")
+    loaded = threading.Event()
+
+    def load_other():
+        registry.acquire("medium", "cpu")
+        loaded.set()
+
+    thread = threading.Thread(target=load_other, daemon=True)
+    thread.start()
+    assert not loaded.wait(0.2)
+    assert not registry.is_loaded("medium", "cpu")
+
+    registry.release("small", "cpu")
+    assert loaded.wait(2.0)
+    assert registry.is_loaded("medium", "cpu")
+    assert not registry.is_loaded("small", "cpu")
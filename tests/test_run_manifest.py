@@ -0,0 +1,114 @@
+import os
+
+import pytest
+
+from src.core.pipeline import SyncPipeline
+from src.core.run_manifest import RunManifestStore, add_to_ranges, diff_dialogues
+from src.core.transcription_cache import TranscriptionCache
+
+
+_OLD = [("RYDER", text) for text in "abcdefghij"]
+
+
+def _new(texts):
+    return [{"character": "RYDER", "dialogue": text} for text in texts]
+
+
+def test_inserted_line_is_matched_with_its_neighbours():
+    kept, ranges = diff_dialogues(_OLD, _new("abcXdefghij"), neighborhood=1)
+    assert ranges == [(2, 5)]
+    assert kept[1] == 1 and kept[5] == 4 and kept[10] == 9
+
+
+def test_deleted_line_rechecks_the_lines_around_it():
+    kept, ranges = diff_dialogues(_OLD, _new("abcefghij"), neighborhood=1)
+    assert ranges == [(2, 4)]
+    assert kept[4] == 5 and 3 not in kept
+
+
+def test_edited_line_keeps_the_same_indices_elsewhere():
+    kept, ranges = diff_dialogues(_OLD, _new("abcXefghij"), neighborhood=1)
+    assert ranges == [(2, 5)]
+    assert all(kept[index] == index for index in (0, 1, 5, 9))
+
+
+def test_reordered_lines_are_both_matched_again():
+    kept, ranges = diff_dialogues(_OLD, _new("abcedfghij"), neighborhood=1)
+    dirty = {index for start, end in ranges for index in range(start, end)}
+    assert {3, 4} <= dirty
+    assert not dirty & set(kept)
+    assert kept[6] == 6
+
+
+def test_add_to_ranges_merges_adjacent_indices():
+    assert add_to_ranges([(2, 4)], [4, 8]) == [(2, 5), (8, 9)]
+
+
+_SENTENCES = [
+    "Ryder needs help at the tower", "Chase is on the case", "Marshall is fired up",
+    "Skye is ready to fly", "Rubble on the double", "Zuma lets dive in",
+    "Rocky green means go", "Everest is ready to rescue", "The mayor lost her chicken",
+    "No job is too big no pup is too small",
+]
+
+
+@pytest.fixture
+def previous_run(tmp_path):
+    """Audio, script, caches and the manifest a finished run would leave"""
+    audio_path = tmp_path / "audio.wav"
+    audio_path.write_bytes(b"audio")
+    script_path = tmp_path / "guion.txt"
+    _write_script(script_path, _SENTENCES)
+    options = {"cache_dir": str(tmp_path / "cache"), "manifest_dir": str(tmp_path / "runs")}
+
+    segments = [{"text": text, "start": index * 2.0, "end": index * 2.0 + 1.5}
+                for index, text in enumerate(_SENTENCES)]
+    TranscriptionCache(options["cache_dir"]).put("transcription", {"segments": segments})
+    pipeline = SyncPipeline(str(audio_path), str(script_path), options)
+    store, key = pipeline._open_manifest()
+    matches = [(index, index * 50, index * 50 + 37) for index in range(len(_SENTENCES))]
+    store.save(key, "transcription", pipeline._load_script(), matches)
+    return audio_path, script_path, options
+
+
+def _write_script(path, sentences):
+    path.write_text("".join(f"RYDER\n{text}\n" for text in sentences), encoding="utf-8")
+    # Same size edits within one clock tick must still look like a new file
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_edited_script_reuses_the_previous_matches(previous_run):
+    audio_path, script_path, options = previous_run
+    edited = list(_SENTENCES)
+    edited[5] = "Zuma is ready to dive"
+    _write_script(script_path, edited)
+
+    json_data = SyncPipeline(str(audio_path), str(script_path), options)._resync_incrementally()
+    assert json_data is not None
+    frames = {entry["ID"]: entry["IN"].frames for entry in json_data["data"]}
+    assert frames[0] == 0 and frames[9] == 450
+    assert frames[5] == 250
+
+
+def test_changed_audio_forces_a_full_run(previous_run):
+    audio_path, script_path, options = previous_run
+    audio_path.write_bytes(b"another take")
+    assert SyncPipeline(str(audio_path), str(script_path), options)._resync_incrementally() is None
+
+
+def test_changed_settings_force_a_full_run(previous_run):
+    audio_path, script_path, options = previous_run
+    options = {**options, "matcher": SyncPipeline.MATCHER_ALIGNMENT}
+    assert SyncPipeline(str(audio_path), str(script_path), options)._resync_incrementally() is None
+
+
+def test_manifest_key_follows_audio_stat_and_settings(tmp_path):
+    audio_path = tmp_path / "audio.wav"
+    audio_path.write_bytes(b"audio")
+    store = RunManifestStore(str(tmp_path / "runs"))
+    key = store.make_key(str(audio_path), "guion.txt", {"matcher": "greedy"})
+    assert key == store.make_key(str(audio_path), "guion.txt", {"matcher": "greedy"})
+    assert key != store.make_key(str(audio_path), "guion.txt", {"matcher": "windowed"})
+    audio_path.write_bytes(b"longer audio")
+    assert key != store.make_key(str(audio_path), "guion.txt", {"matcher": "greedy"})
@@ -0,0 +1,98 @@
+import pickle
+import random
+
+import pytest
+
+from src.core.anchored_alignment import MIN_POOLED_CELLS, align_segments_anchored
+from src.core.chunked_transcription import build_result
+from src.core.pipeline import SyncPipeline
+from src.core.script_parser import cached_script, clear_script_cache, load_script, store_script
+from src.core.sync_engine import SyncEngine, acquire_engine, release_engine, shutdown_engines
+
+
+_WORDS = ["ryder", "chase", "marshall", "skye", "rubble", "zuma", "rocky", "everest",
+          "rescue", "bay", "tower", "mayor", "goodway", "ready", "action", "help"]
+
+
+@pytest.fixture
+def engine():
+    engine = acquire_engine()
+    yield engine
+    release_engine(engine)
+    shutdown_engines()
+
+
+def test_cancel_before_run_is_kept(engine):
+    engine.cancel()
+    assert engine._cancel_pending
+
+
+def test_late_cancel_does_not_reach_next_sync(engine):
+    # The worker's cancel can land after run() returned, before the release
+    engine.cancel()
+    release_engine(engine)
+    engine.cancel()
+    assert not engine._cancel_pending
+    assert acquire_engine() is engine
+    assert not engine._cancel_pending
+
+
+def test_shared_script_is_reused(tmp_path):
+    script_path = tmp_path / "guion.txt"
+    script_path.write_text("RYDER\n¡A la aventura!\nCHASE\nChase está listo.\n", encoding="utf-8")
+    load_script(str(script_path))
+    # What the engine receives with the run command
+    signature, script = pickle.loads(pickle.dumps(cached_script(str(script_path))))
+    clear_script_cache()
+    store_script(str(script_path), signature, script)
+    assert load_script(str(script_path)) is script
+    assert [dialogue.character for dialogue in script] == ["RYDER", "CHASE"]
+
+
+def _anchored_episode(rng: random.Random, gap_lines: int):
+    """Script and segments with unique exact lines between two gaps of noisy ones"""
+    dialogues, segments = [], []
+    for index in range(2 * gap_lines + 3):
+        words = [rng.choice(_WORDS) for _ in range(8)] + [f"line{index}"]
+        text = " ".join(words)
+        dialogues.append(text)
+        # Exact lines become anchors; the others lose a word, as in a transcription
+        anchor = index in (0, gap_lines + 1, 2 * gap_lines + 2)
+        heard = text if anchor else " ".join(words[1:])
+        segments.append({"text": heard, "start": index * 2.0, "end": index * 2.0 + 1.5})
+    return dialogues, segments
+
+
+def test_anchored_matcher_pools_gaps_inside_engine(tmp_path):
+    # The engine runs the pipeline, so it may not be a daemon: the anchored
+    # matcher starts its own pool for the large gaps
+    pytest.importorskip("torch")
+    rng = random.Random(7)
+    gap_lines = 55
+    assert gap_lines * gap_lines >= MIN_POOLED_CELLS
+    dialogues, segments = _anchored_episode(rng, gap_lines)
+    script_path = tmp_path / "guion.txt"
+    script_path.write_text("".join(f"PERSONAJE\n{text}\n" for text in dialogues), encoding="utf-8")
+    audio_path = tmp_path / "audio.wav"
+    audio_path.write_bytes(b"not decoded: the transcription comes from the cache")
+
+    options = {"matcher": SyncPipeline.MATCHER_ANCHORED, "anchor_workers": 2,
+               "cache_dir": str(tmp_path / "cache"), "manifest_dir": str(tmp_path / "runs")}
+    pipeline = SyncPipeline(str(audio_path), str(script_path), options)
+    cache, cache_key = pipeline._open_cache(pipeline._get_device())
+    cache.put(cache_key, build_result([dict(segment) for segment in segments],
+                                      SyncPipeline.DEFAULT_LANGUAGE))
+
+    engine = SyncEngine()
+    try:
+        result = engine.run(str(audio_path), str(script_path), options,
+                            on_log=lambda message: None, on_progress=lambda percent: None,
+                            on_partial=lambda entries: None)
+    finally:
+        engine.close()
+
+    expected = align_segments_anchored(segments, [{"dialogue": text} for text in dialogues],
+                                       threshold=SyncPipeline.SIMILARITY_THRESHOLD, workers=1)
+    matched = [row["ID"] for row in result["json_data"]["data"] if row["OUT"].frames > 0]
+    assert matched == [match["index"] for match in expected]
+    assert len(matched) == len(dialogues)
@@ -0,0 +1,10 @@
+import pytest
+
+from src.core.timecode import Timecode, seconds_to_frames
+
+
+@pytest.mark.parametrize("rate", ["25", "29.97"])
+def test_from_seconds_matches_vectorized_conversion(rate):
+    times = [-1.5, -0.5, -0.01, 0.0, 0.039999, 1.5, 59.99, 3600.02]
+    vectorized = seconds_to_frames(times, rate)
+    assert [Timecode.from_seconds(seconds, rate).frames for seconds in times] == list(vectorized)